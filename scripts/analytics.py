@@ -0,0 +1,225 @@
+# === Importation des bibliothèques nécessaires ===
+from datetime import datetime, timedelta, timezone  # Horodatage des actualisations et bornes des fenêtres
+from time import perf_counter  # Mesure de la durée des actualisations
+from loguru import logger  # Gestion des logs
+from pymongo import ASCENDING, DESCENDING  # Sens de tri des lectures
+from crud import INGESTED_FIELD  # Date d'écriture des documents (posée par crud.insert_batch)
+
+# === Paramètres des résumés ===
+WATERMARK_FIELD = INGESTED_FIELD  # Champ qui délimite les documents déjà agrégés
+APPLIED_FIELD = "applied_through"  # Borne haute de la dernière fenêtre ajoutée à un groupe du résumé
+CONTROL_COLLECTION = "analytics_watermarks"  # Collection des filigranes (un document par résumé)
+INGEST_GRACE = timedelta(seconds=60)  # Délai laissé aux lots en cours d'écriture avant de les agréger
+MILLISECONDS_PER_DAY = 86_400_000  # Conversion des écarts de dates en jours
+
+# Résumés maintenus : clé de regroupement, sommes additives (fusionnables d'une actualisation
+# à l'autre) et champs dérivés recalculés à partir des sommes
+SUMMARIES = {
+    "admissions_by_condition": {
+        "description": "Admissions et facturation par pathologie",
+        "group_key": "$medical_condition",
+        "sums": {"admissions": 1, "billing_total": {"$ifNull": ["$billing_amount", 0]}},
+        "derived": {"billing_average": {"$divide": ["$billing_total", "$admissions"]}},
+        "sort": [("admissions", DESCENDING)],
+    },
+    "billing_by_hospital_insurer": {
+        "description": "Facturation par hôpital et assureur",
+        "group_key": {"hospital": "$hospital", "insurance_provider": "$insurance_provider"},
+        "sums": {"admissions": 1, "billing_total": {"$ifNull": ["$billing_amount", 0]}},
+        "derived": {"billing_average": {"$divide": ["$billing_total", "$admissions"]}},
+        "sort": [("billing_total", DESCENDING)],
+    },
+    "stay_length_by_condition": {
+        "description": "Durée moyenne de séjour (jours) par pathologie",
+        "group_key": "$medical_condition",
+        "match": {"discharge_date": {"$type": "date"}},  # Séjours terminés uniquement
+        "sums": {
+            "stays": 1,
+            "stay_days_total": {
+                "$divide": [{"$subtract": ["$discharge_date", "$date_of_admission"]}, MILLISECONDS_PER_DAY]
+            },
+        },
+        "derived": {"stay_days_average": {"$divide": ["$stay_days_total", "$stays"]}},
+        "sort": [("stay_days_average", DESCENDING)],
+    },
+}
+
+
+def summary_collection_name(source_name, summary_name):
+    """
+    Construit le nom de la collection d'un résumé (ex : `patients_data_admissions_by_condition`).
+
+    Args:
+        source_name (str): Nom de la collection des patients.
+        summary_name (str): Nom du résumé (clé de `SUMMARIES`).
+
+    Returns:
+        str: Nom de la collection du résumé.
+    """
+    return f"{source_name}_{summary_name}"
+
+
+def summary_pipeline(summary, target_name, lower=None, upper=None):
+    """
+    Construit le pipeline `$match` + `$group` + `$merge` d'un résumé sur une fenêtre d'écriture.
+
+    Seuls les documents écrits dans `]lower, upper]` sont agrégés (sans borne basse, les
+    documents antérieurs au champ `ingested_at` sont aussi comptés). `$merge` ajoute les
+    nouvelles sommes à celles déjà présentes (ou insère les groupes nouveaux), puis
+    recalcule les champs dérivés : le résumé est mis à jour côté serveur sans relire les
+    documents déjà agrégés. Chaque groupe mémorise la borne haute de la dernière fenêtre
+    ajoutée (`applied_through`) et ignore une fenêtre déjà ajoutée : rejouer le pipeline
+    après une interruption ne compte aucun document deux fois.
+
+    Args:
+        summary (dict): Définition du résumé (voir `SUMMARIES`).
+        target_name (str): Collection du résumé.
+        lower (datetime, optional): Borne exclue (filigrane de l'actualisation précédente).
+        upper (datetime): Borne incluse (fixée au début de l'actualisation).
+
+    Returns:
+        list: Étapes du pipeline d'agrégation.
+    """
+    if lower is None:
+        window = {"$or": [{WATERMARK_FIELD: {"$lte": upper}}, {WATERMARK_FIELD: {"$exists": False}}]}
+    else:
+        window = {WATERMARK_FIELD: {"$gt": lower, "$lte": upper}}
+    match = {**window, **summary.get("match", {})}
+
+    sums = summary["sums"]
+    derived = summary.get("derived", {})
+    fresh = {"$lt": [f"${APPLIED_FIELD}", f"$$new.{APPLIED_FIELD}"]}  # Fenêtre pas encore ajoutée au groupe
+    added = {
+        field: {"$cond": [fresh, {"$add": [{"$ifNull": [f"${field}", 0]}, f"$$new.{field}"]}, f"${field}"]}
+        for field in sums
+    }
+    added[APPLIED_FIELD] = {"$cond": [fresh, f"$$new.{APPLIED_FIELD}", f"${APPLIED_FIELD}"]}
+    when_matched = [{"$set": added}] + ([{"$set": derived}] if derived else [])
+
+    return [
+        {"$match": match},
+        {"$group": {"_id": summary["group_key"], **{field: {"$sum": value} for field, value in sums.items()}}},
+        {"$set": {APPLIED_FIELD: upper, **derived}},
+        {"$merge": {"into": target_name, "on": "_id", "whenMatched": when_matched, "whenNotMatched": "insert"}},
+    ]
+
+
+def refresh_summary(collection, summary_name, full=False):
+    """
+    Actualise un résumé de manière incrémentale, à partir du filigrane de date d'écriture.
+
+    Le filigrane enregistre la date d'écriture (`ingested_at`) jusqu'à laquelle les
+    documents sont agrégés : seuls les documents écrits depuis sont lus, quelles que
+    soient leurs dates d'admission. La borne haute est fixée au début de l'actualisation
+    (avec un délai de grâce pour les lots en cours d'écriture lors d'une actualisation
+    incrémentale ; sans délai pour une reconstruction, qui suit un chargement terminé) et
+    enregistrée comme fenêtre en attente avant l'agrégation : si l'actualisation est interrompue, la suivante rejoue
+    exactement la même fenêtre, sans double comptage (voir `summary_pipeline`). Les
+    modifications et les suppressions ne sont prises en compte que par une reconstruction
+    (`full=True`), à faire après chaque rechargement de la collection.
+
+    Args:
+        collection (Collection): Collection des patients.
+        summary_name (str): Nom du résumé (clé de `SUMMARIES`).
+        full (bool): Reconstruit entièrement le résumé au lieu de l'actualiser.
+
+    Returns:
+        dict: Nom du résumé, bornes de la fenêtre agrégée, nombre de groupes et durée.
+
+    Raises:
+        Exception: En cas d'erreur lors de l'agrégation.
+    """
+    try:
+        db = collection.database
+        control = db[CONTROL_COLLECTION]
+        summary = SUMMARIES[summary_name]
+        target_name = summary_collection_name(collection.name, summary_name)
+        control_id = f"{collection.name}.{summary_name}"
+        started_at = perf_counter()
+
+        if full:
+            db[target_name].drop()
+            control.delete_one({"_id": control_id})
+            state = {}
+        else:
+            state = control.find_one({"_id": control_id}) or {}
+        lower = state.get("watermark")
+
+        if state.get("pending") is not None:
+            # Actualisation précédente interrompue : la même fenêtre est rejouée
+            upper = state["pending"]
+            logger.warning(f"Résumé '{summary_name}' : reprise de la fenêtre interrompue ]{lower}, {upper}].")
+        else:
+            # Dates MongoDB : UTC sans fuseau, à la milliseconde ; la reconstruction inclut
+            # tous les documents déjà écrits (aucun lot en cours après un chargement)
+            now = datetime.now(timezone.utc).replace(tzinfo=None) - (timedelta(0) if full else INGEST_GRACE)
+            upper = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            if lower is not None and upper <= lower:
+                logger.info(f"Résumé '{summary_name}' déjà à jour (filigrane : {lower}).")
+                groups = db[target_name].estimated_document_count()
+                return {"summary": summary_name, "lower": lower, "upper": lower, "groups": groups, "seconds": 0.0}
+            control.update_one({"_id": control_id}, {"$set": {"pending": upper, "target": target_name}}, upsert=True)
+
+        # Aucun document écrit dans la fenêtre (lecture d'index) : seul le filigrane avance
+        if lower is None or collection.find_one({WATERMARK_FIELD: {"$gt": lower, "$lte": upper}}, {"_id": 1}):
+            collection.aggregate(summary_pipeline(summary, target_name, lower, upper))
+        control.update_one(
+            {"_id": control_id},
+            {"$set": {"watermark": upper, "refreshed_at": datetime.now(timezone.utc)}, "$unset": {"pending": ""}},
+        )
+
+        elapsed = perf_counter() - started_at
+        groups = db[target_name].estimated_document_count()
+        logger.info(
+            f"Résumé '{summary_name}' {'reconstruit' if full else 'actualisé'} en {elapsed:.2f} s : "
+            f"documents écrits dans ]{lower}, {upper}] agrégés, {groups} groupes."
+        )
+        return {"summary": summary_name, "lower": lower, "upper": upper, "groups": groups, "seconds": elapsed}
+    except Exception as e:
+        logger.error(f"Erreur lors de l'actualisation du résumé '{summary_name}' : {e}")
+        raise
+
+
+def refresh_summaries(collection, full=False, names=None):
+    """
+    Actualise tous les résumés (ou ceux demandés).
+
+    Args:
+        collection (Collection): Collection des patients.
+        full (bool): Reconstruit entièrement les résumés.
+        names (list, optional): Résumés à actualiser (tous par défaut).
+
+    Returns:
+        list: Rapports d'actualisation (voir `refresh_summary`).
+    """
+    return [refresh_summary(collection, name, full) for name in (names or SUMMARIES)]
+
+
+def read_summary(collection, summary_name, query=None, limit=None):
+    """
+    Lit les lignes d'un résumé, triées selon sa définition.
+
+    Args:
+        collection (Collection): Collection des patients.
+        summary_name (str): Nom du résumé (clé de `SUMMARIES`).
+        query (dict, optional): Filtre sur les lignes du résumé (ex : `{"_id.hospital": "..."}`).
+        limit (int, optional): Nombre maximal de lignes.
+
+    Returns:
+        list: Lignes du résumé.
+
+    Raises:
+        Exception: En cas d'erreur lors de la lecture.
+    """
+    try:
+        summary = SUMMARIES[summary_name]
+        target = collection.database[summary_collection_name(collection.name, summary_name)]
+        cursor = target.find(query or {}).sort(summary.get("sort", [("_id", ASCENDING)]))
+        if limit:
+            cursor = cursor.limit(limit)
+        rows = list(cursor)
+        logger.info(f"{len(rows)} lignes lues dans le résumé '{summary_name}'.")
+        return rows
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture du résumé '{summary_name}' : {e}")
+        raise
@@ -0,0 +1,410 @@
+# === Importation des bibliothèques nécessaires ===
+import os  # Gestion des variables d'environnement et du répertoire d'export
+import asyncio  # Boucle d'événements, sémaphores et tâches
+import weakref  # Ressources associées à chaque boucle d'événements
+from itertools import islice  # Découpage des documents en lots
+from time import perf_counter  # Mesure du débit
+import pandas as pd  # Écriture des blocs CSV
+from loguru import logger  # Gestion avancée des logs
+from pymongo import AsyncMongoClient  # Pilote MongoDB asynchrone (asyncio)
+from pymongo.errors import AutoReconnect, BulkWriteError  # Erreurs transitoires et erreurs par document
+from crud import (
+    ECHO_LIMIT,
+    EXPORT_BATCH_SIZE,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_DIR,
+    INGESTED_FIELD,
+    INSERT_MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    check_compression,
+    export_columns,
+    export_path_for,
+    export_projection,
+    log_empty_export,
+    open_export_file,
+    retried_duplicate_ids,
+    retry_written_indexes,
+    stamp_ingested,
+    tally_write_errors,
+)  # Paramètres et utilitaires partagés avec les opérations synchrones
+from query_cache import invalidate_collection, invalidate_update  # Invalidation des lectures en cache
+from utils import INSERT_BATCH_SIZE, MONGO_CLIENT_OPTIONS, MONGO_URI  # Configuration de la connexion
+
+# === Cache des lectures ===
+# Les lectures synchrones du processus (`crud.read_records`, `crud.read_page`) sont mises en
+# cache par `query_cache`, partagé par tout le processus ; les lectures asynchrones ne le
+# sont pas. Les écritures de ce module invalident donc ce cache, par un appel synchrone
+# depuis la coroutine : l'invalidation se fait en mémoire, sans E/S, sous le verrou du
+# cache et le temps de parcourir ses entrées (bornées par `QUERY_CACHE_MAX_ENTRIES`), si bien
+# qu'elle ne bloque la boucle d'événements que brièvement.
+
+# === Paramètres de concurrence ===
+ASYNC_CONCURRENCY = int(os.getenv("MONGO_ASYNC_CONCURRENCY", 32))  # Opérations MongoDB simultanées par boucle
+
+_async_clients = weakref.WeakKeyDictionary()  # Boucle d'événements -> {URI: client asynchrone}
+_limiters = weakref.WeakKeyDictionary()  # Boucle d'événements -> sémaphore de concurrence
+
+
+def get_async_mongo_client(uri=None):
+    """
+    Retourne le client MongoDB asynchrone partagé pour une URI, dans la boucle courante.
+
+    Un `AsyncMongoClient` est lié à la boucle d'événements qui l'utilise : le registre
+    conserve un client par boucle et par URI, configuré comme le client synchrone
+    (`utils.MONGO_CLIENT_OPTIONS`). Toutes les coroutines de la boucle partagent ainsi
+    le même pool de connexions.
+
+    Args:
+        uri (str, optional): URI de connexion (par défaut : `MONGO_URI`).
+
+    Returns:
+        AsyncMongoClient: Client partagé.
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    uri = uri or MONGO_URI
+    if uri not in clients:
+        clients[uri] = AsyncMongoClient(uri, **MONGO_CLIENT_OPTIONS)
+    return clients[uri]
+
+
+async def close_async_mongo_clients():
+    """Ferme les clients asynchrones de la boucle courante (fin du service ou des tests)."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+def concurrency_limiter(limit=ASYNC_CONCURRENCY):
+    """
+    Retourne le sémaphore qui borne les opérations MongoDB simultanées de la boucle courante.
+
+    Toutes les fonctions de ce module le partagent : quel que soit le nombre de requêtes
+    clientes servies, au plus `limit` opérations sont en cours côté serveur et les autres
+    attendent leur tour sans occuper de thread.
+
+    Args:
+        limit (int): Nombre maximal d'opérations simultanées (utilisé à la création).
+
+    Returns:
+        asyncio.Semaphore: Sémaphore de la boucle courante.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _limiters:
+        _limiters[loop] = asyncio.Semaphore(limit)
+    return _limiters[loop]
+
+
+async def insert_batch(collection, batch, max_retries=INSERT_MAX_RETRIES):
+    """
+    Insère un lot de documents sans ordre, avec nouvelles tentatives sur erreur transitoire.
+
+    Même comportement que `crud.insert_batch` (date d'écriture comprise) : les refus sont
+    décomptés par code d'erreur et l'attente entre deux tentatives ne bloque pas la boucle.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        batch (list): Documents du lot.
+        max_retries (int): Nombre maximal de nouvelles tentatives après une erreur transitoire.
+
+    Returns:
+        dict: Compteurs du lot (insérés, doublons, erreurs de validation, autres erreurs, tentatives).
+
+    Raises:
+        AutoReconnect: Si l'erreur transitoire persiste après `max_retries` tentatives.
+    """
+    report = {"inserted": 0, "duplicates": 0, "validation_errors": 0, "other_errors": 0, "retries": 0}
+    stamp_ingested(batch)
+    for attempt in range(max_retries + 1):
+        try:
+            result = await collection.insert_many(batch, ordered=False)
+            report["inserted"] += len(result.inserted_ids)
+            return report
+        except BulkWriteError as e:
+            written = set()
+            candidates = retried_duplicate_ids(batch, e.details) if attempt else {}
+            if candidates:
+                stored = await collection.find({"_id": {"$in": list(candidates)}}, {INGESTED_FIELD: 1}).to_list()
+                written = retry_written_indexes(batch, candidates, stored)
+            return tally_write_errors(report, e.details, written)
+        except AutoReconnect as e:
+            if attempt == max_retries:
+                raise
+            report["retries"] += 1
+            delay = RETRY_BASE_DELAY * 2**attempt
+            logger.warning(f"Erreur transitoire lors de l'insertion d'un lot ({e}), nouvelle tentative dans {delay:.1f} s.")
+            await asyncio.sleep(delay)
+
+
+# === Fonction d'insertion de documents dans MongoDB ===
+async def insert_records(collection, records, batch_size=INSERT_BATCH_SIZE):
+    """
+    Insère des documents dans une collection MongoDB, en une fois ou par lots.
+
+    Équivalent asynchrone de `crud.insert_records` : les lots sont insérés sans ordre et
+    simultanément, dans la limite du sémaphore de concurrence (voir `concurrency_limiter`).
+    Un lot n'est lu depuis `records` que lorsqu'une place se libère : la mémoire reste
+    proportionnelle au nombre de lots en cours.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        records (list | Iterable[list]): Liste de documents, ou itérable de lots de documents.
+        batch_size (int): Taille des lots lorsqu'une liste de documents est fournie.
+
+    Returns:
+        int: Nombre de documents insérés.
+
+    Raises:
+        Exception: En cas d'erreur lors de l'insertion.
+    """
+    totals = {"inserted": 0, "duplicates": 0, "validation_errors": 0, "other_errors": 0, "retries": 0, "batches": 0}
+    limiter = concurrency_limiter()
+    started_at = perf_counter()
+
+    async def insert(batch):
+        try:
+            report = await insert_batch(collection, batch)
+        finally:
+            limiter.release()
+        for key, value in report.items():
+            totals[key] += value
+        totals["batches"] += 1
+
+    try:
+        if isinstance(records, list):
+            iterator = iter(records)
+            batches = iter(lambda: list(islice(iterator, batch_size)), [])
+        else:
+            batches = records
+
+        tasks = []  # Les tâches terminées ne retiennent plus leur lot
+        for batch in batches:
+            if not batch:
+                continue
+            await limiter.acquire()  # Place libérée par la fin d'une insertion
+            tasks.append(asyncio.create_task(insert(batch)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            invalidate_collection(collection.full_name)  # Résultats en cache périmés
+
+        if not totals["batches"]:  # Si aucun document n'a été fourni
+            logger.warning("Aucune donnée à insérer.")
+            return 0
+
+        elapsed = perf_counter() - started_at
+        logger.info(
+            f"{totals['inserted']} documents insérés avec succès en {totals['batches']} lots "
+            f"({totals['inserted'] / elapsed if elapsed else 0:,.0f} docs/s, asynchrone)."
+        )
+        if totals["duplicates"] or totals["validation_errors"] or totals["other_errors"]:
+            logger.warning(
+                f"Documents refusés : {totals['duplicates']} doublons, {totals['validation_errors']} erreurs "
+                f"de validation, {totals['other_errors']} autres erreurs."
+            )
+        if totals["retries"]:
+            logger.info(f"{totals['retries']} nouvelles tentatives après des erreurs transitoires.")
+        return totals["inserted"]
+    except Exception as e:
+        logger.error(f"Erreur lors de l'insertion : {e}")
+        raise
+
+
+# === Fonctions de lecture de documents dans MongoDB ===
+async def read_records(collection, query=None, limit=5, projection=None):
+    """
+    Lit des documents depuis une collection MongoDB avec des filtres et une limite.
+
+    Équivalent asynchrone de `crud.read_records`.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        query (dict, optional): Filtre pour la lecture des documents (par défaut : aucun).
+        limit (int): Nombre maximum de documents à lire.
+        projection (dict, optional): Champs à renvoyer (par défaut : tous).
+
+    Returns:
+        list: Liste des documents lus.
+
+    Raises:
+        Exception: En cas d'erreur lors de la lecture.
+    """
+    try:
+        async with concurrency_limiter():
+            records = await collection.find(query or {}, projection).limit(limit).to_list()
+        logger.info(f"{len(records)} documents récupérés (après application de la limite).")
+        return records
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture : {e}")
+        raise
+
+
+async def iter_records(collection, query=None, projection=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Parcourt les documents d'une requête de manière asynchrone (`async for`).
+
+    Les documents sont reçus du serveur par lots de `batch_size` ; la boucle reste libre
+    pendant l'attente de chaque lot. Le curseur occupe une place du sémaphore de
+    concurrence jusqu'à la fin du parcours : le corps de la boucle ne doit donc pas
+    attendre d'autres opérations de ce module si la limite vaut 1.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        query (dict, optional): Filtre des documents (par défaut : aucun).
+        projection (dict, optional): Champs à renvoyer (par défaut : tous).
+        batch_size (int): Nombre de documents reçus du serveur par aller-retour.
+
+    Yields:
+        dict: Documents, dans l'ordre du curseur.
+    """
+    async with concurrency_limiter():
+        cursor = collection.find(query or {}, projection, batch_size=batch_size)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+
+# === Fonction de mise à jour de documents dans MongoDB ===
+async def update_records(collection, filter_query, update_query, echo=False, echo_limit=ECHO_LIMIT):
+    """
+    Met à jour les documents correspondant à un filtre dans MongoDB.
+
+    Équivalent asynchrone de `crud.update_records`.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        filter_query (dict): Filtre pour sélectionner les documents à mettre à jour.
+        update_query (dict): Mise à jour à appliquer.
+        echo (bool): Affiche les documents correspondant au filtre après la mise à jour.
+        echo_limit (int): Nombre maximal de documents affichés.
+
+    Returns:
+        int: Nombre de documents modifiés.
+
+    Raises:
+        Exception: En cas d'erreur lors de la mise à jour.
+    """
+    try:
+        async with concurrency_limiter():
+            result = await collection.update_many(filter_query, update_query)
+        invalidate_update(collection, update_query)
+        logger.info(f"{result.modified_count} documents mis à jour avec succès.")
+
+        if echo:
+            for doc in await read_records(collection, filter_query, echo_limit):
+                print(doc)
+
+        return result.modified_count
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise à jour : {e}")
+        raise
+
+
+# === Fonction de suppression de documents dans MongoDB ===
+async def delete_records(collection, filter_query):
+    """
+    Supprime les documents correspondant à un filtre dans MongoDB.
+
+    Équivalent asynchrone de `crud.delete_records`.
+
+    Args:
+        collection (AsyncCollection): Collection cible dans MongoDB.
+        filter_query (dict): Filtre pour sélectionner les documents à supprimer.
+
+    Returns:
+        int: Nombre de documents supprimés.
+
+    Raises:
+        Exception: En cas d'erreur lors de la suppression.
+    """
+    try:
+        async with concurrency_limiter():
+            result = await collection.delete_many(filter_query)
+        invalidate_collection(collection.full_name)
+        logger.info(f"{result.deleted_count} documents supprimés de la collection MongoDB.")
+        return result.deleted_count
+    except Exception as e:
+        logger.error(f"Erreur lors de la suppression : {e}")
+        raise
+
+
+# === Fonction d'exportation de documents vers un fichier CSV ===
+async def export_to_csv(
+    collection,
+    file_name,
+    query=None,
+    fields=None,
+    batch_size=EXPORT_BATCH_SIZE,
+    chunk_size=EXPORT_CHUNK_SIZE,
+    compression=None,
+):
+    """
+    Exporte les documents d'une collection MongoDB vers un fichier CSV, en flux.
+
+    Équivalent asynchrone de `crud.export_to_csv` : le curseur est parcouru avec
+    `async for` et chaque bloc est écrit dans un thread (`asyncio.to_thread`), afin que
+    l'écriture et la compression ne bloquent pas les autres coroutines.
+
+    Args:
+        collection (AsyncCollection): Collection cible.
+        file_name (str): Nom du fichier CSV (sans chemin ni extension).
+        query (dict, optional): Filtre des documents à exporter (tous par défaut).
+        fields (list, optional): Champs à exporter, dans l'ordre des colonnes. Par défaut,
+            les colonnes du schéma des patients (voir `crud.export_columns`).
+        batch_size (int): Nombre de documents reçus du serveur par aller-retour.
+        chunk_size (int): Nombre de lignes écrites par bloc.
+        compression (str, optional): "gzip" ou "zstd" pour compresser le fichier.
+
+    Returns:
+        int: Nombre de documents exportés.
+
+    Raises:
+        ValueError: Si la compression demandée n'est pas disponible.
+    """
+    try:
+        check_compression(compression)
+        if not os.path.exists(EXPORT_DIR):
+            os.makedirs(EXPORT_DIR)
+            logger.info(f"Répertoire créé : {EXPORT_DIR}")
+
+        output_file = export_path_for(file_name, compression)
+
+        # Projection côté serveur : champs demandés, sans `_id`
+        projection = export_projection(fields)
+        columns = export_columns(fields)
+
+        def write_chunk(handle, chunk, header):
+            pd.DataFrame(chunk, columns=columns).to_csv(handle, index=False, header=header)
+
+        exported_count = 0
+        handle = await asyncio.to_thread(open_export_file, output_file, compression)
+
+        async def flush(chunk):
+            nonlocal exported_count
+            await asyncio.to_thread(write_chunk, handle, chunk, exported_count == 0)
+            exported_count += len(chunk)
+            logger.debug(f"{exported_count} documents exportés...")
+
+        try:
+            chunk = []
+            async for document in iter_records(collection, query, projection, batch_size):
+                chunk.append(document)
+                if len(chunk) == chunk_size:
+                    await flush(chunk)
+                    chunk = []
+            if chunk:
+                await flush(chunk)
+        finally:
+            await asyncio.to_thread(handle.close)
+
+        if not exported_count:
+            log_empty_export(query)
+            os.remove(output_file)
+            return 0
+
+        logger.info(f"Données exportées avec succès dans le fichier : {output_file} ({exported_count} documents)")
+        return exported_count
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exportation : {e}")
+        raise
@@ -1,5 +1,218 @@
 from utils import hash_password  # Importer la fonction pour hacher un mot de passe
 from loguru import logger  # Bibliothèque pour enregistrer des messages dans les logs
+from collections import OrderedDict  # Ordre d'utilisation des entrées du cache (LRU)
+from hmac import compare_digest  # Comparaison des empreintes en temps constant
+from pymongo import ASCENDING, IndexModel  # Déclaration de l'index unique des utilisateurs
+import os  # Paramètres du cache via les variables d'environnement
+import secrets  # Génération des jetons de session
+import threading  # Protection du cache partagé entre threads
+from time import monotonic  # Horloge des expirations
+
+# === Paramètres des sessions ===
+SESSION_TTL = float(os.getenv("AUTH_SESSION_TTL", 900))  # Durée de vie d'une session ou d'un identifiant vérifié (s)
+SESSION_CACHE_SIZE = int(os.getenv("AUTH_SESSION_CACHE_SIZE", 1024))  # Entrées conservées au plus par cache
+USER_INDEXES = [
+    IndexModel([("username", ASCENDING)], name="username_1_unique", unique=True),  # Recherche par nom, sans doublon
+]
+VERSION_FIELD = "credentials_version"  # Incrémenté à chaque changement de mot de passe ou de rôle
+VERSION_CHECK_INTERVAL = float(os.getenv("AUTH_VERSION_CHECK_INTERVAL", 30))  # Délai entre deux relectures de la version (s)
+
+
+class SessionCache:
+    """
+    Cache en mémoire à durée de vie (TTL) et taille bornée (LRU), sûr entre threads.
+
+    Chaque entrée expire `ttl` secondes après son ajout ; au-delà de `max_size` entrées,
+    la moins récemment utilisée est évincée. Les entrées sont rattachées à un nom
+    d'utilisateur pour pouvoir invalider d'un coup toutes celles d'un utilisateur.
+
+    Args:
+        ttl (float): Durée de vie d'une entrée, en secondes.
+        max_size (int): Nombre maximal d'entrées.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_size=SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # Clé -> (expiration, nom d'utilisateur, valeur)
+        self._keys_by_user = {}  # Nom d'utilisateur -> clés de ses entrées
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, username, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(username)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[username]
+
+    def put(self, key, username, value):
+        """
+        Ajoute ou remplace une entrée, en évinçant la moins récemment utilisée si le cache est plein.
+
+        Args:
+            key (str): Clé de l'entrée (jeton de session ou nom d'utilisateur).
+            username (str): Utilisateur auquel l'entrée est rattachée.
+            value (object): Valeur mise en cache.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (monotonic() + self.ttl, username, value)
+            self._keys_by_user.setdefault(username, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def get(self, key):
+        """
+        Retourne la valeur d'une entrée encore valable, ou None.
+
+        Args:
+            key (str): Clé de l'entrée.
+
+        Returns:
+            object: Valeur mise en cache, ou None si l'entrée est absente ou expirée.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def discard(self, key):
+        """Supprime une entrée si elle existe."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_user(self, username):
+        """
+        Supprime toutes les entrées rattachées à un utilisateur.
+
+        Args:
+            username (str): Nom d'utilisateur.
+
+        Returns:
+            int: Nombre d'entrées supprimées.
+        """
+        with self._lock:
+            keys = list(self._keys_by_user.get(username, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+
+# Caches du processus : sessions ouvertes (jeton -> utilisateur) et identifiants déjà vérifiés.
+# Chaque entrée conserve l'`_id` et la version des identifiants de l'utilisateur, relue au
+# plus toutes les `VERSION_CHECK_INTERVAL` secondes : un changement fait par un autre
+# processus (initialize_users.py) invalide l'entrée dans ce délai, sans lecture de la base
+# à chaque requête.
+_sessions = SessionCache()
+_verified_users = SessionCache()
+
+
+def credentials_version(db, user_id):
+    """
+    Lit la version courante des identifiants d'un utilisateur (lecture ponctuelle par `_id`).
+
+    Args:
+        db (Database): Base de données contenant la collection 'users'.
+        user_id (ObjectId): Identifiant du document de l'utilisateur.
+
+    Returns:
+        int: Version des identifiants (0 si jamais modifiés), ou None si l'utilisateur n'existe plus.
+    """
+    user = db["users"].find_one({"_id": user_id}, {VERSION_FIELD: 1})
+    return None if user is None else user.get(VERSION_FIELD, 0)
+
+
+def version_still_current(db, entry):
+    """
+    Revérifie la version des identifiants d'une entrée en cache, au plus toutes les `VERSION_CHECK_INTERVAL` s.
+
+    Entre deux relectures, l'entrée est considérée à jour sans accès à la base.
+
+    Args:
+        db (Database): Base de données contenant la collection 'users'.
+        entry (dict): Entrée en cache (`user_id`, `version`, `checked_at`), mise à jour sur place.
+
+    Returns:
+        bool: False si les identifiants ont changé (ou si l'utilisateur n'existe plus).
+    """
+    if monotonic() - entry["checked_at"] < VERSION_CHECK_INTERVAL:
+        return True
+    if credentials_version(db, entry["user_id"]) != entry["version"]:
+        return False
+    entry["checked_at"] = monotonic()
+    return True
+
+
+def ensure_user_indexes(db):
+    """
+    Garantit l'index unique sur `username` de la collection 'users'.
+
+    La recherche d'un utilisateur devient une lecture d'index au lieu d'un parcours de
+    la collection, et deux comptes ne peuvent plus porter le même nom.
+
+    Args:
+        db (Database): Base de données contenant la collection 'users'.
+
+    Returns:
+        list: Noms des index créés ou déjà présents.
+    """
+    return db["users"].create_indexes(USER_INDEXES)
+
+
+def _authenticate(username, password, db):
+    """
+    Vérifie un couple identifiant / mot de passe, par le cache puis par la base.
+
+    Args:
+        username (str): Nom d'utilisateur fourni.
+        password (str): Mot de passe fourni (non haché).
+        db (Database): Base de données contenant la collection 'users'.
+
+    Returns:
+        dict: Entrée vérifiée (`principal`, `user_id`, `version`, `checked_at`), ou None.
+    """
+    # Hacher le mot de passe pour le comparer à celui stocké dans la base de données
+    hashed_password = hash_password(password)
+
+    # Identifiant déjà vérifié récemment, sinon recherche par nom d'utilisateur (index unique)
+    cached = _verified_users.get(username)
+    if cached is not None:
+        if compare_digest(cached["password"], hashed_password) and version_still_current(db, cached):
+            logger.debug(f"Authentification de '{username}' servie par le cache.")
+            return cached
+        _verified_users.discard(username)  # Mot de passe différent ou identifiants modifiés depuis
+
+    user = db["users"].find_one({"username": username}, {"username": 1, "password": 1, "role": 1, VERSION_FIELD: 1})
+    if not user or not compare_digest(user.get("password", ""), hashed_password):
+        return None
+    entry = {
+        "password": hashed_password,
+        "principal": {"username": user["username"], "role": user["role"]},
+        "user_id": user["_id"],
+        "version": user.get(VERSION_FIELD, 0),
+        "checked_at": monotonic(),
+    }
+    _verified_users.put(username, username, entry)
+    logger.success(f"Authentification réussie pour l'utilisateur '{username}'.")
+    return entry
+
 
 def authenticate_user(username, password, db):
     """
@@ -7,8 +220,11 @@ def authenticate_user(username, password, db):
 
     Étapes principales :
     1. Hachage du mot de passe entré par l'utilisateur.
-    2. Recherche d'un utilisateur correspondant dans la collection 'users' de la base de données MongoDB.
-    3. Retourne les informations de l'utilisateur si elles sont valides, sinon enregistre une erreur et retourne None.
+    2. Comparaison avec l'identifiant déjà vérifié en cache, s'il est encore valable et que la
+       version de ses identifiants n'a pas changé (relue au plus toutes les
+       `VERSION_CHECK_INTERVAL` secondes) ; sinon, recherche de l'utilisateur par son nom
+       (index unique) dans la collection 'users'.
+    3. Retourne l'utilisateur (nom et rôle) si le mot de passe est valide, sinon enregistre une erreur et retourne None.
 
     Args:
         username (str): Nom d'utilisateur fourni.
@@ -16,18 +232,86 @@ def authenticate_user(username, password, db):
         db (Database): Instance de la base de données MongoDB où se trouve la collection 'users'.
 
     Returns:
-        dict: Informations sur l'utilisateur si l'authentification réussit, sinon None.
+        dict: Utilisateur authentifié (`username`, `role`) si l'authentification réussit, sinon None.
     """
+    entry = _authenticate(username, password, db)
+    if entry is None:  # Si aucun utilisateur ne correspond
+        logger.error("Échec de l'authentification. Identifiant ou mot de passe incorrect.")
+        return None  # Retourne None pour indiquer que l'authentification a échoué
+    return dict(entry["principal"])  # Retourne le nom et le rôle de l'utilisateur
 
-    # Étape 1 : Hacher le mot de passe pour le comparer à celui stocké dans la base de données
-    hashed_password = hash_password(password)
 
-    # Étape 2 : Rechercher dans la base de données un utilisateur correspondant au nom d'utilisateur et au mot de passe haché
-    user = db["users"].find_one({"username": username, "password": hashed_password})
+def open_session(username, password, db):
+    """
+    Authentifie un utilisateur et ouvre une session identifiée par un jeton.
+
+    Args:
+        username (str): Nom d'utilisateur fourni.
+        password (str): Mot de passe fourni (non haché).
+        db (Database): Base de données contenant la collection 'users'.
 
-    if user:  # Si un utilisateur correspondant est trouvé
-        logger.success(f"Authentification réussie pour l'utilisateur '{username}'.")
-        return user  # Retourne les informations de l'utilisateur
-    else:  # Si aucun utilisateur ne correspond
+    Returns:
+        str: Jeton de session (à présenter à `authenticate_token`), ou None si l'authentification échoue.
+    """
+    entry = _authenticate(username, password, db)
+    if entry is None:
         logger.error("Échec de l'authentification. Identifiant ou mot de passe incorrect.")
-        return None  # Retourne None pour indiquer que l'authentification a échoué
+        return None
+    token = secrets.token_urlsafe(32)
+    session = {key: entry[key] for key in ("principal", "user_id", "version")}
+    session["checked_at"] = monotonic()
+    _sessions.put(token, entry["principal"]["username"], session)
+    logger.info(f"Session ouverte pour l'utilisateur '{username}' (valable {SESSION_TTL:.0f} s).")
+    return token
+
+
+def authenticate_token(token, db):
+    """
+    Retrouve l'utilisateur d'une session ouverte.
+
+    Aucun hachage ni recherche par nom : seule la version des identifiants est relue, au
+    plus toutes les `VERSION_CHECK_INTERVAL` secondes (lecture ponctuelle par `_id`). Si le
+    mot de passe ou le rôle a changé depuis l'ouverture de la session, dans ce processus
+    ou dans un autre, la session est fermée dans ce délai.
+
+    Args:
+        token (str): Jeton renvoyé par `open_session`.
+        db (Database): Base de données contenant la collection 'users'.
+
+    Returns:
+        dict: Utilisateur de la session (`username`, `role`), ou None si le jeton est inconnu,
+            expiré ou révoqué, ou si les identifiants de l'utilisateur ont changé.
+    """
+    session = _sessions.get(token)
+    if session is None:
+        return None
+    if not version_still_current(db, session):
+        _sessions.discard(token)
+        logger.info(f"Session de '{session['principal']['username']}' fermée : identifiants modifiés depuis son ouverture.")
+        return None
+    return dict(session["principal"])
+
+
+def close_session(token):
+    """Ferme une session (déconnexion)."""
+    _sessions.discard(token)
+
+
+def invalidate_user(username):
+    """
+    Révoque les sessions et l'identifiant vérifié en cache d'un utilisateur, dans ce processus.
+
+    Les modifications faites par un autre processus n'ont pas besoin de cet appel : elles
+    incrémentent la version des identifiants (voir `initialize_users.initialize_user_collection`),
+    relue au plus toutes les `VERSION_CHECK_INTERVAL` secondes par les entrées en cache.
+
+    Args:
+        username (str): Nom d'utilisateur.
+
+    Returns:
+        int: Nombre d'entrées révoquées.
+    """
+    revoked = _sessions.invalidate_user(username) + _verified_users.invalidate_user(username)
+    if revoked:
+        logger.info(f"{revoked} entrée(s) d'authentification révoquée(s) pour l'utilisateur '{username}'.")
+    return revoked
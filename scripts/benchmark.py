@@ -0,0 +1,557 @@
+# === Importation des bibliothèques nécessaires ===
+import json  # Écriture des résultats de mesure
+import os  # Manipulation des chemins et des fichiers
+import platform  # Version de Python enregistrée avec les résultats
+import subprocess  # Lecture du commit git mesuré
+import sys  # Interactions système
+import tempfile  # Répertoire de travail des fichiers générés
+from argparse import ArgumentParser  # Analyse des arguments en ligne de commande
+from datetime import datetime, timezone  # Horodatage des résultats
+from time import perf_counter  # Mesure des durées
+import numpy as np  # Génération vectorisée des données synthétiques
+import pandas as pd  # Manipulation des DataFrames
+import pymongo  # Version du pilote enregistrée avec les résultats
+from loguru import logger  # Gestion des logs
+from documents import records_from_dataframe  # Conversion typée des lignes en documents MongoDB
+from utils import (
+    connect_to_mongodb,
+    create_indexes,
+    drop_secondary_indexes,
+    iter_dataframes,
+    iter_record_batches,
+    load_data,
+    INSERT_BATCH_SIZE,
+    MONGO_URI,
+)  # Connexion, index et lecture des fichiers CSV ou Parquet
+from crud import (
+    insert_records,
+    read_records,
+    iter_pages,
+    update_records,
+    bulk_mutate,
+    delete_records,
+    export_to_csv,
+    export_path_for,
+    INSERT_WORKERS,
+)  # Opérations CRUD mesurées
+from data_processing import process_in_chunks  # Nettoyage en streaming (validation, normalisation, dédoublonnage)
+
+# === Configuration des logs ===
+LOG_FILE = "logs/benchmark.log"  # Chemin du fichier de log
+logger.add(LOG_FILE, level="INFO", rotation="1 MB", compression="zip")
+
+# === Paramètres par défaut ===
+DEFAULT_INPUT = "data/processed/healthcare_dataset_cleaned.parquet"  # Fichier nettoyé produit par data_processing
+DEFAULT_REPEAT = 3  # Nombre de mesures par méthode (la meilleure est retenue)
+
+# === Paramètres de la suite de mesures ===
+RESULTS_DIR = "outputs/benchmarks"  # Répertoire des résultats (un fichier JSON par exécution et par taille)
+BENCHMARK_DATABASE = "benchmark_database"  # Base dédiée aux mesures (jamais la base applicative)
+BENCHMARK_COLLECTION = "patients_benchmark"  # Collection vidée au début et à la fin de chaque mesure
+BENCHMARK_EXPORT = "benchmark_export"  # Fichier exporté (supprimé après la mesure)
+BACKENDS = ("mongodb", "mongomock")  # Serveur MongoDB réel, ou MongoDB simulé en mémoire (mongomock)
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}  # Suffixes acceptés pour les tailles (10k, 1M, ...)
+DEFAULT_SIZES = "10k,100k"  # Tailles mesurées par défaut
+DEFAULT_SEED = 42  # Graine du générateur : mêmes données d'une exécution à l'autre
+GENERATOR_CHUNK_ROWS = 1_000_000  # Lignes générées et écrites par bloc (mémoire bornée jusqu'à 10M lignes)
+DIRTY_FRACTION = 0.02  # Part des lignes altérées par règle de nettoyage
+DUPLICATE_FRACTION = 0.01  # Part des lignes remplacées par une copie d'une autre ligne
+READ_QUERIES = 50  # Nombre de lectures filtrées mesurées
+READ_LIMIT = 100  # Documents retournés au plus par lecture filtrée
+PAGE_COUNT = 10  # Pages lues lors de la mesure de la pagination
+REGRESSION_THRESHOLD = 1.10  # Ralentissement signalé lors d'une comparaison (10 %)
+
+# === Valeurs du jeu de données synthétique (mêmes colonnes et valeurs que le dataset Kaggle) ===
+FIRST_NAMES = [
+    "Bobby", "Leslie", "Danny", "Andrew", "Adrienne", "Emily", "Edward", "Christina", "Jasmine", "Christopher",
+    "Michelle", "Aaron", "Connor", "Robert", "Kathleen", "Natalie", "Haley", "Jamie", "Luke", "Daniel",
+]
+LAST_NAMES = [
+    "Jackson", "Terry", "Smith", "Watts", "Bell", "Harris", "Edwards", "Martin", "Palmer", "Hernandez",
+    "Mills", "Martinez", "Hanson", "Jones", "Moore", "Roberts", "Baker", "Gonzalez", "Miller", "Wilson",
+]
+HOSPITAL_SUFFIXES = ["Ltd", "Inc", "Group", "PLC", "LLC", "and Sons"]
+GENDERS = ["Male", "Female"]
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"]
+MEDICAL_CONDITIONS = ["Cancer", "Obesity", "Diabetes", "Asthma", "Hypertension", "Arthritis"]
+INSURANCE_PROVIDERS = ["Blue Cross", "Medicare", "Aetna", "UnitedHealthcare", "Cigna"]
+ADMISSION_TYPES = ["Urgent", "Emergency", "Elective"]
+MEDICATIONS = ["Paracetamol", "Ibuprofen", "Aspirin", "Penicillin", "Lipitor"]
+TEST_RESULTS = ["Normal", "Abnormal", "Inconclusive"]
+ADMISSION_START = np.datetime64("2019-05-01")  # Première date d'admission générée
+ADMISSION_DAYS = 5 * 365  # Étendue des dates d'admission (jours)
+MAX_STAY_DAYS = 30  # Durée maximale d'un séjour (jours)
+
+
+def legacy_records(df):
+    """
+    Conversion historique : `to_dict(orient="records")` (NaN conservés, dates non converties).
+
+    Args:
+        df (DataFrame): Lot de données.
+
+    Returns:
+        list: Documents (dictionnaires).
+    """
+    return df.to_dict(orient="records")
+
+
+def time_conversion(convert, df, repeat=DEFAULT_REPEAT):
+    """
+    Mesure le débit d'une fonction de conversion DataFrame -> documents.
+
+    Args:
+        convert (callable): Fonction de conversion.
+        df (DataFrame): Données à convertir.
+        repeat (int): Nombre de mesures ; la plus rapide est retenue.
+
+    Returns:
+        dict: Durée (s) et débit (documents/s) de la meilleure mesure.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started_at = perf_counter()
+        convert(df.copy(deep=False))
+        best = min(best, perf_counter() - started_at)
+    return {"seconds": best, "docs_per_sec": len(df) / best if best else 0}
+
+
+def benchmark_conversion(df, repeat=DEFAULT_REPEAT):
+    """
+    Compare la conversion historique et `documents.records_from_dataframe`.
+
+    Args:
+        df (DataFrame): Données nettoyées à convertir.
+        repeat (int): Nombre de mesures par méthode.
+
+    Returns:
+        dict: Résultats par méthode et facteur d'accélération.
+    """
+    results = {
+        "to_dict": time_conversion(legacy_records, df, repeat),
+        "records_from_dataframe": time_conversion(records_from_dataframe, df, repeat),
+    }
+    for method, result in results.items():
+        logger.info(f"{method} : {len(df)} documents en {result['seconds']:.3f} s ({result['docs_per_sec']:,.0f} docs/s).")
+    speedup = results["to_dict"]["seconds"] / results["records_from_dataframe"]["seconds"]
+    logger.info(f"Accélération de la conversion : x{speedup:.1f}.")
+    results["speedup"] = speedup
+    return results
+
+
+# === Génération des données synthétiques ===
+def parse_size(size):
+    """
+    Convertit une taille de jeu de données en nombre de lignes (ex : "10k" -> 10000, "1M" -> 1000000).
+
+    Args:
+        size (str): Nombre de lignes, avec un suffixe `k` ou `M` facultatif.
+
+    Returns:
+        int: Nombre de lignes.
+
+    Raises:
+        ValueError: Si la taille n'est pas reconnue.
+    """
+    text = size.strip().lower().replace("_", "")
+    multiplier = SIZE_SUFFIXES.get(text[-1:], 1)
+    number = text[:-1] if text[-1:] in SIZE_SUFFIXES else text
+    try:
+        rows = int(float(number) * multiplier)
+    except ValueError:
+        raise ValueError(f"Taille de jeu de données invalide : '{size}'.") from None
+    if rows <= 0:
+        raise ValueError(f"Taille de jeu de données invalide : '{size}'.")
+    return rows
+
+
+def generate_patients(rows, seed=DEFAULT_SEED, dirty_fraction=DIRTY_FRACTION, duplicate_fraction=DUPLICATE_FRACTION):
+    """
+    Génère des patients synthétiques au format du fichier brut (colonnes et valeurs du dataset Kaggle).
+
+    Toutes les colonnes sont tirées en une seule passe vectorisée, sans boucle par ligne.
+    Comme dans le dataset d'origine, les noms ont une casse irrégulière ; une part
+    `dirty_fraction` des lignes est en outre altérée pour chaque règle de nettoyage (âge
+    hors plage, genre inconnu, montant négatif, date illisible, sortie antérieure à
+    l'admission, espaces superflus) et une part `duplicate_fraction` est remplacée par
+    la copie d'une autre ligne. Le nettoyage a donc le même travail à faire que sur les
+    données réelles. La même graine produit toujours les mêmes données.
+
+    Args:
+        rows (int): Nombre de lignes.
+        seed (int | SeedSequence): Graine du générateur.
+        dirty_fraction (float): Part des lignes altérées pour chaque règle.
+        duplicate_fraction (float): Part des lignes dupliquées.
+
+    Returns:
+        DataFrame: Données brutes, avec les noms de colonnes d'origine.
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+    def dirty():
+        return rng.random(rows) < dirty_fraction
+
+    # Noms à la casse irrégulière (normalisés par le nettoyage), médecins et hôpitaux
+    full_names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    names = full_names + [name.upper() for name in full_names] + [name.swapcase() for name in full_names]
+    hospitals = [f"{last} {suffix}" for last in LAST_NAMES for suffix in HOSPITAL_SUFFIXES]
+
+    admission = ADMISSION_START + rng.integers(0, ADMISSION_DAYS, rows).astype("timedelta64[D]")
+    stay = rng.integers(1, MAX_STAY_DAYS + 1, rows).astype("timedelta64[D]")
+    discharge = np.where(dirty(), admission - stay, admission + stay)  # Sortie antérieure à l'admission
+
+    columns = {
+        "Name": pick(names),
+        "Age": rng.integers(13, 90, rows),
+        "Gender": pick(GENDERS),
+        "Blood Type": pick(BLOOD_TYPES),
+        "Medical Condition": pick(MEDICAL_CONDITIONS),
+        "Date of Admission": np.datetime_as_string(admission, unit="D").astype(object),
+        "Doctor": pick(full_names),
+        "Hospital": pick(hospitals),
+        "Insurance Provider": pick(INSURANCE_PROVIDERS),
+        "Billing Amount": rng.uniform(1_000, 50_000, rows).round(6),
+        "Room Number": rng.integers(101, 500, rows),
+        "Admission Type": pick(ADMISSION_TYPES),
+        "Discharge Date": np.datetime_as_string(discharge, unit="D").astype(object),
+        "Medication": pick(MEDICATIONS),
+        "Test Results": pick(TEST_RESULTS),
+    }
+
+    # Valeurs à rejeter ou à signaler par les règles de `schema.HEALTHCARE_SCHEMA`
+    columns["Age"][dirty()] = 150
+    columns["Gender"][dirty()] = "Unknown"
+    columns["Billing Amount"][dirty()] *= -1
+    columns["Date of Admission"][dirty()] = "not a date"
+    padded = dirty()
+    columns["Hospital"][padded] = "  " + columns["Hospital"][padded] + " "
+
+    # Doublons exacts : des lignes tirées au hasard recopiées sur d'autres
+    duplicates = int(rows * duplicate_fraction)
+    if duplicates:
+        targets = rng.choice(rows, duplicates, replace=False)
+        sources = rng.integers(0, rows, duplicates)
+        for values in columns.values():
+            values[targets] = values[sources]
+
+    return pd.DataFrame(columns)
+
+
+def write_patients_csv(path, rows, seed=DEFAULT_SEED, chunk_rows=GENERATOR_CHUNK_ROWS):
+    """
+    Écrit un fichier CSV brut de patients synthétiques, bloc par bloc.
+
+    Chaque bloc a son propre générateur, dérivé de la graine : la mémoire reste
+    proportionnelle à `chunk_rows` quelle que soit la taille du fichier, et le contenu ne
+    dépend que de la graine et de la taille des blocs. Les doublons sont tirés à
+    l'intérieur de chaque bloc.
+
+    Args:
+        path (str): Chemin du fichier CSV.
+        rows (int): Nombre total de lignes.
+        seed (int): Graine du générateur.
+        chunk_rows (int): Nombre de lignes par bloc.
+
+    Returns:
+        int: Taille du fichier écrit (octets).
+    """
+    chunks = -(-rows // chunk_rows)
+    for index, chunk_seed in enumerate(np.random.SeedSequence(seed).spawn(chunks)):
+        size = min(chunk_rows, rows - index * chunk_rows)
+        generate_patients(size, chunk_seed).to_csv(path, mode="w" if index == 0 else "a", header=index == 0, index=False)
+    return os.path.getsize(path)
+
+
+# === Suite de mesures de bout en bout ===
+def git_commit():
+    """
+    Retourne le commit git courant (abrégé), pour comparer les mesures d'un commit à l'autre.
+
+    Returns:
+        str: Identifiant du commit, ou None hors d'un dépôt git.
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def open_benchmark_collection(backend, uri=None):
+    """
+    Ouvre la collection de mesure, vidée, sur le backend choisi.
+
+    `mongomock` est une dépendance facultative, importée seulement si ce backend est
+    demandé. Ses durées ne sont pas comparables à celles d'un serveur réel : il sert à
+    vérifier la suite et à comparer des commits sans serveur MongoDB.
+
+    Args:
+        backend (str): "mongodb" (serveur désigné par `uri`) ou "mongomock".
+        uri (str, optional): URI du serveur MongoDB (par défaut : `MONGO_URI`).
+
+    Returns:
+        Collection: Collection vide.
+
+    Raises:
+        ValueError: Si le backend est inconnu.
+        ImportError: Si mongomock est demandé sans être installé.
+    """
+    if backend == "mongomock":
+        import mongomock  # Dépendance facultative : MongoDB simulé en mémoire
+
+        db = mongomock.MongoClient()[BENCHMARK_DATABASE]
+    elif backend == "mongodb":
+        db = connect_to_mongodb(uri or MONGO_URI, BENCHMARK_DATABASE)
+    else:
+        raise ValueError(f"Backend inconnu : '{backend}' (attendu : {', '.join(BACKENDS)}).")
+    collection = db[BENCHMARK_COLLECTION]
+    collection.drop()
+    return collection
+
+
+def record_stage(stages, stage, seconds, rows):
+    """
+    Enregistre la durée et le débit d'une étape, et les affiche.
+
+    Args:
+        stages (dict): Résultats par étape, complétés sur place.
+        stage (str): Nom de l'étape.
+        seconds (float): Durée de l'étape.
+        rows (int): Nombre de lignes ou de documents traités.
+    """
+    stages[stage] = {"seconds": seconds, "rows": rows, "rows_per_sec": rows / seconds if seconds else 0}
+    logger.info(f"{stage} : {rows} lignes en {seconds:.3f} s ({stages[stage]['rows_per_sec']:,.0f} lignes/s).")
+
+
+def run_suite(
+    rows,
+    backend="mongodb",
+    uri=None,
+    seed=DEFAULT_SEED,
+    batch_size=INSERT_BATCH_SIZE,
+    workers=INSERT_WORKERS,
+    work_dir=None,
+):
+    """
+    Mesure chaque étape de la chaîne sur un jeu de données synthétique de `rows` lignes.
+
+    Étapes mesurées, dans l'ordre de la chaîne : génération du fichier brut, nettoyage
+    en streaming (`process_in_chunks`), chargement en mémoire (`load_data`), insertion par
+    lots (`iter_record_batches` + `insert_records`), construction des index, lectures
+    filtrées et paginées, mises à jour (groupées et `update_many`), suppression et export
+    CSV. Les fichiers générés sont écrits dans un répertoire temporaire et la collection
+    de mesure est supprimée à la fin.
+
+    Args:
+        rows (int): Nombre de lignes générées.
+        backend (str): "mongodb" ou "mongomock" (voir `open_benchmark_collection`).
+        uri (str, optional): URI du serveur MongoDB.
+        seed (int): Graine du générateur.
+        batch_size (int): Nombre de documents par lot d'insertion.
+        workers (int): Nombre de lots insérés en parallèle.
+        work_dir (str, optional): Répertoire des fichiers générés (temporaire par défaut).
+
+    Returns:
+        dict: Contexte de la mesure (commit, versions, backend, taille) et résultats par étape.
+    """
+    stages = {}
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "backend": backend,
+        "rows": rows,
+        "seed": seed,
+        "batch_size": batch_size,
+        "workers": workers,
+        "versions": {"python": platform.python_version(), "pandas": pd.__version__, "pymongo": pymongo.version},
+        "stages": stages,
+    }
+    logger.info(f"=== Mesure de la chaîne sur {rows} lignes synthétiques (backend : {backend}) ===")
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_", dir=work_dir) as directory:
+        raw_path = os.path.join(directory, "patients_raw.csv")
+        cleaned_path = os.path.join(directory, "patients_cleaned.parquet")
+
+        # Génération du fichier brut
+        started_at = perf_counter()
+        results["raw_bytes"] = write_patients_csv(raw_path, rows, seed)
+        record_stage(stages, "generate", perf_counter() - started_at, rows)
+
+        # Nettoyage : validation, normalisation et dédoublonnage
+        started_at = perf_counter()
+        cleaning = process_in_chunks(raw_path, cleaned_path)
+        record_stage(stages, "clean", perf_counter() - started_at, rows)
+        results["cleaning"] = {key: cleaning[key] for key in ("rows_read", "rows_rejected", "duplicates")}
+
+        # Chargement complet en mémoire
+        started_at = perf_counter()
+        loaded = len(load_data(cleaned_path))
+        record_stage(stages, "load_data", perf_counter() - started_at, loaded)
+
+        collection = open_benchmark_collection(backend, uri)
+        try:
+            # Insertion par lots, index secondaires absents (comme dans main.py)
+            drop_secondary_indexes(collection)
+            started_at = perf_counter()
+            inserted = insert_records(collection, iter_record_batches(cleaned_path, batch_size), workers=workers)
+            record_stage(stages, "insert", perf_counter() - started_at, inserted)
+
+            started_at = perf_counter()
+            create_indexes(collection)
+            record_stage(stages, "create_indexes", perf_counter() - started_at, inserted)
+
+            # Lectures filtrées sur des champs indexés
+            started_at = perf_counter()
+            read = 0
+            for index in range(READ_QUERIES):
+                query = {
+                    "medical_condition": MEDICAL_CONDITIONS[index % len(MEDICAL_CONDITIONS)],
+                    "age": {"$gte": 20 + index % 50},
+                }
+                read += len(read_records(collection, query, limit=READ_LIMIT))
+            record_stage(stages, "read_filtered", perf_counter() - started_at, read)
+
+            # Pagination par clé (tri par date d'admission décroissante)
+            started_at = perf_counter()
+            paged = 0
+            pages = iter_pages(collection, {"medical_condition": MEDICAL_CONDITIONS[0]}, sort_field="date_of_admission",
+                               descending=True)
+            for _, (page, _) in zip(range(PAGE_COUNT), pages):
+                paged += len(page)
+            record_stage(stages, "read_pages", perf_counter() - started_at, paged)
+
+            # Mises à jour : une opération groupée par pathologie, puis une mise à jour multiple
+            started_at = perf_counter()
+            operations = [
+                {"filter": {"medical_condition": condition}, "update": {"$inc": {"billing_amount": 1.0}}, "many": True}
+                for condition in MEDICAL_CONDITIONS
+            ]
+            report = bulk_mutate(collection, operations)
+            record_stage(stages, "update_bulk", perf_counter() - started_at, report["modified"])
+
+            started_at = perf_counter()
+            modified = update_records(collection, {"admission_type": "Urgent"}, {"$set": {"test_results": "Normal"}})
+            record_stage(stages, "update_many", perf_counter() - started_at, modified)
+
+            # Suppression d'un sous-ensemble
+            started_at = perf_counter()
+            deleted = delete_records(collection, {"medication": "Aspirin", "admission_type": "Elective"})
+            record_stage(stages, "delete", perf_counter() - started_at, deleted)
+
+            # Export CSV en flux de la collection restante
+            started_at = perf_counter()
+            exported = export_to_csv(collection, BENCHMARK_EXPORT)
+            record_stage(stages, "export_csv", perf_counter() - started_at, exported)
+            results["export_bytes"] = os.path.getsize(export_path_for(BENCHMARK_EXPORT))
+        finally:
+            collection.drop()
+            if os.path.exists(export_path_for(BENCHMARK_EXPORT)):
+                os.remove(export_path_for(BENCHMARK_EXPORT))
+
+    results["total_seconds"] = sum(stage["seconds"] for stage in stages.values())
+    logger.success(f"Mesure terminée sur {rows} lignes en {results['total_seconds']:.2f} s.")
+    return results
+
+
+def save_results(results, output_dir=RESULTS_DIR):
+    """
+    Enregistre les résultats d'une mesure dans un fichier JSON.
+
+    Le nom du fichier porte l'horodatage, le commit, la taille et le backend, pour
+    conserver l'historique des mesures d'un commit à l'autre.
+
+    Args:
+        results (dict): Résultats de `run_suite`.
+        output_dir (str): Répertoire des résultats.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(output_dir, f"{stamp}_{results['commit'] or 'nocommit'}_{results['rows']}_{results['backend']}.json")
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2, default=str)
+    logger.info(f"Résultats enregistrés dans {path}.")
+    return path
+
+
+def compare_results(previous, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare deux mesures étape par étape et signale les ralentissements.
+
+    Args:
+        previous (dict): Résultats de référence (ex : commit précédent).
+        current (dict): Nouveaux résultats.
+        threshold (float): Rapport de durées au-delà duquel une étape est signalée.
+
+    Returns:
+        dict: Rapport de durées (nouvelle / référence) par étape commune.
+    """
+    if (previous["rows"], previous["backend"]) != (current["rows"], current["backend"]):
+        logger.warning("Les mesures comparées n'ont pas la même taille ou le même backend.")
+    ratios = {}
+    for stage, result in current["stages"].items():
+        reference = previous["stages"].get(stage)
+        if not reference or not reference["seconds"]:
+            continue
+        ratios[stage] = result["seconds"] / reference["seconds"]
+        message = f"{stage} : x{ratios[stage]:.2f} par rapport au commit {previous.get('commit')}."
+        if ratios[stage] > threshold:
+            logger.warning(f"Ralentissement — {message}")
+        else:
+            logger.info(message)
+    return ratios
+
+
+# === Programme principal ===
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Mesure des performances de la chaîne de chargement")
+    parser.add_argument("file_path", nargs="?", default=DEFAULT_INPUT, help="Fichier nettoyé (CSV ou Parquet).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Nombre de mesures par méthode.")
+    parser.add_argument(
+        "--suite",
+        action="store_true",
+        help="Mesure chaque étape de la chaîne sur des données synthétiques (au lieu de la seule conversion).",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Tailles mesurées, séparées par des virgules (ex : 10k,100k,1M,10M ; par défaut : {DEFAULT_SIZES}).",
+    )
+    parser.add_argument("--backend", choices=BACKENDS, default="mongodb", help="Serveur MongoDB ou mongomock.")
+    parser.add_argument("--uri", default=None, help="URI du serveur MongoDB (par défaut : MONGO_URI).")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Graine du générateur de données.")
+    parser.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE, help="Documents par lot d'insertion.")
+    parser.add_argument("--insert-workers", type=int, default=INSERT_WORKERS, help="Lots insérés en parallèle.")
+    parser.add_argument("--work-dir", default=None, help="Répertoire des fichiers générés (temporaire par défaut).")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help=f"Répertoire des résultats (par défaut : {RESULTS_DIR}).")
+    parser.add_argument("--compare", default=None, help="Résultats JSON de référence à comparer (une seule taille).")
+    args = parser.parse_args()
+
+    try:
+        if args.suite:
+            for size in args.sizes.split(","):
+                results = run_suite(
+                    parse_size(size),
+                    backend=args.backend,
+                    uri=args.uri,
+                    seed=args.seed,
+                    batch_size=args.batch_size,
+                    workers=args.insert_workers,
+                    work_dir=args.work_dir,
+                )
+                save_results(results, args.output_dir)
+                if args.compare:
+                    with open(args.compare, encoding="utf-8") as handle:
+                        compare_results(json.load(handle), results)
+        else:
+            df = pd.concat(iter_dataframes(args.file_path), ignore_index=True)
+            logger.info(f"Données chargées pour la mesure : {len(df)} lignes depuis {args.file_path}.")
+            benchmark_conversion(df, args.repeat)
+    except Exception as e:
+        logger.error(f"Erreur lors de la mesure : {e}")
+        sys.exit(1)
@@ -0,0 +1,240 @@
+# === Importation des bibliothèques nécessaires ===
+import os  # Interaction avec le système de fichiers
+import json  # Lecture et écriture du point de reprise
+from pathlib import Path  # Manipulation des chemins
+from time import perf_counter, time  # Mesure des durées et horodatage
+from loguru import logger  # Gestion des logs
+from crud import INSERT_WORKERS, bulk_insert  # Chargement en masse par lots
+from utils import INSERT_BATCH_SIZE, iter_record_batches  # Lecture du fichier par lots de documents
+
+# === Paramètres de reprise ===
+CHECKPOINT_DIR = os.getenv("LOAD_CHECKPOINT_DIR", "data/checkpoints")  # Répertoire des points de reprise
+
+
+def checkpoint_path_for(collection_name, checkpoint_dir=CHECKPOINT_DIR):
+    """
+    Construit le chemin du point de reprise associé à une collection.
+
+    Args:
+        collection_name (str): Nom de la collection cible.
+        checkpoint_dir (str): Répertoire des points de reprise.
+
+    Returns:
+        str: Chemin du fichier JSON (ex : `data/checkpoints/patients_data.json`).
+    """
+    return str(Path(checkpoint_dir) / f"{collection_name}.json")
+
+
+class LoadCheckpoint:
+    """
+    Point de reprise d'un chargement par lots, enregistré dans un fichier JSON.
+
+    Les lots se terminent dans le désordre (insertion parallèle) : seul le préfixe
+    contigu de lots terminés est enregistré, de sorte qu'aucun lot non écrit ne
+    soit jamais sauté à la reprise. Le point de reprise n'est valable que pour le
+    même fichier (taille et date de modification), la même taille de lot et la
+    même clé d'identifiants.
+
+    Args:
+        path (str): Chemin du fichier JSON.
+        source_path (str): Fichier en cours de chargement.
+        batch_size (int): Nombre de documents par lot.
+        id_columns (list, optional): Clé naturelle utilisée pour les `_id`.
+    """
+
+    def __init__(self, path, source_path, batch_size, id_columns=None):
+        self.path = path
+        stat = os.stat(source_path)
+        self.identity = {
+            "source": str(source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "batch_size": batch_size,
+            "id_columns": id_columns,
+        }
+        self.committed_batches = 0  # Nombre de lots du préfixe contigu terminé
+        self.documents = 0  # Documents écrits par les lots du préfixe
+        self.completed = False
+        self._done = {}  # Lots terminés hors préfixe : index -> nombre de documents
+
+    def load(self):
+        """
+        Relit le point de reprise s'il correspond au chargement en cours.
+
+        Returns:
+            bool: True si un point de reprise valable a été trouvé.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if state.get("identity") != self.identity:
+            logger.warning(f"Point de reprise ignoré (fichier ou paramètres différents) : {self.path}")
+            return False
+        self.committed_batches = state["committed_batches"]
+        self.documents = state["documents"]
+        self.completed = state["completed"]
+        return True
+
+    def save(self):
+        """Enregistre le point de reprise de manière atomique (fichier temporaire puis renommage)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "identity": self.identity,
+                "committed_batches": self.committed_batches,
+                "documents": self.documents,
+                "completed": self.completed,
+                "updated": time(),
+            }, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def mark_done(self, batch_index, documents):
+        """
+        Signale un lot terminé et avance le préfixe contigu si possible.
+
+        Args:
+            batch_index (int): Index absolu du lot dans le fichier.
+            documents (int): Nombre de documents écrits par le lot.
+        """
+        self._done[batch_index] = documents
+        advanced = False
+        while self.committed_batches in self._done:
+            self.documents += self._done.pop(self.committed_batches)
+            self.committed_batches += 1
+            advanced = True
+        if advanced:
+            self.save()
+
+    def complete(self):
+        """Marque le chargement comme terminé."""
+        self.completed = True
+        self.save()
+
+
+def load_completed(checkpoint_path, file_path, batch_size=INSERT_BATCH_SIZE, id_columns=None):
+    """
+    Indique si le point de reprise marque déjà terminé le chargement de ce fichier.
+
+    Dans ce cas, `resumable_load(resume=True)` rend la main sans rien écrire.
+
+    Args:
+        checkpoint_path (str): Chemin du point de reprise (voir `checkpoint_path_for`).
+        file_path (str): Fichier CSV ou Parquet nettoyé.
+        batch_size (int): Nombre de documents par lot.
+        id_columns (list, optional): Clé naturelle des `_id`.
+
+    Returns:
+        bool: True si le chargement est terminé d'après le point de reprise.
+    """
+    checkpoint = LoadCheckpoint(checkpoint_path, file_path, batch_size, id_columns)
+    return checkpoint.load() and checkpoint.completed
+
+
+def batch_fully_written(report):
+    """
+    Indique si tous les documents d'un lot sont présents dans la collection après son écriture.
+
+    Les doublons sont des documents dont l'`_id` (seule clé unique de la collection) existe
+    déjà : ils sont présents et rejouer le lot n'y changerait rien. Un document refusé par
+    le validateur ou pour une autre erreur n'a pas été écrit : le lot doit être rejoué.
+
+    Args:
+        report (dict): Compteurs du lot (voir `crud.insert_batch`).
+
+    Returns:
+        bool: True si le lot peut être validé dans le point de reprise.
+    """
+    return not report["validation_errors"] and not report["other_errors"]
+
+
+def resumable_load(
+    collection,
+    file_path,
+    checkpoint_path,
+    resume=False,
+    batch_size=INSERT_BATCH_SIZE,
+    workers=INSERT_WORKERS,
+    id_columns=None,
+    compact=False,
+):
+    """
+    Charge un fichier dans MongoDB par lots, en enregistrant un point de reprise.
+
+    Chaque document reçoit un `_id` déterministe (clé naturelle ou empreinte de la ligne).
+    En reprise, les lots déjà validés sont sautés sans être convertis et les lots
+    suivants sont écrits par remplacement idempotent (upsert) : un lot partiellement
+    écrit avant l'interruption peut être rejoué sans créer de doublons.
+
+    Un lot dont des documents ont été refusés (validation ou autre erreur) n'est pas
+    validé : le préfixe enregistré s'arrête avant lui, le chargement n'est pas marqué
+    terminé et une reprise rejoue ce lot et les suivants.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        file_path (str): Fichier CSV ou Parquet nettoyé.
+        checkpoint_path (str): Chemin du point de reprise (voir `checkpoint_path_for`).
+        resume (bool): Reprend le chargement depuis le point de reprise s'il est valable ;
+            sinon le chargement repart du début.
+        batch_size (int): Nombre de documents par lot.
+        workers (int): Nombre de lots écrits en parallèle.
+        id_columns (list, optional): Clé naturelle des `_id` (ligne complète par défaut).
+        compact (bool): Convertit chaque lot vers les types compacts du schéma avant la
+            conversion en documents (voir `utils.load_data`).
+
+    Returns:
+        int: Nombre total de documents écrits par le chargement (reprises comprises).
+    """
+    checkpoint = LoadCheckpoint(checkpoint_path, file_path, batch_size, id_columns)
+    resuming = resume and checkpoint.load()
+    if resuming and checkpoint.completed:
+        logger.info(f"Chargement déjà terminé d'après le point de reprise : {checkpoint.documents} documents.")
+        return checkpoint.documents
+    if resuming:
+        logger.info(
+            f"Reprise du chargement après {checkpoint.committed_batches} lots validés "
+            f"({checkpoint.documents} documents)."
+        )
+    else:
+        checkpoint.save()
+
+    started_at = perf_counter()
+    first_batch = checkpoint.committed_batches
+    batches = iter_record_batches(
+        file_path,
+        batch_size=batch_size,
+        compact=compact,
+        skip_batches=first_batch,
+        with_ids=True,
+        id_columns=id_columns,
+    )
+    failed_batches = []  # Index absolus des lots à rejouer
+
+    def on_batch(batch_index, batch_report):
+        if batch_fully_written(batch_report):
+            checkpoint.mark_done(first_batch + batch_index, batch_report["inserted"])
+        else:
+            failed_batches.append(first_batch + batch_index)
+
+    report = bulk_insert(collection, batches, workers=workers, upsert=resuming, on_batch=on_batch)
+    if failed_batches:
+        logger.error(
+            f"{len(failed_batches)} lot(s) incomplet(s) (premier : lot {min(failed_batches) + 1}) : le chargement "
+            f"n'est pas marqué terminé ; relancer avec --resume pour rejouer à partir du lot "
+            f"{checkpoint.committed_batches + 1}."
+        )
+    else:
+        checkpoint.complete()
+
+    logger.info(
+        f"{report['inserted']} documents écrits en {perf_counter() - started_at:.2f} s "
+        f"({report['batches']} lots, {report['docs_per_sec']:,.0f} docs/s) ; total : {checkpoint.documents} documents."
+    )
+    if report["duplicates"] or report["validation_errors"] or report["other_errors"]:
+        logger.warning(
+            f"Documents refusés : {report['duplicates']} doublons, {report['validation_errors']} erreurs "
+            f"de validation, {report['other_errors']} autres erreurs."
+        )
+    return checkpoint.documents
@@ -1,19 +1,348 @@
 from loguru import logger  # Gestion avancée des logs
 import pandas as pd  # Manipulation de données tabulaires
 import os  # Gestion des interactions avec le système de fichiers
+import io  # Flux texte au-dessus d'un flux compressé
+import gzip  # Compression gzip des exports
+import importlib.util  # Détection du module zstandard (compression zstd facultative)
+import shutil  # Concaténation des fichiers partiels d'un export parallèle
+from datetime import datetime, timezone  # Type des bornes de dates lors d'un export parallèle et date d'écriture des lots
+from bson import ObjectId  # Type des bornes d'identifiants lors d'un export parallèle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait  # Insertion des lots en parallèle
+from itertools import islice  # Découpage des documents en lots
+from time import perf_counter, sleep  # Mesure du débit et attente entre deux tentatives
+import base64  # Encodage des jetons de page
+from bson import json_util  # Sérialisation des jetons de page (types BSON conservés)
+from pymongo import ASCENDING, DESCENDING, DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne  # Sens de tri et opérations d'écriture groupées
+from pymongo.errors import AutoReconnect, BulkWriteError  # Erreurs transitoires et erreurs par document
+from utils import INSERT_BATCH_SIZE  # Taille des lots d'insertion
+from query_cache import cached_find, invalidate_collection, invalidate_update  # Cache des lectures et invalidation
+from metrics import instrumented, metrics_enabled, observe, track  # Métriques des opérations (durées, volumes, erreurs)
+from schema import HEALTHCARE_SCHEMA  # Colonnes exportées par défaut
+
+# === Paramètres du chargement en masse ===
+INSERT_WORKERS = int(os.getenv("MONGO_INSERT_WORKERS", 4))  # Nombre de lots insérés simultanément
+INSERT_MAX_RETRIES = 3  # Nouvelles tentatives par lot en cas d'erreur transitoire
+RETRY_BASE_DELAY = 0.5  # Délai initial entre deux tentatives (doublé à chaque fois), en secondes
+INGESTED_FIELD = "ingested_at"  # Date d'écriture de chaque document (filigrane des résumés analytiques)
+ECHO_LIMIT = 20  # Nombre maximal de documents affichés après une mise à jour
+PAGE_SIZE = 20  # Nombre de documents par page lors d'une lecture paginée
+EXPORT_DIR = "outputs"  # Répertoire des fichiers exportés
+EXPORT_BATCH_SIZE = 5_000  # Nombre de documents reçus du serveur par aller-retour lors d'un export
+EXPORT_CHUNK_SIZE = 50_000  # Nombre de lignes écrites par bloc lors d'un export
+EXPORT_WORKERS = int(os.getenv("MONGO_EXPORT_WORKERS", 4))  # Plages exportées simultanément (export parallèle)
+BSON_TYPE_ALIASES = {  # Alias MongoDB `$type` -> types Python des bornes de plages
+    "date": datetime,
+    "number": (int, float),
+    "string": str,
+    "objectId": ObjectId,
+}
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}  # Extension ajoutée selon la compression
+DUPLICATE_KEY_ERROR = 11000  # Code MongoDB : clé en double
+VALIDATION_ERROR = 121  # Code MongoDB : document refusé par le validateur de schéma
+
+# === Chargement en masse : lots non ordonnés insérés en parallèle ===
+def _batched(records, batch_size):
+    """Découpe une liste de documents en lots ; un itérable de lots est retourné tel quel."""
+    if not isinstance(records, list):
+        return records
+    iterator = iter(records)
+    return iter(lambda: list(islice(iterator, batch_size)), [])
+
+
+def tally_write_errors(report, details, written_indexes=()):
+    """
+    Ajoute au rapport d'un lot les documents écrits et les refus d'une `BulkWriteError`.
+
+    Args:
+        report (dict): Compteurs du lot (voir `insert_batch`), mis à jour sur place.
+        details (dict): Détails de l'erreur (`BulkWriteError.details`).
+        written_indexes (set): Positions dans le lot des doublons de `_id` qui correspondent
+            à des documents écrits par une tentative précédente du même lot (voir
+            `retry_written_indexes`) ; ils sont comptés comme insérés.
+
+    Returns:
+        dict: Le rapport mis à jour.
+    """
+    report["inserted"] += details.get("nInserted", 0) + details.get("nUpserted", 0) + details.get("nMatched", 0)
+    for error in details.get("writeErrors", []):
+        if error.get("code") == DUPLICATE_KEY_ERROR:
+            if error.get("index") in written_indexes:
+                report["inserted"] += 1  # Écrit lors d'une tentative précédente
+            else:
+                report["duplicates"] += 1
+        elif error.get("code") == VALIDATION_ERROR:
+            report["validation_errors"] += 1
+        else:
+            report["other_errors"] += 1
+    return report
+
+
+def retried_duplicate_ids(batch, details):
+    """
+    Doublons de `_id` d'une nouvelle tentative qui ont pu être écrits par la tentative interrompue.
+
+    Un `_id` également inséré par la tentative courante (doublon au sein du lot) est
+    exclu ; chaque `_id` n'est retenu qu'une fois.
+
+    Args:
+        batch (list): Documents du lot.
+        details (dict): Détails de l'erreur (`BulkWriteError.details`).
+
+    Returns:
+        dict: `_id` -> position dans le lot du document correspondant.
+    """
+    errors = details.get("writeErrors", [])
+    failed = {error.get("index") for error in errors}
+    inserted_now = {record["_id"] for index, record in enumerate(batch) if index not in failed}
+    candidates = {}
+    for error in errors:
+        if error.get("code") == DUPLICATE_KEY_ERROR and error.get("keyPattern") == {"_id": 1}:
+            record_id = batch[error["index"]]["_id"]
+            if record_id not in inserted_now:
+                candidates.setdefault(record_id, error["index"])
+    return candidates
+
+
+def retry_written_indexes(batch, candidates, stored):
+    """
+    Positions des doublons de `_id` écrits par une tentative précédente du même lot.
+
+    Un document stocké a été écrit par ce lot si sa date d'écriture (`ingested_at`,
+    posée une fois par lot) est celle du lot ; sinon, il existait déjà et le document
+    du lot est un vrai doublon.
+
+    Args:
+        batch (list): Documents du lot.
+        candidates (dict): `_id` -> position dans le lot (voir `retried_duplicate_ids`).
+        stored (iterable): Documents stockés de ces `_id` (projection sur `ingested_at`).
+
+    Returns:
+        set: Positions dans le lot à compter comme insérées.
+    """
+    written = set()
+    for document in stored:
+        index = candidates.get(document["_id"])
+        ingested_at = document.get(INGESTED_FIELD)
+        if index is not None and ingested_at is not None:
+            if ingested_at.replace(tzinfo=None) == batch[index][INGESTED_FIELD].replace(tzinfo=None):
+                written.add(index)
+    return written
+
+
+def stamp_ingested(batch):
+    """
+    Pose la date d'écriture (`ingested_at`, UTC, à la milliseconde comme en BSON) sur les documents d'un lot.
+
+    Args:
+        batch (list): Documents du lot (modifiés sur place, comme `_id` par `insert_many`).
+    """
+    now = datetime.now(timezone.utc)
+    ingested_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    for record in batch:
+        record[INGESTED_FIELD] = ingested_at
+
+
+def export_columns(fields=None):
+    """
+    Colonnes des exports : champs demandés, ou colonnes du schéma des patients.
+
+    Les colonnes sont fixées avant la lecture : un champ absent des premiers documents
+    n'est pas écarté du fichier, et un document sans ce champ laisse la cellule vide.
+
+    Args:
+        fields (list, optional): Champs exportés.
+
+    Returns:
+        list: Colonnes du CSV, dans l'ordre.
+    """
+    return list(fields) if fields else list(HEALTHCARE_SCHEMA)
+
+
+def export_projection(fields=None):
+    """
+    Projection des exports : colonnes de `export_columns` (sans `_id` ni `ingested_at`).
+
+    Args:
+        fields (list, optional): Champs exportés.
+
+    Returns:
+        dict: Projection MongoDB.
+    """
+    return {**{field: 1 for field in export_columns(fields)}, "_id": 0}
+
+
+def upsert_operation(record):
+    """
+    Remplacement idempotent d'un document, qui conserve sa date d'écriture d'origine.
+
+    Un pipeline de mise à jour (`$replaceWith`) remplace le document entier, comme
+    `ReplaceOne`, mais reprend le champ `ingested_at` déjà stocké s'il existe.
+
+    Args:
+        record (dict): Document muni de son `_id` et de sa date d'écriture.
+
+    Returns:
+        UpdateOne: Opération d'écriture groupée (upsert).
+    """
+    document = {"$literal": record}  # Valeurs prises telles quelles (pas de chemins `$champ`)
+    kept = {INGESTED_FIELD: {"$ifNull": [f"${INGESTED_FIELD}", record[INGESTED_FIELD]]}}
+    return UpdateOne({"_id": record["_id"]}, [{"$replaceWith": {"$mergeObjects": [document, kept]}}], upsert=True)
+
+
+def insert_batch(collection, batch, max_retries=INSERT_MAX_RETRIES, upsert=False):
+    """
+    Insère un lot de documents sans ordre, avec nouvelles tentatives sur erreur transitoire.
+
+    Avec `ordered=False`, MongoDB insère tous les documents valides du lot même si certains
+    sont refusés ; les refus sont décomptés par code d'erreur au lieu d'interrompre le
+    chargement. Les `_id` étant attribués par le pilote avant le premier envoi, un document
+    déjà écrit lors d'une tentative interrompue est signalé en doublon de `_id` à la
+    tentative suivante : il est alors compté comme inséré si le document stocké porte la
+    date d'écriture du lot, et comme doublon sinon (document préexistant).
+
+    En mode `upsert`, chaque document (muni d'un `_id` déterministe) remplace celui de même
+    `_id` ou est créé : rejouer un lot déjà écrit est sans effet. Le remplacement conserve
+    la date d'écriture d'origine (voir `upsert_operation`) : un document rejoué n'est pas
+    agrégé une seconde fois par les résumés.
+
+    Chaque document reçoit sa date d'écriture (`ingested_at`), qui délimite les documents
+    déjà agrégés par les résumés analytiques (voir `analytics.refresh_summary`).
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        batch (list): Documents du lot.
+        max_retries (int): Nombre maximal de nouvelles tentatives après une erreur transitoire.
+        upsert (bool): Écrit le lot par remplacement idempotent (upsert) au lieu de `insert_many`.
+
+    Returns:
+        dict: Compteurs du lot (insérés, doublons, erreurs de validation, autres erreurs, tentatives).
+
+    Raises:
+        AutoReconnect: Si l'erreur transitoire persiste après `max_retries` tentatives.
+    """
+    report = {"inserted": 0, "duplicates": 0, "validation_errors": 0, "other_errors": 0, "retries": 0}
+    stamp_ingested(batch)
+    with track("crud.insert_batch", batch_size=len(batch)) as measurement:
+        for attempt in range(max_retries + 1):
+            try:
+                if upsert:
+                    result = collection.bulk_write(
+                        [upsert_operation(record) for record in batch], ordered=False
+                    )
+                    report["inserted"] += result.upserted_count + result.matched_count
+                else:
+                    result = collection.insert_many(batch, ordered=False)
+                    report["inserted"] += len(result.inserted_ids)
+                break
+            except BulkWriteError as e:
+                written = set()
+                candidates = retried_duplicate_ids(batch, e.details) if attempt else {}
+                if candidates:
+                    stored = collection.find({"_id": {"$in": list(candidates)}}, {INGESTED_FIELD: 1})
+                    written = retry_written_indexes(batch, candidates, stored)
+                tally_write_errors(report, e.details, written)
+                break
+            except AutoReconnect as e:  # Inclut NetworkTimeout et les changements de primaire
+                if attempt == max_retries:
+                    raise
+                report["retries"] += 1
+                delay = RETRY_BASE_DELAY * 2**attempt
+                logger.warning(f"Erreur transitoire lors de l'insertion d'un lot ({e}), nouvelle tentative dans {delay:.1f} s.")
+                sleep(delay)
+        measurement.documents = report["inserted"]
+        measurement.errors = report["duplicates"] + report["validation_errors"] + report["other_errors"]
+    return report
+
+
+def bulk_insert(
+    collection,
+    records,
+    workers=INSERT_WORKERS,
+    batch_size=INSERT_BATCH_SIZE,
+    max_retries=INSERT_MAX_RETRIES,
+    upsert=False,
+    on_batch=None,
+):
+    """
+    Insère des documents par lots non ordonnés, depuis un pool de threads partageant le même client.
+
+    Le nombre de lots en cours est borné (deux par thread) : un générateur de lots n'est
+    consommé qu'au rythme des insertions et la mémoire reste proportionnelle à la taille
+    d'un lot. Les doublons et les erreurs de validation sont décomptés par lot sans
+    interrompre le chargement.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        records (list | Iterable[list]): Documents, ou itérable de lots de documents.
+        workers (int): Nombre de threads d'insertion.
+        batch_size (int): Taille des lots lorsqu'une liste de documents est fournie.
+        max_retries (int): Nouvelles tentatives par lot en cas d'erreur transitoire.
+        upsert (bool): Écrit les lots par remplacement idempotent (voir `insert_batch`).
+        on_batch (callable, optional): Appelée avec (index du lot, compteurs du lot) lorsqu'un
+            lot est terminé, dans le thread principal (ex : point de reprise).
+
+    Returns:
+        dict: Compteurs cumulés (insérés, doublons, erreurs de validation, autres erreurs,
+            tentatives, lots) et débit en documents/s.
+    """
+    totals = {"inserted": 0, "duplicates": 0, "validation_errors": 0, "other_errors": 0, "retries": 0, "batches": 0}
+    started_at = perf_counter()
+
+    def collect(future, batch_index):
+        report = future.result()
+        for key, value in report.items():
+            totals[key] += value
+        totals["batches"] += 1
+        rejected = report["duplicates"] + report["validation_errors"] + report["other_errors"]
+        if rejected:
+            logger.warning(
+                f"Lot {batch_index + 1} : {report['inserted']} documents insérés, {report['duplicates']} doublons, "
+                f"{report['validation_errors']} erreurs de validation, {report['other_errors']} autres erreurs."
+            )
+        else:
+            logger.debug(f"Lot {batch_index + 1} : {report['inserted']} documents insérés.")
+        if on_batch:
+            on_batch(batch_index, report)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}  # Future -> index du lot
+            for batch_index, batch in enumerate(_batched(records, batch_size)):
+                if not batch:
+                    continue
+                if batch_index == 0:
+                    logger.debug(f"Exemple de document inséré : {batch[0]}")
+                pending[executor.submit(insert_batch, collection, batch, max_retries, upsert)] = batch_index
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+            for future in list(pending):
+                collect(future, pending.pop(future))
+    finally:
+        invalidate_collection(collection)  # Résultats en cache périmés, même après une interruption
+
+    elapsed = perf_counter() - started_at
+    totals["docs_per_sec"] = totals["inserted"] / elapsed if elapsed else 0
+    return totals
 
 # === Fonction d'insertion de documents dans MongoDB ===
-def insert_records(collection, records):
+@instrumented("crud.insert_records")
+def insert_records(collection, records, workers=INSERT_WORKERS):
     """
-    Insère une liste de documents dans une collection MongoDB.
+    Insère des documents dans une collection MongoDB, en une fois ou par lots.
 
     Cette fonction permet d'ajouter plusieurs documents (sous forme de dictionnaires Python)
-    dans une collection MongoDB. Elle gère également les erreurs potentielles pendant
-    l'opération d'insertion.
+    dans une collection MongoDB. Elle accepte soit une liste de documents, soit un itérable
+    de lots de documents (par exemple `utils.iter_record_batches`) : dans ce cas, chaque lot
+    est inséré dès qu'il est produit et seul le lot courant est conservé en mémoire.
+    Les lots sont insérés sans ordre et en parallèle (voir `bulk_insert`).
 
     Args:
         collection (Collection): Collection cible dans MongoDB.
-        records (list): Liste de dictionnaires représentant les documents à insérer.
+        records (list | Iterable[list]): Liste de dictionnaires représentant les documents
+            à insérer, ou itérable de telles listes.
+        workers (int): Nombre de threads d'insertion.
 
     Returns:
         int: Nombre de documents insérés.
@@ -21,37 +350,86 @@ def insert_records(collection, records):
     Raises:
         Exception: En cas d'erreur lors de l'insertion.
     """
-    if not records:  # Si la liste de documents à insérer est vide
-        logger.warning("Aucune donnée à insérer.")
-        return 0
     try:
-        # Insérer les documents dans la collection MongoDB
-        result = collection.insert_many(records)
-        logger.info(f"{len(result.inserted_ids)} documents insérés avec succès.")
+        report = bulk_insert(collection, records, workers=workers)
 
-        # Exemple : Afficher uniquement un échantillon de 5 documents
-        logger.info("Exemple de documents insérés :")
-        for record in records[:5]:  # Limité à 5 documents
-            logger.info(record)
+        if not report["batches"]:  # Si aucun document n'a été fourni
+            logger.warning("Aucune donnée à insérer.")
+            return 0
 
-        return len(result.inserted_ids)
+        logger.info(
+            f"{report['inserted']} documents insérés avec succès en {report['batches']} lots "
+            f"({report['docs_per_sec']:,.0f} docs/s, {workers} threads)."
+        )
+        if report["duplicates"] or report["validation_errors"] or report["other_errors"]:
+            logger.warning(
+                f"Documents refusés : {report['duplicates']} doublons, {report['validation_errors']} erreurs "
+                f"de validation, {report['other_errors']} autres erreurs."
+            )
+        if report["retries"]:
+            logger.info(f"{report['retries']} nouvelles tentatives après des erreurs transitoires.")
+        return report["inserted"]
     except Exception as e:
         # Gérer et enregistrer les erreurs
         logger.error(f"Erreur lors de l'insertion : {e}")
         raise
 
+# === Fonction de copie d'une collection côté serveur ===
+def clone_collection(source_collection, target_name, query=None, sample_size=None):
+    """
+    Copie tout ou partie d'une collection dans une autre collection, côté serveur.
+
+    La copie est faite par un pipeline d'agrégation terminé par `$out` : les documents
+    ne transitent jamais par le processus Python et la collection cible est remplacée
+    de manière atomique (ses index sont conservés).
+
+    Args:
+        source_collection (Collection): Collection source.
+        target_name (str): Nom de la collection cible, dans la même base.
+        query (dict, optional): Filtre des documents à copier (tous par défaut).
+        sample_size (int, optional): Nombre de documents tirés au hasard (`$sample`)
+            parmi ceux du filtre (tous par défaut).
+
+    Returns:
+        int: Nombre de documents de la collection cible.
+
+    Raises:
+        Exception: En cas d'erreur lors de la copie.
+    """
+    try:
+        pipeline = []
+        if query:
+            pipeline.append({"$match": query})
+        if sample_size:
+            pipeline.append({"$sample": {"size": sample_size}})
+        pipeline.append({"$out": target_name})
+
+        source_collection.aggregate(pipeline)
+        invalidate_collection(f"{source_collection.database.name}.{target_name}")  # Collection cible remplacée
+        copied_count = source_collection.database[target_name].count_documents({})
+        logger.info(f"{copied_count} document(s) copié(s) côté serveur de {source_collection.name} vers {target_name}.")
+        return copied_count
+    except Exception as e:
+        logger.error(f"Erreur lors de la copie de la collection : {e}")
+        raise
+
 # === Fonction de lecture de documents dans MongoDB ===
-def read_records(collection, query={}, limit=5):
+@instrumented("crud.read_records")
+def read_records(collection, query=None, limit=5, projection=None, use_cache=False):
     """
     Lit des documents depuis une collection MongoDB avec des filtres et une limite.
 
     Cette fonction permet de lire un nombre limité de documents depuis une collection,
-    en appliquant un filtre optionnel pour restreindre les résultats.
+    en appliquant un filtre optionnel pour restreindre les résultats. La requête n'est
+    exécutée qu'une seule fois ; pour parcourir de grands résultats, voir `read_page`.
+    Avec `use_cache`, une requête identique récente est servie par `query_cache`.
 
     Args:
         collection (Collection): Collection cible dans MongoDB.
-        query (dict): Filtre pour la lecture des documents (par défaut : {}).
+        query (dict, optional): Filtre pour la lecture des documents (par défaut : aucun).
         limit (int): Nombre maximum de documents à lire.
+        projection (dict, optional): Champs à renvoyer (par défaut : tous).
+        use_cache (bool): Sert le résultat depuis le cache des requêtes s'il y est encore valable.
 
     Returns:
         list: Liste des documents lus.
@@ -60,19 +438,189 @@ def read_records(collection, query={}, limit=5):
         Exception: En cas d'erreur lors de la lecture.
     """
     try:
-        # Lire les documents depuis MongoDB avec un filtre et une limite
-        records = collection.find(query).limit(limit)
-        logger.info(f"{len(list(records))} documents récupérés (après application de la limite).")
-        records.rewind()  # Remet l'état du curseur pour pouvoir réutiliser `records`
-         # Retourner les documents sous forme de liste
-        return list(records)
+        # Lire les documents depuis MongoDB avec un filtre et une limite, en un seul passage
+        records = cached_find(collection, query, projection, limit=limit, use_cache=use_cache)
+        logger.info(f"{len(records)} documents récupérés (après application de la limite).")
+        return records
     except Exception as e:
         # Gérer les erreurs potentielles
         logger.error(f"Erreur lors de la lecture : {e}")
         raise
 
+# === Fonctions de lecture paginée (pagination par clé) ===
+def encode_page_token(sort_field, descending, last_document):
+    """
+    Encode la position du dernier document d'une page dans un jeton opaque.
+
+    Le jeton contient la clé de tri, le sens du tri, la valeur de la clé et l'`_id`
+    du dernier document, sérialisés en Extended JSON (types BSON conservés) puis en base64.
+
+    Args:
+        sort_field (str): Champ de tri de la pagination.
+        descending (bool): True pour un tri décroissant.
+        last_document (dict): Dernier document de la page.
+
+    Returns:
+        str: Jeton de la page suivante.
+    """
+    payload = {
+        "sort": sort_field,
+        "descending": descending,
+        "value": last_document.get(sort_field),
+        "_id": last_document["_id"],
+    }
+    encoded = json_util.dumps(payload, json_options=json_util.CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(encoded.encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(page_token, sort_field, descending):
+    """
+    Décode un jeton de page et vérifie qu'il correspond au tri demandé.
+
+    Args:
+        page_token (str): Jeton produit par `encode_page_token`.
+        sort_field (str): Champ de tri attendu.
+        descending (bool): Sens de tri attendu.
+
+    Returns:
+        dict: Position du dernier document de la page précédente (`value`, `_id`).
+
+    Raises:
+        ValueError: Si le jeton est invalide ou produit pour un autre tri.
+    """
+    try:
+        decoded = base64.urlsafe_b64decode(page_token.encode("ascii")).decode("utf-8")
+        payload = json_util.loads(decoded, json_options=json_util.CANONICAL_JSON_OPTIONS)
+    except Exception as e:
+        raise ValueError(f"Jeton de page invalide : {e}") from e
+    if payload.get("sort") != sort_field or payload.get("descending") != descending:
+        raise ValueError("Jeton de page produit pour un autre tri.")
+    return payload
+
+
+def keyset_condition(sort_field, descending, position):
+    """
+    Construit le filtre des documents situés après une position dans l'ordre de tri.
+
+    L'ordre est (clé de tri, `_id`) : l'`_id` départage les documents de même valeur,
+    ce qui rend l'ordre total et stable d'une page à l'autre. Les documents sans valeur
+    pour la clé de tri (null ou champ absent) sont placés en tête en ordre croissant et
+    en fin en ordre décroissant, comme le fait le tri de MongoDB.
+
+    Args:
+        sort_field (str): Champ de tri.
+        descending (bool): True pour un tri décroissant.
+        position (dict): Position du dernier document lu (`value`, `_id`).
+
+    Returns:
+        dict: Filtre MongoDB à combiner avec la requête.
+    """
+    after = "$lt" if descending else "$gt"
+    if sort_field == "_id":
+        return {"_id": {after: position["_id"]}}
+
+    value = position["value"]
+    same_value_after_id = {sort_field: value, "_id": {after: position["_id"]}}
+    if value is None:
+        if descending:
+            return same_value_after_id
+        return {"$or": [same_value_after_id, {sort_field: {"$ne": None}}]}
+
+    conditions = [{sort_field: {after: value}}, same_value_after_id]
+    if descending:
+        conditions.append({sort_field: None})  # Les valeurs manquantes viennent en dernier
+    return {"$or": conditions}
+
+
+@instrumented("crud.read_page", measure=lambda page: {"documents": len(page[0])})
+def read_page(collection, query=None, projection=None, sort_field="_id", page_size=PAGE_SIZE,
+              page_token=None, descending=False, use_cache=False):
+    """
+    Lit une page de documents par pagination par clé (keyset) plutôt que par `skip`.
+
+    Chaque page reprend après le dernier document de la page précédente grâce à un
+    filtre sur (clé de tri, `_id`) : le coût d'une page ne dépend pas de sa profondeur,
+    contrairement à `skip`/`limit` qui parcourt tous les documents sautés. La clé de tri
+    doit être indexée (voir `utils.PATIENT_INDEXES`) et de type homogène.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        query (dict, optional): Filtre des documents (par défaut : aucun).
+        projection (dict, optional): Champs à renvoyer ; `_id` et la clé de tri sont
+            toujours renvoyés car ils forment le jeton de la page suivante.
+        sort_field (str): Champ de tri (par défaut : `_id`).
+        page_size (int): Nombre de documents par page.
+        page_token (str, optional): Jeton renvoyé par la page précédente (None pour la première page).
+        descending (bool): True pour un tri décroissant.
+        use_cache (bool): Sert la page depuis le cache des requêtes si elle y est encore valable.
+
+    Returns:
+        tuple: (liste des documents de la page, jeton de la page suivante ou None s'il n'y en a plus).
+
+    Raises:
+        ValueError: Si le jeton de page est invalide ou produit pour un autre tri.
+        Exception: En cas d'erreur lors de la lecture.
+    """
+    try:
+        conditions = [query] if query else []
+        if page_token:
+            position = decode_page_token(page_token, sort_field, descending)
+            conditions.append(keyset_condition(sort_field, descending, position))
+        filter_query = {"$and": conditions} if len(conditions) > 1 else (conditions[0] if conditions else {})
+
+        if projection:
+            projection = dict(projection)
+            if any(value for key, value in projection.items() if key != "_id"):
+                projection[sort_field] = 1  # Projection par inclusion : la clé de tri est ajoutée
+            else:
+                projection.pop(sort_field, None)  # Projection par exclusion : la clé de tri est conservée
+            projection.pop("_id", None)
+
+        direction = DESCENDING if descending else ASCENDING
+        sort = [("_id", direction)] if sort_field == "_id" else [(sort_field, direction), ("_id", direction)]
+
+        # Un document de plus que la page indique s'il existe une page suivante
+        documents = cached_find(collection, filter_query, projection, sort, page_size + 1, use_cache)
+        has_next = len(documents) > page_size
+        documents = documents[:page_size]
+        next_token = encode_page_token(sort_field, descending, documents[-1]) if has_next else None
+        logger.info(f"Page de {len(documents)} documents lue (tri : {sort_field}{' décroissant' if descending else ''}).")
+        return documents, next_token
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture paginée : {e}")
+        raise
+
+
+def iter_pages(collection, query=None, projection=None, sort_field="_id", page_size=PAGE_SIZE,
+               page_token=None, descending=False, use_cache=False):
+    """
+    Parcourt un résultat page par page ; chaque page n'est lue qu'à la demande.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        query (dict, optional): Filtre des documents.
+        projection (dict, optional): Champs à renvoyer.
+        sort_field (str): Champ de tri.
+        page_size (int): Nombre de documents par page.
+        page_token (str, optional): Jeton de départ (None pour commencer au début).
+        descending (bool): True pour un tri décroissant.
+        use_cache (bool): Sert les pages depuis le cache des requêtes.
+
+    Yields:
+        tuple: (liste des documents de la page, jeton de la page suivante ou None).
+    """
+    while True:
+        documents, page_token = read_page(
+            collection, query, projection, sort_field, page_size, page_token, descending, use_cache
+        )
+        if documents:
+            yield documents, page_token
+        if not page_token:
+            return
+
 # === Fonction de mise à jour de documents dans MongoDB ===
-def update_records(collection, filter_query, update_query):
+@instrumented("crud.update_records")
+def update_records(collection, filter_query, update_query, echo=False, echo_limit=ECHO_LIMIT):
     """
     Met à jour les documents correspondant à un filtre dans MongoDB.
 
@@ -83,6 +631,8 @@ def update_records(collection, filter_query, update_query):
         collection (Collection): Collection cible dans MongoDB.
         filter_query (dict): Filtre pour sélectionner les documents à mettre à jour.
         update_query (dict): Mise à jour à appliquer.
+        echo (bool): Affiche les documents correspondant au filtre après la mise à jour.
+        echo_limit (int): Nombre maximal de documents affichés.
 
     Returns:
         int: Nombre de documents modifiés.
@@ -93,12 +643,12 @@ def update_records(collection, filter_query, update_query):
     try:
         # Appliquer la mise à jour aux documents correspondants
         result = collection.update_many(filter_query, update_query)
+        invalidate_update(collection, update_query)
         logger.info(f"{result.modified_count} documents mis à jour avec succès.")
 
-        # Afficher les documents mis à jour pour confirmation
-        updated_docs = collection.find(filter_query)
-        for doc in updated_docs:
-            print(doc)
+        # Afficher les documents mis à jour pour confirmation (requête supplémentaire, limitée)
+        if echo:
+            echo_documents(collection, filter_query, echo_limit)
 
         return result.modified_count
     except Exception as e:
@@ -107,6 +657,7 @@ def update_records(collection, filter_query, update_query):
         raise
 
 # === Fonction de suppression de documents dans MongoDB ===
+@instrumented("crud.delete_records")
 def delete_records(collection, filter_query):
     """
     Supprime les documents correspondant à un filtre dans MongoDB.
@@ -127,6 +678,7 @@ def delete_records(collection, filter_query):
     try:
         # Supprimer les documents qui correspondent au filtre
         result = collection.delete_many(filter_query)
+        invalidate_collection(collection)
         logger.info(f"{result.deleted_count} documents supprimés de la collection MongoDB.")
 
         return result.deleted_count
@@ -135,51 +687,467 @@ def delete_records(collection, filter_query):
         logger.error(f"Erreur lors de la suppression : {e}")
         raise
 
+# === Fonctions de mutations groupées (bulk_write) ===
+def echo_documents(collection, filter_query, limit=ECHO_LIMIT):
+    """
+    Affiche au plus `limit` documents correspondant à un filtre.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        filter_query (dict): Filtre des documents à afficher.
+        limit (int): Nombre maximal de documents affichés.
+
+    Returns:
+        int: Nombre de documents affichés.
+    """
+    shown = 0
+    for doc in collection.find(filter_query).limit(limit):
+        print(doc)
+        shown += 1
+    if shown == limit:
+        print(f"... (affichage limité à {limit} documents)")
+    return shown
+
+
+def write_operation(operation):
+    """
+    Convertit une mutation décrite par un dictionnaire en opération `bulk_write`.
+
+    Formes acceptées :
+    - `{"filter": ..., "update": ...}` : mise à jour (`UpdateMany`, ou `UpdateOne` avec `"many": False`,
+      option `"upsert"`) ;
+    - `{"filter": ..., "delete": True}` : suppression (`DeleteMany`, ou `DeleteOne` avec `"many": False`) ;
+    - une opération PyMongo déjà construite (`UpdateOne`, `DeleteMany`, ...), transmise telle quelle.
+
+    Args:
+        operation (dict | object): Mutation à convertir.
+
+    Returns:
+        object: Opération PyMongo.
+
+    Raises:
+        ValueError: Si la mutation n'est ni une mise à jour ni une suppression.
+    """
+    if isinstance(operation, (InsertOne, ReplaceOne, UpdateOne, UpdateMany, DeleteOne, DeleteMany)):
+        return operation
+    many = operation.get("many", True)
+    if "update" in operation:
+        update_class = UpdateMany if many else UpdateOne
+        return update_class(operation["filter"], operation["update"], upsert=operation.get("upsert", False))
+    if operation.get("delete"):
+        delete_class = DeleteMany if many else DeleteOne
+        return delete_class(operation["filter"])
+    raise ValueError(f"Mutation non reconnue (ni 'update' ni 'delete') : {operation}")
+
+
+@instrumented("crud.bulk_mutate", measure=lambda report: {
+    "documents": report["modified"] + report["deleted"] + report["upserted"],
+    "batch_size": report["operations"],
+    "errors": report["errors"],
+})
+def bulk_mutate(collection, operations, ordered=False, echo=False, echo_limit=ECHO_LIMIT):
+    """
+    Applique une liste de mises à jour et de suppressions en un seul `bulk_write`.
+
+    Toutes les mutations sont envoyées ensemble (le pilote les découpe selon les limites
+    du serveur) au lieu d'un aller-retour par mutation. En mode non ordonné (par défaut),
+    le serveur applique toutes les mutations valides même si certaines échouent ; en mode
+    ordonné, il s'arrête à la première erreur.
+
+    Args:
+        collection (Collection): Collection cible dans MongoDB.
+        operations (list): Mutations (voir `write_operation`).
+        ordered (bool): Applique les mutations dans l'ordre et s'arrête à la première erreur.
+        echo (bool): Affiche les documents correspondant aux filtres des mises à jour
+            décrites par des dictionnaires.
+        echo_limit (int): Nombre maximal de documents affichés.
+
+    Returns:
+        dict: Documents trouvés (`matched`), modifiés (`modified`), supprimés (`deleted`),
+        créés par upsert (`upserted`) et mutations en erreur (`errors`).
+
+    Raises:
+        ValueError: Si une mutation n'est pas reconnue.
+        Exception: En cas d'erreur lors de l'écriture (hors erreurs par mutation).
+    """
+    report = {"operations": len(operations), "matched": 0, "modified": 0, "deleted": 0, "upserted": 0, "errors": 0}
+    if not operations:
+        return report
+    try:
+        requests = [write_operation(operation) for operation in operations]
+        try:
+            result = collection.bulk_write(requests, ordered=ordered)
+            report.update(
+                matched=result.matched_count,
+                modified=result.modified_count,
+                deleted=result.deleted_count,
+                upserted=result.upserted_count,
+            )
+        except BulkWriteError as e:
+            # Les mutations valides sont appliquées : les compteurs partiels restent exacts
+            details = e.details
+            report.update(
+                matched=details.get("nMatched", 0),
+                modified=details.get("nModified", 0),
+                deleted=details.get("nRemoved", 0),
+                upserted=details.get("nUpserted", 0),
+                errors=len(details.get("writeErrors", [])),
+            )
+            for error in details.get("writeErrors", [])[:5]:
+                logger.warning(f"Mutation {error.get('index')} refusée : {error.get('errmsg')}")
+
+        # Résultats en cache : invalidation par champs modifiés, ou de toute la collection
+        # pour les suppressions, les upserts et les opérations PyMongo déjà construites
+        for operation in operations:
+            if isinstance(operation, dict) and "update" in operation:
+                invalidate_update(collection, operation["update"], operation.get("upsert", False))
+            else:
+                invalidate_collection(collection)
+                break
+
+        logger.info(
+            f"{report['operations']} mutations appliquées en un seul envoi : {report['matched']} trouvés, "
+            f"{report['modified']} modifiés, {report['deleted']} supprimés, {report['upserted']} créés, "
+            f"{report['errors']} en erreur."
+        )
+
+        if echo:
+            update_filters = [operation["filter"] for operation in operations if isinstance(operation, dict) and "update" in operation]
+            if update_filters:
+                echo_documents(collection, {"$or": update_filters}, echo_limit)
+        return report
+    except Exception as e:
+        logger.error(f"Erreur lors des mutations groupées : {e}")
+        raise
+
 # === Fonction d'exportation de documents vers un fichier CSV ===
-def export_to_csv(collection, file_name):
+def export_path_for(file_name, compression=None, output_dir=EXPORT_DIR):
+    """
+    Construit le chemin du fichier exporté, avec l'extension de la compression choisie.
+
+    Args:
+        file_name (str): Nom du fichier CSV (sans chemin ni extension).
+        compression (str, optional): "gzip", "zstd" ou None.
+        output_dir (str): Répertoire d'exportation.
+
+    Returns:
+        str: Chemin du fichier (ex : `outputs/export.csv.gz`).
+    """
+    return os.path.join(output_dir, f"{file_name}.csv{COMPRESSION_EXTENSIONS.get(compression, '')}")
+
+
+def available_compressions():
+    """
+    Compressions d'export utilisables : gzip, et zstd si le module `zstandard` est installé.
+
+    Returns:
+        list: Noms des compressions disponibles.
+    """
+    return ["gzip"] + (["zstd"] if importlib.util.find_spec("zstandard") else [])
+
+
+def check_compression(compression):
     """
-    Exporte les documents d'une collection MongoDB vers un fichier CSV.
+    Vérifie, avant tout accès à la base, que la compression demandée est utilisable.
 
-    Cette fonction lit tous les documents d'une collection MongoDB, les transforme
-    en un DataFrame Pandas, puis les exporte dans un fichier CSV.
+    Args:
+        compression (str, optional): "gzip", "zstd" ou None.
+
+    Raises:
+        ValueError: Si la compression est inconnue, ou zstd sans le module `zstandard`.
+    """
+    if compression is None or compression in available_compressions():
+        return
+    if compression == "zstd":
+        raise ValueError("Compression zstd indisponible : installez le module zstandard (pip install zstandard).")
+    raise ValueError(f"Compression non prise en charge : {compression}")
+
+
+def log_empty_export(query=None):
+    """
+    Signale un export vide, en distinguant une collection vide d'un filtre sans résultat.
+
+    Args:
+        query (dict, optional): Filtre de l'export.
+    """
+    if query:
+        logger.warning(f"Aucun document à exporter : aucun document ne correspond au filtre {query}.")
+    else:
+        logger.warning("Aucun document à exporter. La collection est vide.")
+
+
+def open_export_file(path, compression=None, mode="wt"):
+    """
+    Ouvre un fichier d'export texte, compressé ou non.
+
+    Args:
+        path (str): Chemin du fichier.
+        compression (str, optional): "gzip", "zstd" (module `zstandard` requis) ou None.
+        mode (str): Mode d'ouverture ("wt" pour créer, "at" pour ajouter).
+
+    Returns:
+        file: Fichier texte ouvert en écriture.
+
+    Raises:
+        ValueError: Si la compression demandée n'est pas prise en charge.
+    """
+    if compression is None:
+        return open(path, mode, newline="", encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, mode, newline="", encoding="utf-8")
+    if compression == "zstd":
+        import zstandard  # Dépendance optionnelle, importée uniquement pour la compression zstd
+
+        raw = open(path, mode.replace("t", "b"))
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), newline="", encoding="utf-8")
+    raise ValueError(f"Compression non prise en charge : {compression}")
+
+
+def write_csv_chunks(cursor, handle, columns=None, chunk_size=EXPORT_CHUNK_SIZE, header=True):
+    """
+    Écrit les documents d'un curseur dans un fichier CSV ouvert, par blocs de taille fixe.
+
+    Args:
+        cursor (Cursor): Curseur MongoDB (ou itérable de documents).
+        handle (file): Fichier texte ouvert en écriture.
+        columns (list, optional): Colonnes du CSV (voir `export_columns`). Chaque bloc est
+            réindexé sur ces colonnes.
+        chunk_size (int): Nombre de lignes écrites par bloc.
+        header (bool): Écrit la ligne d'en-tête avant le premier bloc.
+
+    Returns:
+        int: Nombre de documents écrits.
+    """
+    written_count = 0
+    columns = export_columns(columns)
+    for chunk in iter(lambda: list(islice(cursor, chunk_size)), []):
+        df = pd.DataFrame(chunk, columns=columns)
+        df.to_csv(handle, index=False, header=header and written_count == 0)
+        written_count += len(df)
+        logger.debug(f"{written_count} documents exportés...")
+    return written_count
+
+
+@instrumented("crud.export_to_csv")
+def export_to_csv(
+    collection,
+    file_name,
+    query=None,
+    fields=None,
+    batch_size=EXPORT_BATCH_SIZE,
+    chunk_size=EXPORT_CHUNK_SIZE,
+    compression=None,
+):
+    """
+    Exporte les documents d'une collection MongoDB vers un fichier CSV, en flux.
+
+    Cette fonction parcourt le curseur MongoDB par lots de `batch_size` documents et écrit
+    le fichier par blocs de `chunk_size` lignes : la mémoire utilisée reste constante
+    quelle que soit la taille de la collection. Le champ `_id` est exclu dès le serveur
+    par la projection.
 
     Args:
         collection (Collection): Collection cible.
         file_name (str): Nom du fichier CSV (sans chemin ni extension).
+        query (dict, optional): Filtre des documents à exporter (tous par défaut).
+        fields (list, optional): Champs à exporter, dans l'ordre des colonnes. Par défaut,
+            les colonnes du schéma des patients (`schema.HEALTHCARE_SCHEMA`).
+        batch_size (int): Nombre de documents reçus du serveur par aller-retour.
+        chunk_size (int): Nombre de lignes écrites par bloc.
+        compression (str, optional): "gzip" ou "zstd" pour compresser le fichier.
 
     Returns:
         int: Nombre de documents exportés.
+
+    Raises:
+        ValueError: Si la compression demandée n'est pas disponible.
     """
     try:
+        check_compression(compression)
+
         # Définir le répertoire d'exportation
-        output_dir = "outputs"
-        if not os.path.exists(output_dir):
+        if not os.path.exists(EXPORT_DIR):
             # Créer le répertoire si inexistant
-            os.makedirs(output_dir)
-            logger.info(f"Répertoire créé : {output_dir}")
+            os.makedirs(EXPORT_DIR)
+            logger.info(f"Répertoire créé : {EXPORT_DIR}")
 
         # Construire le chemin complet du fichier CSV
-        output_file = os.path.join(output_dir, f"{file_name}.csv")
+        output_file = export_path_for(file_name, compression)
 
-        # Récupérer tous les documents de la collection MongoDB
-        records = list(collection.find())
-        if not records:
-            # Avertir si la collection est vide
-            logger.warning("Aucun document à exporter. La collection est vide.")
-            return 0
+        # Projection côté serveur : champs demandés, sans `_id`
+        projection = export_projection(fields)
+        cursor = collection.find(query or {}, projection, batch_size=batch_size)
 
-        # Convertir les documents en DataFrame Pandas
-        df = pd.DataFrame(records)
-        if "_id" in df.columns:
-            # Supprimer la colonne MongoDB _id pour l'exportation
-            df.drop(columns=["_id"], inplace=True)
+        with open_export_file(output_file, compression) as handle:
+            exported_count = write_csv_chunks(cursor, handle, fields, chunk_size)
 
-        # Exporter les données en fichier CSV
-        df.to_csv(output_file, index=False)
-        logger.info(f"Données exportées avec succès dans le fichier : {output_file}")
+        if not exported_count:
+            # Avertir si aucun document ne correspond
+            log_empty_export(query)
+            os.remove(output_file)
+            return 0
 
-        return len(df)
+        logger.info(f"Données exportées avec succès dans le fichier : {output_file} ({exported_count} documents)")
+        if metrics_enabled():
+            observe("crud.export_to_csv", nbytes=os.path.getsize(output_file))
+        return exported_count
     except Exception as e:
         # Gérer les erreurs potentielles
         logger.error(f"Erreur lors de l'exportation : {e}")
         raise
+
+# === Exportation parallèle par plages de valeurs ===
+def partition_queries(collection, partition_field, partitions, query=None, sample_size=None):
+    """
+    Découpe une collection en plages de valeurs d'un champ, à partir d'un échantillon.
+
+    Un échantillon (`$sample`) des valeurs du champ fournit des bornes approximativement
+    équilibrées (quantiles), à la manière de `splitVector`. Les plages portent sur un
+    seul type BSON (celui des valeurs échantillonnées) ; une dernière partition regroupe
+    les documents où le champ est absent ou d'un autre type, pour n'en perdre aucun.
+
+    Args:
+        collection (Collection): Collection à découper.
+        partition_field (str): Champ de découpage, idéalement indexé (ex : 'date_of_admission').
+        partitions (int): Nombre de plages souhaitées.
+        query (dict, optional): Filtre appliqué à toutes les partitions.
+        sample_size (int, optional): Taille de l'échantillon (100 valeurs par plage par défaut).
+
+    Returns:
+        list: Filtres MongoDB des partitions, dans l'ordre croissant des valeurs.
+    """
+    pipeline = [{"$match": query}] if query else []
+    pipeline += [
+        {"$match": {partition_field: {"$exists": True, "$ne": None}}},
+        {"$sample": {"size": sample_size or partitions * 100}},
+        {"$project": {"_id": 0, "value": f"${partition_field}"}},
+    ]
+    values = [document["value"] for document in collection.aggregate(pipeline)]
+    base_query = query or {}
+    if not values:
+        return [base_query]
+
+    # Seules les valeurs du type le plus représenté servent de bornes
+    bson_type = max(BSON_TYPE_ALIASES, key=lambda alias: sum(isinstance(v, BSON_TYPE_ALIASES[alias]) for v in values))
+    values = sorted(v for v in values if isinstance(v, BSON_TYPE_ALIASES[bson_type]))
+    bounds = sorted(set(values[len(values) * i // partitions] for i in range(1, partitions)))
+
+    ranges = []
+    lower = None
+    for upper in bounds + [None]:
+        condition = {"$type": bson_type}
+        if lower is not None:
+            condition["$gte"] = lower
+        if upper is not None:
+            condition["$lt"] = upper
+        ranges.append({partition_field: condition})
+        lower = upper
+    # Partition de reste : champ absent, nul ou d'un autre type
+    ranges.append({partition_field: {"$not": {"$type": bson_type}}})
+
+    return [{"$and": [base_query, condition]} if base_query else condition for condition in ranges]
+
+
+@instrumented("crud.export_to_csv_parallel")
+def export_to_csv_parallel(
+    collection,
+    file_name,
+    partition_field="date_of_admission",
+    workers=EXPORT_WORKERS,
+    partitions=None,
+    query=None,
+    fields=None,
+    batch_size=EXPORT_BATCH_SIZE,
+    chunk_size=EXPORT_CHUNK_SIZE,
+    compression=None,
+    merge=True,
+):
+    """
+    Exporte une collection vers CSV en parallèle, une plage de valeurs par tâche.
+
+    La collection est découpée en plages d'un champ indexé (voir `partition_queries`) ;
+    chaque plage est lue par son propre curseur, depuis un pool de threads partageant le
+    pool de connexions du client, et écrite dans un fichier partiel. Les fichiers partiels
+    sont ensuite concaténés dans l'ordre des plages (les membres gzip et les trames zstd
+    concaténés restent un fichier valide), ou conservés tels quels avec `merge=False`.
+    Si une plage ou la fusion échoue, les fichiers partiels sont supprimés.
+
+    Args:
+        collection (Collection): Collection cible.
+        file_name (str): Nom du fichier CSV (sans chemin ni extension).
+        partition_field (str): Champ de découpage, idéalement indexé.
+        workers (int): Nombre de plages exportées simultanément.
+        partitions (int, optional): Nombre de plages (4 par tâche par défaut).
+        query (dict, optional): Filtre des documents à exporter (tous par défaut).
+        fields (list, optional): Champs à exporter, dans l'ordre des colonnes (voir `export_columns`).
+        batch_size (int): Nombre de documents reçus du serveur par aller-retour.
+        chunk_size (int): Nombre de lignes écrites par bloc.
+        compression (str, optional): "gzip" ou "zstd" pour compresser les fichiers.
+        merge (bool): Fusionne les fichiers partiels en un seul fichier ; sinon, chaque
+            fichier partiel est autonome (avec sa ligne d'en-tête).
+
+    Returns:
+        int: Nombre de documents exportés.
+
+    Raises:
+        ValueError: Si la compression demandée n'est pas disponible.
+    """
+    try:
+        check_compression(compression)
+        started_at = perf_counter()
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        queries = partition_queries(collection, partition_field, partitions or workers * 4, query)
+        logger.info(f"Exportation parallèle : {len(queries)} plages de '{partition_field}' sur {workers} threads...")
+
+        # Colonnes communes à tous les fichiers partiels, fixées avant la lecture
+        columns = export_columns(fields)
+        projection = export_projection(columns)
+        part_files = [export_path_for(f"{file_name}.part{index:04d}", compression) for index in range(len(queries))]
+        output_file = export_path_for(file_name, compression)
+
+        def export_partition(part_file, partition_query):
+            cursor = collection.find(partition_query, dict(projection), batch_size=batch_size)
+            with open_export_file(part_file, compression) as handle:
+                return write_csv_chunks(cursor, handle, columns, chunk_size, header=not merge)
+
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                counts = list(executor.map(export_partition, part_files, queries))
+
+            exported_count = sum(counts)
+            if not exported_count:
+                log_empty_export(query)
+                return 0
+            if merge:
+                with open_export_file(output_file, compression) as handle:
+                    pd.DataFrame(columns=columns).to_csv(handle, index=False)
+                with open(output_file, "ab") as output:
+                    for part_file in part_files:
+                        with open(part_file, "rb") as part:
+                            shutil.copyfileobj(part, output)
+                logger.info(f"Fichiers partiels fusionnés dans : {output_file}")
+            completed = True
+        finally:
+            # Fichiers partiels supprimés après la fusion ; en cas d'échec, fichiers partiels
+            # et fichier fusionné incomplet sont supprimés
+            if merge:
+                leftovers = part_files if completed else part_files + [output_file]
+            else:
+                leftovers = [] if completed else part_files
+            for path in leftovers:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        elapsed = perf_counter() - started_at
+        logger.info(
+            f"{exported_count} documents exportés en {elapsed:.2f} s "
+            f"({exported_count / elapsed if elapsed else 0:,.0f} docs/s, {len(part_files)} plages)."
+        )
+        if metrics_enabled():
+            written = [output_file] if merge else part_files
+            observe("crud.export_to_csv_parallel", nbytes=sum(os.path.getsize(path) for path in written))
+        return exported_count
+    except Exception as e:
+        logger.error(f"Erreur lors de l'exportation parallèle : {e}")
+        raise
@@ -1,148 +1,727 @@
 # === Importation des bibliothèques nécessaires ===
 import os  # Interaction avec le système de fichiers
+import io  # Lecture d'une plage d'octets comme un fichier
 import pandas as pd  # Manipulation et analyse des données (DataFrames)
 from loguru import logger  # Gestion avancée des logs
 import kagglehub  # Téléchargement de datasets depuis Kaggle
 from pathlib import Path  # Manipulation intuitive des chemins de fichiers
+from argparse import ArgumentParser  # Analyse des arguments en ligne de commande
+from concurrent.futures import ProcessPoolExecutor  # Exécution du nettoyage sur plusieurs processus
+from contextlib import nullcontext  # Index de dédoublonnage fourni par l'appelant
+from time import perf_counter  # Mesure des durées de traitement
+from dataset_cache import cache_key, restore_from_cache, store_in_cache  # Cache des fichiers déjà nettoyés
+from dedup import FingerprintStore, deduplicate, row_fingerprints  # Dédoublonnage par empreintes, débordant sur disque
+from metrics import instrumented, metrics_enabled, observe  # Métriques des étapes (durées, volumes, erreurs)
+from profiling import StageProfiler, profile_step  # Profilage étape par étape (--profile)
+from schema import (  # Schéma déclaratif : règles de validation et représentation compacte
+    HEALTHCARE_SCHEMA,
+    arrow_schema,
+    compact_dataframe,
+    compact_read_dtypes,
+    compile_rules,
+    memory_usage_bytes,
+    normalize_text,
+    standardize_column_name,
+    validate_dataframe,
+)
 
 # === Configuration des logs ===
 LOG_FILE = "logs/data_preparation.log"  # Chemin du fichier de log
 logger.add(LOG_FILE, level="INFO", rotation="1 MB", compression="zip")
 
+# === Paramètres du nettoyage ===
+KAGGLE_DATASET = "prasad22/healthcare-dataset"  # Nom du dataset Kaggle
+EXPECTED_FILE = "healthcare_dataset.csv"  # Fichier attendu dans le dataset
+SOURCE_DIR = os.getenv("DATASET_MIRROR_DIR")  # Miroir local du dataset (évite le téléchargement Kaggle)
+DEFAULT_CHUNKSIZE = 100_000  # Nombre de lignes par bloc en mode streaming
+PARTITIONS_PER_WORKER = 4  # Nombre de partitions par processus en mode parallèle (équilibrage de charge)
+
+# === Fonction de téléchargement : localisation du fichier source ===
+def locate_source_file(source_dir=None):
+    """
+    Localise le fichier CSV brut, dans un miroir local ou après téléchargement depuis Kaggle.
+
+    Args:
+        source_dir (str, optional): Répertoire miroir contenant `healthcare_dataset.csv`.
+            Si None, le dataset est téléchargé depuis Kaggle.
+
+    Returns:
+        Path: Chemin du fichier CSV brut.
+
+    Raises:
+        FileNotFoundError: Si le fichier attendu est absent du dataset.
+    """
+    try:
+        if source_dir:
+            logger.info(f"Utilisation du miroir local : {source_dir}")
+            dataset_path = source_dir
+        else:
+            logger.info(f"Téléchargement des données depuis Kaggle : {KAGGLE_DATASET}...")
+            # Télécharge le dataset depuis Kaggle
+            dataset_path = kagglehub.dataset_download(KAGGLE_DATASET)
+            logger.success(f"Dataset téléchargé avec succès dans : {dataset_path}")
+
+        # Localisation du fichier attendu
+        file_path = Path(dataset_path) / EXPECTED_FILE
+        if not file_path.exists():
+            raise FileNotFoundError(f"Fichier attendu non trouvé : {file_path}")
+
+        logger.info(f"Fichier localisé pour traitement : {file_path}")
+        return file_path
+    except Exception as e:
+        logger.error(f"Erreur lors du téléchargement ou de la localisation du fichier : {e}")
+        raise
+
+# === Écriture des données nettoyées (CSV ou Parquet) ===
+def is_parquet_path(path):
+    """
+    Indique si un chemin désigne un fichier Parquet, d'après son extension.
+
+    Args:
+        path (str): Chemin du fichier.
+
+    Returns:
+        bool: True pour un fichier `.parquet`, False sinon (CSV).
+    """
+    return Path(path).suffix.lower() == ".parquet"
+
+
+class CleanedDataWriter:
+    """
+    Écrit les données nettoyées bloc par bloc dans un fichier CSV ou Parquet.
+
+    Le format est déduit de l'extension du fichier de sortie. En Parquet, chaque bloc
+    devient un ou plusieurs groupes de lignes et les types issus du nettoyage (dates,
+    entiers, flottants) sont conservés pour le chargement dans MongoDB. Le schéma du
+    fichier est déduit du schéma déclaratif (voir `schema.arrow_schema`) et non du premier
+    bloc : chaque bloc est converti vers les mêmes types, quel que soit son contenu.
+
+    Args:
+        output_path (str): Chemin du fichier de sortie (`.csv` ou `.parquet`).
+        compact (bool): Colonnes catégorielles encodées par dictionnaire dans le fichier Parquet.
+    """
+
+    def __init__(self, output_path, compact=False):
+        self.output_path = output_path
+        self.compact = compact
+        self.parquet = is_parquet_path(output_path)
+        self.rows_written = 0
+        self._parquet_writer = None
+        self._csv_started = False
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    def write(self, df):
+        """
+        Ajoute un bloc de données nettoyées au fichier de sortie.
+
+        Args:
+            df (DataFrame): Bloc de données nettoyées.
+        """
+        if self.parquet:
+            import pyarrow as pa  # Importé uniquement pour la sortie Parquet
+            import pyarrow.parquet as pq
+
+            if self._parquet_writer is None:
+                schema = arrow_schema(list(df.columns), compact=self.compact)
+                self._parquet_writer = pq.ParquetWriter(self.output_path, schema)
+            table = pa.Table.from_pandas(df, schema=self._parquet_writer.schema, preserve_index=False)
+            self._parquet_writer.write_table(table, row_group_size=DEFAULT_CHUNKSIZE)
+        else:
+            # Le premier bloc crée le fichier avec l'en-tête, les suivants sont ajoutés à la suite
+            df.to_csv(
+                self.output_path,
+                index=False,
+                mode="a" if self._csv_started else "w",
+                header=not self._csv_started,
+            )
+            self._csv_started = True
+        self.rows_written += len(df)
+
+    def close(self):
+        """Finalise le fichier de sortie (pied de fichier Parquet)."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# === Fonctions de nettoyage ===
+def new_cleaning_stats():
+    """
+    Crée un dictionnaire de compteurs de nettoyage, cumulables d'un bloc à l'autre.
+
+    Returns:
+        dict: Compteurs initialisés à zéro.
+    """
+    return {
+        "rows_read": 0,  # Lignes brutes lues
+        "duplicates": 0,  # Doublons supprimés
+        "rule_failures": {},  # Code de règle -> lignes en défaut
+        "unexpected_values": {},  # Colonne énumérée -> valeurs inattendues
+        "rows_rejected": 0,  # Lignes écartées par les règles bloquantes
+        "rows_written": 0,  # Lignes nettoyées sauvegardées
+    }
+
+
+def rejects_path_for(output_path):
+    """
+    Construit le chemin du fichier des lignes rejetées associé à un fichier nettoyé.
+
+    Args:
+        output_path (str): Chemin du fichier nettoyé.
+
+    Returns:
+        str: Chemin du fichier CSV des rejets (ex : `..._cleaned_rejects.csv`).
+    """
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_rejects.csv"))
+
+
+@instrumented("data_processing.clean_dataframe", measure=lambda result: {"documents": len(result[0]) + len(result[1])})
+def clean_dataframe(df, stats):
+    """
+    Applique les règles de nettoyage à un DataFrame (complet ou bloc) et cumule les compteurs.
+
+    Les règles de validation (types, plages, énumérations, dates) sont déclarées dans
+    `schema.HEALTHCARE_SCHEMA` et évaluées en une seule passe vectorisée. Les doublons
+    sont supprimés ensuite, sur les lignes normalisées (voir `drop_known_rows`).
+
+    Args:
+        df (DataFrame): Données brutes, avec les noms de colonnes d'origine.
+        stats (dict): Compteurs de nettoyage (voir `new_cleaning_stats`), mis à jour sur place.
+
+    Returns:
+        tuple: (données nettoyées, lignes rejetées avec leur code de rejet), colonnes renommées.
+    """
+    stats["rows_read"] += len(df)
+
+    # Renommage des colonnes
+    df = df.rename(columns=standardize_column_name)
+
+    # Validation des types, plages, énumérations et dates en une seule passe
+    df, rejected, failures, unexpected_values = validate_dataframe(df)
+    stats["rows_rejected"] += len(rejected)
+    for code, count in failures.items():
+        stats["rule_failures"][code] = stats["rule_failures"].get(code, 0) + count
+    for col, values in unexpected_values.items():
+        stats["unexpected_values"].setdefault(col, set()).update(values)
+
+    # Nettoyage des colonnes textuelles et formatage de la colonne 'name'
+    normalize_text(df)
+
+    return df, rejected
+
+
+@instrumented("data_processing.drop_known_rows")
+def drop_known_rows(df, store, stats, source, fingerprints=None, key_columns=None, rejects=False):
+    """
+    Supprime d'un bloc les lignes déjà vues (dans le bloc, un bloc précédent ou une exécution précédente).
+
+    Le dédoublonnage est celui de `dedup.deduplicate` : seules les empreintes de 128 bits
+    des lignes sont conservées par l'index, qui déborde sur disque au-delà de son budget
+    mémoire. Cette fonction y ajoute le décompte des doublons dans les statistiques.
+
+    Args:
+        df (DataFrame): Bloc de données nettoyées (ou rejetées).
+        store (FingerprintStore): Index des empreintes déjà vues.
+        stats (dict): Compteurs de nettoyage, mis à jour sur place.
+        source (str): Nom du fichier source, pour le décompte des doublons par fichier.
+        fingerprints (list, optional): Empreintes déjà calculées (mode parallèle).
+        key_columns (list, optional): Clé naturelle (toutes les colonnes par défaut).
+        rejects (bool): True pour un bloc de lignes rejetées (les doublons ne sont plus comptés comme rejets).
+
+    Returns:
+        DataFrame: Bloc sans doublons.
+    """
+    unique = deduplicate(df, store, source, key_columns, fingerprints)
+    duplicates = len(df) - len(unique)
+    stats["duplicates"] += duplicates
+    if rejects:
+        stats["rows_rejected"] -= duplicates
+    return unique
+
+
+def log_duplicates_by_source(*stores):
+    """
+    Enregistre dans les logs le nombre de doublons détectés par fichier source.
+
+    Args:
+        *stores (FingerprintStore): Index de dédoublonnage (lignes nettoyées, lignes rejetées).
+    """
+    totals = {}
+    for store in stores:
+        for source, count in store.duplicates_by_source.items():
+            totals[source] = totals.get(source, 0) + count
+    for source, count in totals.items():
+        logger.info(f"Doublons dans '{source}' : {count} lignes.")
+
+
+def merge_cleaning_stats(total, partial):
+    """
+    Ajoute les compteurs d'un bloc ou d'une partition aux compteurs globaux.
+
+    Args:
+        total (dict): Compteurs globaux, mis à jour sur place.
+        partial (dict): Compteurs à ajouter.
+    """
+    for key in ("rows_read", "duplicates", "rows_rejected", "rows_written"):
+        total[key] += partial[key]
+    for code, count in partial["rule_failures"].items():
+        total["rule_failures"][code] = total["rule_failures"].get(code, 0) + count
+    for col, values in partial["unexpected_values"].items():
+        total["unexpected_values"].setdefault(col, set()).update(values)
+
+
+def log_cleaning_stats(stats):
+    """
+    Enregistre dans les logs les compteurs de nettoyage cumulés.
+
+    Args:
+        stats (dict): Compteurs de nettoyage (voir `new_cleaning_stats`).
+    """
+    logger.info(f"Doublons supprimés : {stats['duplicates']} lignes.")
+    logger.info("Colonnes renommées pour standardisation.")
+    for rule in compile_rules():
+        count = stats["rule_failures"].get(rule["code"], 0)
+        if rule["action"] == "reject":
+            logger.info(f"Règle '{rule['code']}' : {count} lignes rejetées.")
+        else:
+            logger.info(f"Règle '{rule['code']}' : {count} anomalies signalées (lignes conservées).")
+    for col, invalid_values in stats["unexpected_values"].items():
+        if invalid_values:
+            logger.warning(f"Valeurs inattendues dans '{col}' : {invalid_values}")
+    logger.info(f"Lignes rejetées au total : {stats['rows_rejected']}.")
+    text_cols = [col for col, spec in HEALTHCARE_SCHEMA.items() if spec.get("normalize")]
+    logger.info(f"Colonnes textuelles nettoyées : {text_cols}.")
+
 # === Fonction principale : Traitement des données ===
-def data_processing(output_path):
+def data_processing(
+    output_path,
+    chunksize=None,
+    workers=None,
+    source_dir=SOURCE_DIR,
+    use_cache=True,
+    force=False,
+    compact=False,
+    dedup_store=None,
+    dedup_key=None,
+):
     """
     Télécharge, valide, nettoie et sauvegarde des données médicales.
 
     Args:
-        output_path (str): Chemin pour sauvegarder le fichier nettoyé.
+        output_path (str): Chemin pour sauvegarder le fichier nettoyé (`.csv` ou `.parquet`).
+        chunksize (int, optional): Si renseigné, active le mode streaming : le fichier est lu,
+            nettoyé et sauvegardé par blocs de `chunksize` lignes, ce qui borne la mémoire
+            utilisée quelle que soit la taille du fichier source.
+        workers (int, optional): Si supérieur à 1, active le mode parallèle : le fichier est
+            découpé en plages d'octets nettoyées par `workers` processus.
+        source_dir (str, optional): Miroir local du dataset ; si None, téléchargement Kaggle.
+        use_cache (bool): Réutilise le résultat d'un nettoyage précédent si la source et
+            la version des règles n'ont pas changé.
+        force (bool): Ignore le cache et refait le nettoyage (le résultat est remis en cache).
+        compact (bool): Utilise les types compacts du schéma (catégories, entiers réduits)
+            dès la lecture et pour le fichier Parquet produit ; mode en mémoire uniquement.
+        dedup_store (str, optional): Index d'empreintes SQLite persistant : les lignes déjà
+            vues lors d'exécutions précédentes (ou dans d'autres fichiers) sont aussi écartées.
+            Le résultat dépendant alors de l'historique, le cache est désactivé.
+        dedup_key (list, optional): Colonnes formant la clé naturelle de dédoublonnage
+            (par défaut, la ligne normalisée complète).
+
+    Raises:
+        ValueError: Si `compact` est demandé en mode streaming ou parallèle.
     """
+    if compact and (chunksize or (workers and workers > 1)):
+        raise ValueError("L'option compact n'est disponible qu'en mode en mémoire (sans chunksize ni workers).")
     try:
         # === Étape 1 : Téléchargement et localisation des données ===
-        kaggle_dataset = "prasad22/healthcare-dataset"  # Nom du dataset Kaggle
-        expected_file = "healthcare_dataset.csv"  # Fichier attendu dans le dataset
+        profile_step("Étape 1 : Téléchargement et localisation")
+        file_path = locate_source_file(source_dir)
 
-        logger.info(f"Téléchargement des données depuis Kaggle : {kaggle_dataset}...")
-        try:
-            # Télécharge le dataset depuis Kaggle
-            dataset_path = kagglehub.dataset_download(kaggle_dataset)
-            logger.success(f"Dataset téléchargé avec succès dans : {dataset_path}")
+        # Recherche d'un nettoyage identique dans le cache (même contenu source, mêmes règles).
+        # L'empreinte porte sur le fichier localisé : sans miroir local, le téléchargement
+        # Kaggle a déjà eu lieu et le cache n'économise que le nettoyage.
+        outputs = {"output": output_path, "rejects": rejects_path_for(output_path)}
+        use_cache = use_cache and not dedup_store
+        key = cache_key(file_path, output_path, f"compact={compact}", f"dedup_key={dedup_key}") if use_cache else None
+        if key and not force and restore_from_cache(key, outputs):
+            return
 
-            # Localisation du fichier attendu
-            file_path = Path(dataset_path) / expected_file
-            if not file_path.exists():
-                raise FileNotFoundError(f"Fichier attendu non trouvé : {file_path}")
-
-            logger.info(f"Fichier localisé pour traitement : {file_path}")
-        except Exception as e:
-            logger.error(f"Erreur lors du téléchargement ou de la localisation du fichier : {e}")
-            raise
-
-        # === Étape 2 : Chargement des données ===
-        logger.info(f"Chargement des données depuis : {file_path}")
-        try:
-            df = pd.read_csv(file_path)
-            logger.info(f"Données chargées : {len(df)} lignes, {len(df.columns)} colonnes.")
-            logger.info(f"Colonnes disponibles : {df.columns.tolist()}")
-            logger.info("Types des colonnes avant nettoyage :\n" + str(df.dtypes))
-
-            # Aperçu des premières lignes des données brutes
-            logger.info("Aperçu des premières lignes des données brutes :\n" + str(df.head()))
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement des données : {e}")
-            raise
-
-        # === Étape 3 : Nettoyage des données ===
-        logger.info("Début du nettoyage des données...")
-
-        # Suppression des doublons
-        initial_rows = len(df)
-        df.drop_duplicates(inplace=True)
-        logger.info(f"Doublons supprimés : {initial_rows - len(df)} lignes.")
-
-        # Validation des types de colonnes et gestion des valeurs aberrantes
-        type_checks = {
-            "Age": (int, (0, 120)),  # La colonne 'Age' doit être un entier entre 0 et 120 ans.
-            "Billing Amount": (float, (0, None)),  # 'Billing Amount' doit être un float strictement positif.
-        }
-        for col, (expected_type, valid_range) in type_checks.items():
-            if col in df.columns:
-                # Étape 1 : Conversion des colonnes au type attendu
-                try:
-                    df[col] = df[col].astype(expected_type)
-                    logger.info(f"Colonne '{col}' convertie avec succès en {expected_type}.")
-                except Exception as e:
-                    logger.warning(f"Erreur lors de la conversion de la colonne '{col}' : {e}")
-
-                # Étape 2 : Suppression des valeurs hors limites si une plage est définie
-                if valid_range:
-                    min_val, max_val = valid_range
-                    before_filter = len(df)  # Nombre de lignes avant filtrage
-                    # Filtrage des données en respectant la plage définie
-                    df = df[(df[col] >= min_val) & (df[col] <= max_val if max_val else True)]
-                    logger.info(f"Valeurs aberrantes supprimées pour '{col}' : {before_filter - len(df)} lignes supprimées.")
-
-        # Conversion des colonnes contenant des dates
-        date_cols = ["Date of Admission", "Discharge Date"]
-        for col in date_cols:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
-                invalid_dates = df[col].isna().sum()
-                logger.info(f"Colonne '{col}' : {invalid_dates} valeurs invalides après conversion.")
-
-        # Renommage des colonnes
-        df.rename(columns={c: c.lower().replace(" ", "_") for c in df.columns}, inplace=True)
-        logger.info("Colonnes renommées pour standardisation.")
-
-        # Validation des valeurs dans certaines colonnes
-        if "gender" in df.columns:
-            valid_genders = {"Male", "Female"}
-            invalid_genders = set(df["gender"].unique()) - valid_genders
-            if invalid_genders:
-                logger.warning(f"Valeurs inattendues dans 'gender' : {invalid_genders}")
-
-        if "blood_type" in df.columns:
-            valid_blood_types = {"A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"}
-            invalid_blood_types = set(df["blood_type"].unique()) - valid_blood_types
-            if invalid_blood_types:
-                logger.warning(f"Valeurs inattendues dans 'blood_type' : {invalid_blood_types}")
-
-        # Nettoyage des colonnes textuelles
-        text_cols = ["doctor", "hospital", "medical_condition", "insurance_provider", "medication", "test_results"]
-        for col in text_cols:
-            if col in df.columns:
-                df[col] = df[col].str.strip().str.title()
-                logger.info(f"Colonne '{col}' nettoyée : suppression des espaces et mise en forme standardisée.")
-
-        # Formatage de la colonne 'name' pour une cohérence
-        if "name" in df.columns:
-            df["name"] = df["name"].str.strip().str.title()
-            logger.info("Colonne 'name' formatée avec une majuscule pour chaque mot.")
-
-        # Aperçu des données nettoyées
-        logger.info("Aperçu des premières lignes des données nettoyées :\n" + str(df.head()))
-        logger.info("Types des colonnes après nettoyage :\n" + str(df.dtypes))
-
-        logger.success("Nettoyage des données terminé.")
-
-        # === Étape 4 : Sauvegarde des données nettoyées ===
-        logger.info(f"Sauvegarde des données nettoyées dans : {output_path}")
-        try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            df.to_csv(output_path, index=False)
-            logger.success(f"Fichier nettoyé sauvegardé avec succès dans : {output_path}")
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde des données : {e}")
-            raise
+        # === Étapes 2 à 4 : Chargement, nettoyage et sauvegarde ===
+        if metrics_enabled():
+            observe("data_processing.source", nbytes=os.path.getsize(file_path))
+        with FingerprintStore(dedup_store) as store:
+            # Les modes streaming et parallèle enchaînent les étapes bloc par bloc : une seule mesure
+            if workers and workers > 1:
+                profile_step("Étapes 2 à 4 : Nettoyage parallèle")
+                process_in_parallel(file_path, output_path, workers, store, dedup_key)
+            elif chunksize:
+                profile_step("Étapes 2 à 4 : Nettoyage en streaming")
+                process_in_chunks(file_path, output_path, chunksize, store, dedup_key)
+            else:
+                process_in_memory(file_path, output_path, compact, store, dedup_key)
+
+        if key:
+            store_in_cache(key, outputs, file_path)
 
     except Exception as e:
         logger.critical(f"Erreur critique : {e}")
         raise
 
+# === Mode en mémoire : traitement du fichier complet ===
+@instrumented("data_processing.process_in_memory", measure=lambda stats: {"documents": stats["rows_read"]})
+def process_in_memory(file_path, output_path, compact=False, store=None, dedup_key=None):
+    """
+    Charge, nettoie et sauvegarde le fichier CSV complet en une fois.
+
+    Args:
+        file_path (str): Chemin du fichier CSV brut.
+        output_path (str): Chemin du fichier nettoyé (`.csv` ou `.parquet`).
+        compact (bool): Utilise les types compacts du schéma et journalise le gain mémoire.
+        store (FingerprintStore, optional): Index de dédoublonnage (temporaire si None).
+        dedup_key (list, optional): Clé naturelle de dédoublonnage.
+
+    Returns:
+        dict: Compteurs de nettoyage.
+    """
+    # === Étape 2 : Chargement des données ===
+    profile_step("Étape 2 : Chargement")
+    logger.info(f"Chargement des données depuis : {file_path}")
+    try:
+        # En mode compact, les colonnes catégorielles non normalisées sont typées dès la lecture
+        dtypes = compact_read_dtypes(pd.read_csv(file_path, nrows=0).columns) if compact else None
+        df = pd.read_csv(file_path, dtype=dtypes)
+        logger.info(f"Données chargées : {len(df)} lignes, {len(df.columns)} colonnes.")
+        logger.info(f"Colonnes disponibles : {df.columns.tolist()}")
+        logger.info("Types des colonnes avant nettoyage :\n" + str(df.dtypes))
+
+        # Aperçu des premières lignes des données brutes
+        logger.info("Aperçu des premières lignes des données brutes :\n" + str(df.head()))
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des données : {e}")
+        raise
+
+    # === Étape 3 : Nettoyage des données ===
+    profile_step("Étape 3 : Nettoyage")
+    logger.info("Début du nettoyage des données...")
+    stats = new_cleaning_stats()
+    source = Path(file_path).name
+    df, rejected = clean_dataframe(df, stats)
+    with nullcontext(store) if store else FingerprintStore() as store, FingerprintStore() as rejects_store:
+        df = drop_known_rows(df, store, stats, source, key_columns=dedup_key)
+        rejected = drop_known_rows(rejected, rejects_store, stats, source, rejects=True)
+        log_duplicates_by_source(store, rejects_store)
+    log_cleaning_stats(stats)
+
+    if compact:
+        # Représentation compacte : catégories et entiers réduits
+        memory_before = memory_usage_bytes(df)
+        df = compact_dataframe(df)
+        memory_after = memory_usage_bytes(df)
+        logger.info(
+            f"Mémoire des données nettoyées : {memory_before / 1024**2:.1f} Mo -> {memory_after / 1024**2:.1f} Mo "
+            f"(facteur {memory_before / max(memory_after, 1):.1f})."
+        )
+
+    # Aperçu des données nettoyées
+    logger.info("Aperçu des premières lignes des données nettoyées :\n" + str(df.head()))
+    logger.info("Types des colonnes après nettoyage :\n" + str(df.dtypes))
+
+    logger.success("Nettoyage des données terminé.")
+
+    # === Étape 4 : Sauvegarde des données nettoyées ===
+    profile_step("Étape 4 : Sauvegarde")
+    logger.info(f"Sauvegarde des données nettoyées dans : {output_path}")
+    try:
+        with CleanedDataWriter(output_path, compact=compact) as writer:
+            writer.write(df)
+        stats["rows_written"] = len(df)
+        logger.success(f"Fichier nettoyé sauvegardé avec succès dans : {output_path}")
+
+        # Les lignes rejetées sont conservées avec leur code de rejet pour audit
+        with CleanedDataWriter(rejects_path_for(output_path)) as rejects_writer:
+            rejects_writer.write(rejected)
+        logger.info(f"{len(rejected)} lignes rejetées sauvegardées dans : {rejects_path_for(output_path)}")
+    except Exception as e:
+        logger.error(f"Erreur lors de la sauvegarde des données : {e}")
+        raise
+
+    return stats
+
+# === Mode streaming : traitement par blocs ===
+@instrumented("data_processing.process_in_chunks", measure=lambda stats: {"documents": stats["rows_read"]})
+def process_in_chunks(file_path, output_path, chunksize=DEFAULT_CHUNKSIZE, store=None, dedup_key=None):
+    """
+    Lit, nettoie et sauvegarde un fichier CSV par blocs de taille fixe.
+
+    Seul le bloc courant et les empreintes des lignes déjà vues (pour le dédoublonnage)
+    sont conservés en mémoire ; au-delà du budget mémoire, les empreintes débordent sur
+    disque. Les compteurs de nettoyage sont cumulés sur tous les blocs.
+
+    Args:
+        file_path (str): Chemin du fichier CSV brut.
+        output_path (str): Chemin du fichier nettoyé (`.csv` ou `.parquet`).
+        chunksize (int): Nombre de lignes par bloc.
+        store (FingerprintStore, optional): Index de dédoublonnage (temporaire si None).
+        dedup_key (list, optional): Clé naturelle de dédoublonnage.
+
+    Returns:
+        dict: Compteurs de nettoyage cumulés.
+    """
+    logger.info(f"Traitement en streaming de {file_path} par blocs de {chunksize} lignes...")
+    stats = new_cleaning_stats()
+    source = Path(file_path).name
+
+    try:
+        with CleanedDataWriter(output_path) as writer, \
+                CleanedDataWriter(rejects_path_for(output_path)) as rejects_writer, \
+                nullcontext(store) if store else FingerprintStore() as store, \
+                FingerprintStore() as rejects_store:
+            for chunk_index, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize)):
+                if chunk_index == 0:
+                    logger.info(f"Colonnes disponibles : {chunk.columns.tolist()}")
+                    logger.info("Aperçu des premières lignes des données brutes :\n" + str(chunk.head()))
+
+                cleaned, rejected = clean_dataframe(chunk, stats)
+                cleaned = drop_known_rows(cleaned, store, stats, source, key_columns=dedup_key)
+                rejected = drop_known_rows(rejected, rejects_store, stats, source, rejects=True)
+                writer.write(cleaned)
+                rejects_writer.write(rejected)
+                stats["rows_written"] += len(cleaned)
+                logger.debug(f"Bloc {chunk_index + 1} traité : {len(chunk)} lignes lues, {len(cleaned)} conservées.")
+            log_duplicates_by_source(store, rejects_store)
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement en streaming : {e}")
+        raise
+
+    log_cleaning_stats(stats)
+    logger.info(f"Données lues : {stats['rows_read']} lignes, données sauvegardées : {stats['rows_written']} lignes.")
+    logger.info(f"Lignes rejetées sauvegardées dans : {rejects_path_for(output_path)}")
+    logger.success(f"Fichier nettoyé sauvegardé avec succès dans : {output_path}")
+    return stats
+
+# === Mode parallèle : nettoyage multi-processus par partitions ===
+def split_into_partitions(file_path, partitions):
+    """
+    Découpe un fichier CSV en plages d'octets alignées sur des fins de ligne.
+
+    Le découpage suppose qu'aucun champ ne contient de retour à la ligne, ce qui est
+    le cas du dataset Kaggle.
+
+    Args:
+        file_path (str): Chemin du fichier CSV brut.
+        partitions (int): Nombre de partitions souhaitées.
+
+    Returns:
+        tuple: (liste des noms de colonnes, liste de couples (début, fin) en octets).
+    """
+    file_size = os.path.getsize(file_path)
+    with open(file_path, "rb") as f:
+        columns = pd.read_csv(io.BytesIO(f.readline())).columns.tolist()
+        data_start = f.tell()
+        step = max(1, (file_size - data_start) // partitions)
+
+        offsets = [data_start]
+        for i in range(1, partitions):
+            f.seek(data_start + i * step)
+            f.readline()  # Avance jusqu'au début de la ligne suivante
+            position = f.tell()
+            if offsets[-1] < position < file_size:
+                offsets.append(position)
+        offsets.append(file_size)
+
+    return columns, list(zip(offsets[:-1], offsets[1:]))
+
+
+def clean_partition(file_path, columns, start, end, dedup_key=None):
+    """
+    Nettoie une plage d'octets du fichier CSV (exécutée dans un processus de travail).
+
+    Args:
+        file_path (str): Chemin du fichier CSV brut.
+        columns (list): Noms des colonnes (l'en-tête n'est présent que dans la première plage).
+        start (int): Position de début de la plage (en octets).
+        end (int): Position de fin de la plage (en octets).
+        dedup_key (list, optional): Clé naturelle de dédoublonnage.
+
+    Returns:
+        dict: Données nettoyées et rejetées, empreintes de leurs lignes,
+            compteurs, identifiant du processus et durée de traitement.
+    """
+    started_at = perf_counter()
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        df = pd.read_csv(io.BytesIO(f.read(end - start)), header=None, names=columns)
+
+    stats = new_cleaning_stats()
+    cleaned, rejected = clean_dataframe(df, stats)
+
+    # Empreintes calculées ici ; le dédoublonnage entre partitions est fait par le processus principal
+    return {
+        "data": cleaned,
+        "rejected": rejected,
+        "fingerprints": row_fingerprints(cleaned, dedup_key),
+        "rejected_fingerprints": row_fingerprints(rejected),
+        "stats": stats,
+        "pid": os.getpid(),
+        "seconds": perf_counter() - started_at,
+    }
+
+
+@instrumented("data_processing.process_in_parallel", measure=lambda stats: {"documents": stats["rows_read"]})
+def process_in_parallel(file_path, output_path, workers, store=None, dedup_key=None):
+    """
+    Nettoie un fichier CSV en parallèle sur plusieurs processus et fusionne les résultats dans l'ordre.
+
+    Le fichier est découpé en plages d'octets, chacune lue et nettoyée par un processus avec
+    les mêmes règles que le mode séquentiel. Le processus principal supprime les doublons
+    entre partitions puis écrit les partitions dans leur ordre d'origine.
+
+    Args:
+        file_path (str): Chemin du fichier CSV brut.
+        output_path (str): Chemin du fichier nettoyé (`.csv` ou `.parquet`).
+        workers (int): Nombre de processus de travail.
+        store (FingerprintStore, optional): Index de dédoublonnage (temporaire si None).
+        dedup_key (list, optional): Clé naturelle de dédoublonnage.
+
+    Returns:
+        dict: Compteurs de nettoyage cumulés.
+    """
+    columns, ranges = split_into_partitions(file_path, workers * PARTITIONS_PER_WORKER)
+    logger.info(f"Nettoyage parallèle de {file_path} : {len(ranges)} partitions sur {workers} processus...")
+    stats = new_cleaning_stats()
+    source = Path(file_path).name
+    throughput = {}  # Processus -> partitions, lignes et durée cumulées
+    started_at = perf_counter()
+
+    try:
+        with CleanedDataWriter(output_path) as writer, \
+                CleanedDataWriter(rejects_path_for(output_path)) as rejects_writer, \
+                nullcontext(store) if store else FingerprintStore() as store, \
+                FingerprintStore() as rejects_store, \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(clean_partition, str(file_path), columns, start, end, dedup_key)
+                for start, end in ranges
+            ]
+
+            # Les résultats sont consommés dans l'ordre des partitions pour préserver l'ordre des lignes
+            for future in futures:
+                result = future.result()
+                merge_cleaning_stats(stats, result["stats"])
+
+                # Suppression des doublons déjà écrits par une partition précédente
+                cleaned = drop_known_rows(result["data"], store, stats, source, result["fingerprints"])
+                rejected = drop_known_rows(
+                    result["rejected"], rejects_store, stats, source, result["rejected_fingerprints"], rejects=True
+                )
+
+                writer.write(cleaned)
+                rejects_writer.write(rejected)
+                stats["rows_written"] += len(cleaned)
+
+                worker = throughput.setdefault(result["pid"], {"partitions": 0, "rows": 0, "seconds": 0.0})
+                worker["partitions"] += 1
+                worker["rows"] += result["stats"]["rows_read"]
+                worker["seconds"] += result["seconds"]
+            log_duplicates_by_source(store, rejects_store)
+    except Exception as e:
+        logger.error(f"Erreur lors du nettoyage parallèle : {e}")
+        raise
+
+    log_cleaning_stats(stats)
+
+    # Résumé du débit par processus
+    for pid, worker in sorted(throughput.items()):
+        rate = worker["rows"] / worker["seconds"] if worker["seconds"] else 0
+        logger.info(
+            f"Processus {pid} : {worker['partitions']} partitions, {worker['rows']} lignes "
+            f"en {worker['seconds']:.2f} s ({rate:,.0f} lignes/s)."
+        )
+    elapsed = perf_counter() - started_at
+    logger.info(
+        f"Données lues : {stats['rows_read']} lignes, données sauvegardées : {stats['rows_written']} lignes "
+        f"en {elapsed:.2f} s ({stats['rows_read'] / elapsed if elapsed else 0:,.0f} lignes/s au total)."
+    )
+    logger.info(f"Lignes rejetées sauvegardées dans : {rejects_path_for(output_path)}")
+    logger.success(f"Fichier nettoyé sauvegardé avec succès dans : {output_path}")
+    return stats
+
 # === Programme principal ===
 if __name__ == "__main__":
     # Définition des chemins par défaut
-    output_file = "data/processed/healthcare_dataset_cleaned.csv"
+    output_file = "data/processed/healthcare_dataset_cleaned.parquet"
+
+    parser = ArgumentParser(description="Nettoyage des données médicales avant leur migration vers MongoDB")
+    parser.add_argument(
+        "--output",
+        default=output_file,
+        help="Chemin du fichier nettoyé ; le format (CSV ou Parquet) est déduit de l'extension.",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help=f"Active le mode streaming par blocs de N lignes (ex : {DEFAULT_CHUNKSIZE}).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Active le mode parallèle sur N processus (0 : un par cœur, soit {os.cpu_count()} ici).",
+    )
+    parser.add_argument(
+        "--source-dir",
+        default=SOURCE_DIR,
+        help="Miroir local contenant healthcare_dataset.csv (par défaut : téléchargement Kaggle).",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Mode en mémoire : types compacts (catégories, entiers réduits) et rapport d'occupation mémoire.",
+    )
+    parser.add_argument(
+        "--dedup-store",
+        default=None,
+        help="Index d'empreintes SQLite persistant, pour dédoublonner entre fichiers et entre exécutions.",
+    )
+    parser.add_argument(
+        "--dedup-key",
+        default=None,
+        help="Clé naturelle de dédoublonnage, colonnes standardisées séparées par des virgules (ex : name,date_of_admission).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Désactive le cache des fichiers nettoyés.")
+    parser.add_argument("--force", action="store_true", help="Refait le nettoyage même si le cache est à jour.")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Mesure chaque étape (durée, pic mémoire, piles échantillonnées) et affiche un résumé.",
+    )
+    parser.add_argument(
+        "--profile-cprofile",
+        action="store_true",
+        help="Avec --profile, écrit aussi un profil cProfile (.prof) par étape.",
+    )
+    args = parser.parse_args()
+    if args.workers == 0:
+        args.workers = os.cpu_count()
+    if args.compact and (args.chunksize or (args.workers and args.workers > 1)):
+        parser.error("--compact n'est disponible qu'en mode en mémoire (sans --chunksize ni --workers).")
 
     # Exécution de la fonction principale
-    data_processing(output_path=output_file)
+    with StageProfiler("data_processing", enabled=args.profile, cprofile=args.profile_cprofile):
+        data_processing(
+            output_path=args.output,
+            chunksize=args.chunksize,
+            workers=args.workers,
+            source_dir=args.source_dir,
+            use_cache=not args.no_cache,
+            force=args.force,
+            compact=args.compact,
+            dedup_store=args.dedup_store,
+            dedup_key=args.dedup_key.split(",") if args.dedup_key else None,
+        )
@@ -0,0 +1,162 @@
+# === Importation des bibliothèques nécessaires ===
+import os  # Interaction avec le système de fichiers et variables d'environnement
+import json  # Lecture et écriture des métadonnées du cache
+import shutil  # Copie et suppression des fichiers mis en cache
+from hashlib import sha256  # Empreinte du contenu des fichiers sources
+from pathlib import Path  # Manipulation des chemins
+from time import time  # Horodatage des accès au cache
+from loguru import logger  # Gestion des logs
+from schema import RULES_VERSION  # Version des règles de nettoyage, incluse dans la clé du cache
+
+# === Paramètres du cache ===
+CACHE_DIR = os.getenv("CLEANING_CACHE_DIR", "data/cache")  # Répertoire du cache des fichiers nettoyés
+CACHE_MAX_BYTES = int(os.getenv("CLEANING_CACHE_MAX_BYTES", 5 * 1024**3))  # Taille maximale du cache (5 Go)
+METADATA_FILE = "metadata.json"  # Métadonnées de chaque entrée (source, fichiers, dernier accès)
+READ_BLOCK_SIZE = 4 * 1024**2  # Taille des blocs lus pour le calcul des empreintes
+
+
+def fingerprint_file(file_path):
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier, lu par blocs.
+
+    Args:
+        file_path (str): Chemin du fichier.
+
+    Returns:
+        str: Empreinte hexadécimale.
+    """
+    digest = sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(source_path, output_path, *options):
+    """
+    Construit la clé de cache d'un nettoyage : contenu de la source, version des règles et format de sortie.
+
+    Args:
+        source_path (str): Chemin du fichier brut.
+        output_path (str): Chemin du fichier nettoyé (son extension détermine le format).
+        *options: Options de nettoyage qui modifient le fichier produit.
+
+    Returns:
+        str: Clé hexadécimale.
+    """
+    parts = [fingerprint_file(source_path), RULES_VERSION, Path(output_path).suffix.lower(), *map(str, options)]
+    return sha256("|".join(parts).encode()).hexdigest()
+
+
+def _read_metadata(entry_dir):
+    with open(entry_dir / METADATA_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_metadata(entry_dir, metadata):
+    with open(entry_dir / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def restore_from_cache(key, destinations, cache_dir=CACHE_DIR):
+    """
+    Copie les fichiers d'une entrée du cache vers leurs destinations, si l'entrée existe.
+
+    Une entrée à laquelle il manque un des rôles demandés (fichier jamais enregistré ou
+    supprimé du répertoire du cache) est traitée comme absente : rien n'est copié.
+
+    Args:
+        key (str): Clé de cache.
+        destinations (dict): Rôle du fichier ('output', 'rejects') -> chemin de destination.
+        cache_dir (str): Répertoire du cache.
+
+    Returns:
+        bool: True si l'entrée a été trouvée et restaurée, False sinon.
+    """
+    entry_dir = Path(cache_dir) / key
+    try:
+        metadata = _read_metadata(entry_dir)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+
+    files = metadata.get("files", {})
+    cached_files = {role: entry_dir / files[role] for role in destinations if role in files}
+    if len(cached_files) < len(destinations) or not all(f.is_file() for f in cached_files.values()):
+        logger.warning(f"Entrée du cache incomplète, nettoyage relancé (clé {key[:12]}).")
+        return False
+
+    for role, destination in destinations.items():
+        cached_file = cached_files[role]
+        os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+        # Copie (et non lien) : une réécriture ultérieure de la destination ne doit pas altérer le cache
+        shutil.copyfile(cached_file, destination)
+
+    metadata["last_used"] = time()
+    _write_metadata(entry_dir, metadata)
+    logger.success(f"Données nettoyées restaurées depuis le cache (clé {key[:12]}).")
+    return True
+
+
+def store_in_cache(key, sources, source_path, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Enregistre les fichiers produits par un nettoyage dans le cache, puis applique la limite de taille.
+
+    Args:
+        key (str): Clé de cache.
+        sources (dict): Rôle du fichier ('output', 'rejects') -> chemin du fichier produit.
+        source_path (str): Chemin du fichier brut (conservé dans les métadonnées).
+        cache_dir (str): Répertoire du cache.
+        max_bytes (int): Taille maximale du cache, en octets.
+    """
+    entry_dir = Path(cache_dir) / key
+    os.makedirs(entry_dir, exist_ok=True)
+
+    files = {}
+    for role, path in sources.items():
+        if os.path.exists(path):
+            files[role] = f"{role}{Path(path).suffix}"
+            shutil.copyfile(path, entry_dir / files[role])
+
+    _write_metadata(entry_dir, {
+        "source": str(source_path),
+        "rules_version": RULES_VERSION,
+        "files": files,
+        "created": time(),
+        "last_used": time(),
+    })
+    logger.info(f"Données nettoyées ajoutées au cache (clé {key[:12]}).")
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Supprime les entrées les moins récemment utilisées jusqu'à respecter la taille maximale.
+
+    Args:
+        cache_dir (str): Répertoire du cache.
+        max_bytes (int): Taille maximale du cache, en octets.
+
+    Returns:
+        int: Nombre d'entrées supprimées.
+    """
+    entries = []
+    for entry_dir in Path(cache_dir).iterdir() if os.path.isdir(cache_dir) else []:
+        if not entry_dir.is_dir():
+            continue
+        size = sum(f.stat().st_size for f in entry_dir.iterdir() if f.is_file())
+        try:
+            last_used = _read_metadata(entry_dir)["last_used"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            last_used = 0  # Entrée incomplète : supprimée en priorité
+        entries.append((last_used, size, entry_dir))
+
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for last_used, size, entry_dir in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
+        evicted += 1
+        logger.info(f"Entrée du cache supprimée (limite de {max_bytes} octets) : {entry_dir.name[:12]}")
+    return evicted
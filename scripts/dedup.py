@@ -0,0 +1,155 @@
+# === Importation des bibliothèques nécessaires ===
+import os  # Interaction avec le système de fichiers et variables d'environnement
+import sqlite3  # Index d'empreintes sur disque
+import tempfile  # Fichier temporaire pour le débordement sur disque
+import numpy as np  # Manipulation vectorisée des empreintes
+import pandas as pd  # Calcul des empreintes de lignes
+from loguru import logger  # Gestion des logs
+
+# === Paramètres du dédoublonnage ===
+DEDUP_MEMORY_BUDGET_MB = int(os.getenv("DEDUP_MEMORY_BUDGET_MB", 256))  # Budget mémoire de l'index d'empreintes
+BYTES_PER_FINGERPRINT = 120  # Coût approximatif d'une empreinte de 16 octets dans un set Python
+HASH_KEYS = ("healthcare-rows1", "healthcare-rows2")  # Deux clés de hachage -> empreinte de 128 bits
+
+
+def row_fingerprints(df, key_columns=None):
+    """
+    Calcule une empreinte de 128 bits par ligne, sur toutes les colonnes ou sur une clé naturelle.
+
+    Deux hachages 64 bits indépendants sont concaténés : le risque de collision reste
+    négligeable même sur des milliards de lignes.
+
+    Args:
+        df (DataFrame): Données (normalisées) à dédoublonner.
+        key_columns (list, optional): Colonnes formant la clé naturelle (toutes par défaut).
+
+    Returns:
+        list: Empreintes (bytes de 16 octets), dans l'ordre des lignes.
+    """
+    data = df[key_columns] if key_columns else df
+    halves = [pd.util.hash_pandas_object(data, index=False, hash_key=key).to_numpy() for key in HASH_KEYS]
+    return np.ascontiguousarray(np.column_stack(halves)).view("V16").ravel().tolist()
+
+
+class FingerprintStore:
+    """
+    Index d'empreintes de lignes déjà vues, en mémoire puis débordant sur disque.
+
+    Les empreintes sont conservées dans un set Python tant que le budget mémoire le
+    permet ; au-delà, elles sont déversées dans une base SQLite locale et le set est
+    vidé. Avec un chemin persistant, l'index survit entre les exécutions et permet de
+    dédoublonner entre fichiers ou entre chargements successifs.
+
+    Args:
+        path (str, optional): Base SQLite persistante. Si None, un fichier temporaire est
+            créé au premier débordement et supprimé à la fermeture.
+        memory_budget_mb (int): Budget mémoire de la partie en mémoire, en Mo.
+    """
+
+    def __init__(self, path=None, memory_budget_mb=DEDUP_MEMORY_BUDGET_MB):
+        self.path = path
+        self.max_in_memory = max(1, memory_budget_mb * 1024**2 // BYTES_PER_FINGERPRINT)
+        self.duplicates_by_source = {}  # Source (fichier) -> nombre de doublons détectés
+        self._memory = set()
+        self._db = None
+        self._temporary_path = None
+        if path:
+            self._open_database(path)
+
+    def _open_database(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS fingerprints (k BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._db.execute("CREATE TEMP TABLE batch (k BLOB PRIMARY KEY) WITHOUT ROWID")
+
+    def _spill(self):
+        """Déverse les empreintes en mémoire dans la base SQLite."""
+        if self._db is None:
+            handle, self._temporary_path = tempfile.mkstemp(suffix=".sqlite", prefix="dedup_")
+            os.close(handle)
+            self._open_database(self._temporary_path)
+            logger.info(f"Index de dédoublonnage déversé sur disque : {self._temporary_path}")
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO fingerprints VALUES (?)", ((k,) for k in self._memory))
+        self._memory.clear()
+
+    def _known_on_disk(self, candidates):
+        """Retourne les empreintes candidates déjà présentes dans la base SQLite."""
+        if self._db is None or not candidates:
+            return set()
+        with self._db:
+            self._db.execute("DELETE FROM batch")
+            self._db.executemany("INSERT OR IGNORE INTO batch VALUES (?)", ((k,) for k in candidates))
+            rows = self._db.execute("SELECT k FROM batch JOIN fingerprints USING (k)").fetchall()
+        return {row[0] for row in rows}
+
+    def add(self, fingerprints, source=""):
+        """
+        Enregistre un lot d'empreintes et indique lesquelles sont nouvelles.
+
+        Args:
+            fingerprints (list): Empreintes du lot (voir `row_fingerprints`).
+            source (str): Libellé de la source (fichier), pour le décompte des doublons.
+
+        Returns:
+            numpy.ndarray: Masque booléen, True pour les lignes vues pour la première fois.
+        """
+        in_batch = pd.Series(fingerprints, dtype=object).duplicated().to_numpy()
+        is_new = np.fromiter(
+            (not dup and k not in self._memory for k, dup in zip(fingerprints, in_batch)),
+            dtype=bool,
+            count=len(fingerprints),
+        )
+        if self._db is not None:
+            on_disk = self._known_on_disk([k for k, new in zip(fingerprints, is_new) if new])
+            if on_disk:
+                is_new &= np.fromiter((k not in on_disk for k in fingerprints), dtype=bool, count=len(fingerprints))
+
+        self._memory.update(k for k, new in zip(fingerprints, is_new) if new)
+        if len(self._memory) > self.max_in_memory:
+            self._spill()
+
+        duplicates = int(len(fingerprints) - is_new.sum())
+        self.duplicates_by_source[source] = self.duplicates_by_source.get(source, 0) + duplicates
+        return is_new
+
+    def close(self):
+        """Persiste les empreintes restantes (index persistant) et libère les ressources."""
+        if self._db is None:
+            return
+        if self.path:
+            self._spill()
+        self._db.close()
+        self._db = None
+        if self._temporary_path:
+            os.remove(self._temporary_path)
+            self._temporary_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def deduplicate(df, store, source="", key_columns=None, fingerprints=None):
+    """
+    Supprime d'un lot les lignes dont l'empreinte a déjà été vue.
+
+    Args:
+        df (DataFrame): Lot de données normalisées.
+        store (FingerprintStore): Index des empreintes déjà vues.
+        source (str): Libellé de la source, pour le décompte des doublons par fichier.
+        key_columns (list, optional): Clé naturelle (toutes les colonnes par défaut).
+        fingerprints (list, optional): Empreintes déjà calculées (par exemple dans un
+            processus de nettoyage parallèle).
+
+    Returns:
+        DataFrame: Lot sans doublons.
+    """
+    if df.empty:
+        return df
+    if fingerprints is None:
+        fingerprints = row_fingerprints(df, key_columns)
+    is_new = store.add(fingerprints, source)
+    return df if is_new.all() else df.take(np.flatnonzero(is_new))
@@ -0,0 +1,96 @@
+# === Importation des bibliothèques nécessaires ===
+import numpy as np  # Masques des valeurs manquantes
+import pandas as pd  # Manipulation des DataFrames
+from bson import ObjectId  # Identifiants MongoDB déterministes
+from dedup import row_fingerprints  # Empreintes de 128 bits des lignes
+from schema import HEALTHCARE_SCHEMA  # Types attendus des colonnes des patients
+
+
+def column_values(series, spec=None):
+    """
+    Convertit une colonne en liste de valeurs Python natives, encodables en BSON.
+
+    Les dates deviennent des `datetime`, les entiers des `int` et les flottants des
+    `float` ; les valeurs manquantes deviennent None.
+
+    Args:
+        series (Series): Colonne à convertir.
+        spec (dict, optional): Spécification de la colonne dans le schéma (type attendu).
+
+    Returns:
+        tuple: (liste des valeurs, True si la colonne contient des valeurs manquantes).
+    """
+    expected = (spec or {}).get("type")
+
+    # Les dates lues depuis un CSV sont encore des chaînes : conversion selon le schéma
+    if expected == "datetime" and not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors="coerce")
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+
+    missing = series.isna().to_numpy()
+    has_missing = bool(missing.any())
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = pd.DatetimeIndex(series).to_pydatetime()
+    elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=object, na_value=None) if has_missing else series.to_numpy()
+    elif pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        if expected == "int" and not (values[~missing] % 1).any():
+            # Colonne entière lue en flottants à cause de valeurs manquantes
+            values = np.where(missing, 0, values).astype("int64")
+    else:
+        values = series.to_numpy(dtype=object)
+
+    values = values.tolist()
+    if has_missing:
+        for position in np.flatnonzero(missing):
+            values[position] = None
+    return values, has_missing
+
+
+def records_from_dataframe(df, schema=HEALTHCARE_SCHEMA):
+    """
+    Construit les documents MongoDB d'un lot de patients à partir des colonnes, en bloc.
+
+    Chaque colonne est convertie une seule fois en valeurs Python natives (voir
+    `column_values`), puis les documents sont assemblés ligne par ligne. Les champs
+    manquants sont omis du document plutôt que stockés comme NaN.
+
+    Args:
+        df (DataFrame): Lot de données aux colonnes standardisées.
+        schema (dict): Schéma déclaratif des colonnes (types attendus).
+
+    Returns:
+        list: Documents (dictionnaires), un par ligne.
+    """
+    names = [str(name) for name in df.columns]
+    columns = []
+    any_missing = False
+    for name in df.columns:
+        values, has_missing = column_values(df[name], schema.get(name))
+        columns.append(values)
+        any_missing = any_missing or has_missing
+
+    if not any_missing:
+        return [dict(zip(names, row)) for row in zip(*columns)]
+    return [{name: value for name, value in zip(names, row) if value is not None} for row in zip(*columns)]
+
+
+def document_ids(df, key_columns=None):
+    """
+    Calcule un `_id` déterministe par ligne, dérivé d'une clé naturelle ou de la ligne complète.
+
+    Les 12 premiers octets de l'empreinte de la ligne forment un `ObjectId` : le même
+    fichier produit toujours les mêmes identifiants, ce qui rend le rejeu d'un lot
+    idempotent (voir `checkpoint.resumable_load`).
+
+    Args:
+        df (DataFrame): Lot de données.
+        key_columns (list, optional): Colonnes formant la clé naturelle (toutes par défaut).
+
+    Returns:
+        list: Identifiants (`ObjectId`), dans l'ordre des lignes.
+    """
+    return [ObjectId(bytes(fingerprint)[:12]) for fingerprint in row_fingerprints(df, key_columns)]
@@ -1,5 +1,7 @@
 import pandas as pd  # Pour afficher les résultats sous forme de tableau
-from crud import insert_records, read_records, update_records, delete_records, export_to_csv  # Fonctions CRUD
+from crud import insert_records, iter_pages, PAGE_SIZE, update_records, delete_records, export_to_csv, export_to_csv_parallel, export_path_for, available_compressions, check_compression  # Fonctions CRUD
+from query_cache import cache_stats  # Statistiques du cache des lectures
+from analytics import SUMMARIES, read_summary, refresh_summary  # Résumés pré-agrégés
 from loguru import logger  # Gestion des logs
 
 def display_menu(role):
@@ -17,7 +19,9 @@ def display_menu(role):
     if role == "admin_user":
         print("4. Supprimer un document (DELETE)")
     print("5. Exporter les données dans un fichier CSV")
-    print("6. Quitter")
+    print("6. Consulter les indicateurs agrégés")
+    print("7. Statistiques du cache des lectures")
+    print("8. Quitter")
 
 
 def handle_read(collection):
@@ -29,14 +33,24 @@ def handle_read(collection):
         # Option de filtrage personnalisé
         filter_query = input("Entrez un filtre JSON (laisser vide pour aucun filtre) : ").strip()
         filter_query = eval(filter_query) if filter_query else {}
-        limit = int(input("Entrez une limite de documents (par défaut : 10) : ") or 10)
-
-        # Lecture des documents
-        docs = read_records(collection, filter_query, limit)
-        if docs:
-            df = pd.DataFrame(docs)
-            print(df)  # Affichage tabulaire
-        else:
+        page_size = int(input(f"Entrez le nombre de documents par page (par défaut : {PAGE_SIZE}) : ") or PAGE_SIZE)
+        sort_field = input("Champ de tri indexé (par défaut : _id) : ").strip() or "_id"
+        descending = input("Tri décroissant ? (o/N) : ").strip().lower() == "o"
+
+        # Lecture paginée : chaque page n'est demandée au serveur qu'au moment de l'afficher
+        found = False
+        for page_number, (docs, next_token) in enumerate(
+            iter_pages(
+                collection, filter_query, sort_field=sort_field, page_size=page_size, descending=descending, use_cache=True
+            ),
+            start=1,
+        ):
+            found = True
+            print(f"\n--- Page {page_number} ---")
+            print(pd.DataFrame(docs))  # Affichage tabulaire de la page
+            if not next_token or input("Page suivante ? (O/n) : ").strip().lower() == "n":
+                break
+        if not found:
             print("Aucun document trouvé.")
     except Exception as e:
         logger.error(f"Erreur lors de la lecture des documents : {e}")
@@ -78,7 +92,7 @@ def handle_update(collection):
         update_query = eval(input("Entrez la mise à jour à appliquer (ex: {\"$set\": {\"age\": 40}}) : "))
 
         # Mise à jour
-        updated_count = update_records(collection, filter_query, update_query)
+        updated_count = update_records(collection, filter_query, update_query, echo=True)
         print(f"{updated_count} document(s) mis à jour.")
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour : {e}")
@@ -107,15 +121,69 @@ def handle_export(collection):
     try:
         print("\n=== EXPORT : Exportation des documents ===")
         file_name = input("Entrez le nom du fichier CSV (sans extension) : ").strip()
-        exported_count = export_to_csv(collection, file_name)
+        # Options de filtrage, de sélection des champs et de compression
+        filter_query = input("Entrez un filtre JSON (laisser vide pour tout exporter) : ").strip()
+        filter_query = eval(filter_query) if filter_query else {}
+        fields = input("Entrez les champs à exporter, séparés par des virgules (laisser vide pour tous) : ").strip()
+        fields = [field.strip() for field in fields.split(",") if field.strip()] or None
+        compression = input(f"Compression ({', '.join(available_compressions())} ou vide pour aucune) : ").strip().lower() or None
+        check_compression(compression)  # Refus immédiat si le module de compression manque
+        parallel = input("Export parallèle par plages de dates d'admission ? (o/N) : ").strip().lower() == "o"
+
+        if parallel:
+            exported_count = export_to_csv_parallel(
+                collection, file_name, query=filter_query, fields=fields, compression=compression
+            )
+        else:
+            exported_count = export_to_csv(collection, file_name, query=filter_query, fields=fields, compression=compression)
         if exported_count > 0:
-            print(f"{exported_count} document(s) exporté(s) dans 'outputs/{file_name}.csv'.")
+            print(f"{exported_count} document(s) exporté(s) dans '{export_path_for(file_name, compression)}'.")
         else:
             print("Aucun document n'a été exporté.")
     except Exception as e:
         logger.error(f"Erreur lors de l'exportation : {e}")
 
 
+def handle_summaries(collection, role):
+    """
+    Consultation des résumés pré-agrégés (admissions, facturation, durées de séjour).
+    """
+    try:
+        print("\n=== INDICATEURS : Résumés pré-agrégés ===")
+        names = list(SUMMARIES)
+        for number, name in enumerate(names, start=1):
+            print(f"{number}. {SUMMARIES[name]['description']}")
+        summary_name = names[int(input("Choisissez un résumé : ").strip()) - 1]
+
+        # Actualisation incrémentale réservée aux rôles en écriture
+        if role in ["admin_user", "editor_user"]:
+            if input("Actualiser le résumé avant la lecture ? (o/N) : ").strip().lower() == "o":
+                refresh_summary(collection, summary_name)
+
+        filter_query = input("Entrez un filtre JSON sur le résumé (laisser vide pour aucun filtre) : ").strip()
+        filter_query = eval(filter_query) if filter_query else {}
+        limit = int(input("Entrez une limite de lignes (par défaut : 20) : ") or 20)
+
+        rows = read_summary(collection, summary_name, filter_query, limit)
+        if rows:
+            print(pd.json_normalize(rows))  # Clés de regroupement composées mises à plat
+        else:
+            print("Résumé vide : actualisez-le ou chargez des données.")
+    except Exception as e:
+        logger.error(f"Erreur lors de la consultation des indicateurs : {e}")
+
+
+def handle_cache_stats():
+    """
+    Affiche les statistiques du cache des lectures (succès, échecs, évictions, mémoire).
+    """
+    stats = cache_stats()
+    print("\n=== CACHE : Statistiques des lectures ===")
+    print(f"Succès : {stats['hits']} | Échecs : {stats['misses']} | Taux de succès : {stats['hit_rate']:.1%}")
+    print(f"Résultats en cache : {stats['entries']} ({stats['bytes'] / 1024:.1f} Kio)")
+    print(f"Évictions : {stats['evictions']} | Expirations : {stats['expirations']} | Invalidations : {stats['invalidations']}")
+
+
 def interactive_menu(role, collection):
     """
     Lance le menu interactif en fonction du rôle et de la collection MongoDB.
@@ -138,6 +206,10 @@ def interactive_menu(role, collection):
         elif choice == "5":
             handle_export(collection)
         elif choice == "6":
+            handle_summaries(collection, role)
+        elif choice == "7":
+            handle_cache_stats()
+        elif choice == "8":
             print("Fermeture de l'interface interactive.")
             break
         else:
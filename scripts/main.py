@@ -1,7 +1,11 @@
 # Importation des bibliothèques et modules nécessaires
-from utils import connect_to_mongodb, load_data, create_indexes  # Fonctions utilitaires pour MongoDB et chargement de données
+from utils import connect_to_mongodb, create_indexes, drop_secondary_indexes, INSERT_BATCH_SIZE, MONGO_URI  # Fonctions utilitaires pour MongoDB et chargement de données
 from auth import authenticate_user  # Fonction pour authentifier un utilisateur
-from crud import insert_records, read_records, update_records, delete_records, export_to_csv  # Opérations CRUD
+from crud import insert_records, read_records, update_records, delete_records, export_to_csv, INSERT_WORKERS  # Opérations CRUD
+from checkpoint import checkpoint_path_for, load_completed, resumable_load  # Chargement par lots avec point de reprise
+from analytics import refresh_summaries  # Résumés pré-agrégés
+from metrics import metrics_enabled, start_metrics_server, METRICS_PORT  # Point d'accès des métriques
+from profiling import StageProfiler  # Profilage étape par étape (--profile)
 from interactive_cli import interactive_menu  # Importation du menu interactif
 from test import ( 
     DEFAULT_COLLECTION_NAME,
@@ -14,6 +18,8 @@ from test import (
     read_all_data,
     update_data,
     delete_specific_data,
+    async_operations,
+    summaries_after_load,
     export_final_data,
 )  # Importation des tests CRUD
 from argparse import ArgumentParser  # Analyse des arguments en ligne de commande
@@ -21,6 +27,7 @@ from getpass import getpass  # Saisie sécurisée des mots de passe
 from loguru import logger  # Gestion avancée des logs
 import os  # Manipulation des chemins et variables d'environnement
 import sys  # Interactions système
+from time import perf_counter  # Mesure de la durée de construction des index
 
 # Configuration de Loguru pour éviter les doublons
 if not logger._core.handlers:
@@ -32,21 +39,77 @@ logger.add(LOG_FILE, level="INFO", rotation="1 MB", compression="zip")
 
 # === Bloc principal ===
 if __name__ == "__main__":
+    # Les options de profilage sont lues avant les autres, pour que l'étape 1 soit mesurée
+    profile_parser = ArgumentParser(add_help=False)
+    profile_parser.add_argument("--profile", action="store_true")
+    profile_parser.add_argument("--profile-cprofile", action="store_true")
+    profile_args, _ = profile_parser.parse_known_args()
+    profiler = StageProfiler("main", enabled=profile_args.profile, cprofile=profile_args.profile_cprofile).activate()
     try:
         # === Étape 1 : Analyse des arguments en ligne de commande ===
+        profiler.step("Étape 1 : Analyse des arguments")
         parser = ArgumentParser(description="Interface CLI CRUD pour MongoDB")
-        parser.add_argument("file_path", help="Chemin complet du fichier CSV contenant les données à charger.")
+        parser.add_argument("file_path", help="Chemin complet du fichier CSV ou Parquet contenant les données à charger.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=INSERT_BATCH_SIZE,
+            help=f"Nombre de documents par lot d'insertion (par défaut : {INSERT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--insert-workers",
+            type=int,
+            default=INSERT_WORKERS,
+            help=f"Nombre de lots insérés en parallèle (par défaut : {INSERT_WORKERS}, variable MONGO_INSERT_WORKERS).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Reprend un chargement interrompu depuis son point de reprise, sans vider la collection.",
+        )
+        parser.add_argument(
+            "--sequential-indexes",
+            action="store_true",
+            help="Reconstruit les index un par un pour chronométrer chacun (par défaut : un seul appel groupé).",
+        )
+        parser.add_argument(
+            "--compact",
+            action="store_true",
+            help="Convertit chaque lot vers les types compacts du schéma avant l'insertion (par défaut : types d'origine).",
+        )
+        parser.add_argument(
+            "--id-key",
+            default=None,
+            help="Clé naturelle des identifiants, colonnes séparées par des virgules (par défaut : empreinte de la ligne).",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Mesure chaque étape (durée, pic mémoire, piles échantillonnées) et affiche un résumé.",
+        )
+        parser.add_argument(
+            "--profile-cprofile",
+            action="store_true",
+            help="Avec --profile, écrit aussi un profil cProfile (.prof) par étape.",
+        )
         args = parser.parse_args()  # Analyse les arguments fournis en ligne de commande
 
         if not os.path.exists(args.file_path):
             logger.error(f"Fichier introuvable : {args.file_path}")
             exit(1)
+
+        # Métriques exposées en HTTP pendant l'exécution (variables METRICS_ENABLED et METRICS_PORT) ;
+        # elles sont aussi écrites dans outputs/metrics/ à la fin du processus
+        if metrics_enabled() and METRICS_PORT:
+            start_metrics_server(METRICS_PORT)
         
         # === Étape 2 : Connexion à MongoDB ===
+        profiler.step("Étape 2 : Connexion à MongoDB")
         logger.info("Connexion à MongoDB en cours...")
-        db = connect_to_mongodb("mongodb://mongodb_service_container:27017/")
+        db = connect_to_mongodb(MONGO_URI)
 
         # === Étape 3 : Authentification de l'utilisateur ===
+        profiler.step("Étape 3 : Authentification")
         logger.info("=== Authentification requise ===")
         username = input("Entrez votre nom d'utilisateur : ").strip()  # Demande le nom d'utilisateur
         password = getpass("Entrez votre mot de passe : ").strip()  # Demande le mot de passe en mode sécurisé
@@ -57,34 +120,67 @@ if __name__ == "__main__":
             exit(1)
 
         # === Étape 4 : Identification du rôle de l'utilisateur ===
+        profiler.step("Étape 4 : Identification du rôle")
         role = user["role"]
         logger.info(f"Authentification réussie. Rôle détecté : {role}")
 
-        # === Étape 5 : Chargement des données depuis le fichier CSV ===
-        logger.info(f"Tentative de chargement des données depuis : {args.file_path}")
-        records = load_data(args.file_path)
-
-        # === Étape 6 : Accès à la collection MongoDB ===
+        # === Étape 5 : Accès à la collection MongoDB ===
+        profiler.step("Étape 5 : Accès et purge de la collection")
         collection = db["patients_data"]
 
-        # Nettoyage explicite de la collection principale
-        logger.info("Nettoyage de la collection principale avant les tests...")
-        collection.delete_many({})
-        assert collection.count_documents({}) == 0, "La collection principale n'est pas vide après le nettoyage."
+        if args.resume:
+            # La collection est conservée : les lots validés ne sont pas rechargés
+            logger.info("Mode reprise : la collection principale est conservée.")
+        else:
+            # Nettoyage explicite de la collection principale
+            logger.info("Nettoyage de la collection principale avant les tests...")
+            collection.delete_many({})
+            assert collection.count_documents({}) == 0, "La collection principale n'est pas vide après le nettoyage."
 
-        # === Étape 7 : Vérification et insertion des données ===
-        if collection.count_documents({}) > 0:  # Si la collection contient déjà des données
-            logger.info("Collection déjà remplie. Aucune nouvelle insertion.")
+        # Les index secondaires sont supprimés puis reconstruits après le chargement,
+        # plus rapide que leur mise à jour à chaque insertion ; ils sont conservés si la
+        # reprise n'a rien à charger
+        checkpoint_path = checkpoint_path_for(collection.name)
+        id_columns = args.id_key.split(",") if args.id_key else None
+        if args.resume and load_completed(checkpoint_path, args.file_path, args.batch_size, id_columns):
+            logger.info("Chargement déjà terminé d'après le point de reprise : index conservés.")
         else:
-            logger.info("La collection est vide. Insertion des données...")
-            inserted_count = insert_records(collection, records)
-            logger.info(f"{inserted_count} documents insérés depuis le fichier {args.file_path}.")
+            drop_secondary_indexes(collection)
+
+        # === Étapes 6 et 7 : Chargement des données depuis le fichier CSV ou Parquet et insertion ===
+        profiler.step("Étapes 6 et 7 : Chargement et insertion")
+        # Les documents sont produits par lots au moment de l'insertion : la mémoire reste
+        # proportionnelle à la taille d'un lot et non à celle du fichier. Un point de reprise
+        # enregistre les lots validés pour pouvoir reprendre un chargement interrompu.
+        logger.info(f"Chargement des données depuis : {args.file_path}")
+        inserted_count = resumable_load(
+            collection,
+            args.file_path,
+            checkpoint_path,
+            resume=args.resume,
+            batch_size=args.batch_size,
+            workers=args.insert_workers,
+            id_columns=id_columns,
+            compact=args.compact,
+        )
+        logger.info(f"{inserted_count} documents chargés depuis le fichier {args.file_path}.")
 
         # === Étape 8 : Création des index dans MongoDB ===
+        profiler.step("Étape 8 : Création des index")
         logger.info("Création des index pour optimiser les requêtes.")
-        create_indexes(collection)
+        started_at = perf_counter()
+        create_indexes(collection, batched=not args.sequential_indexes)
+        logger.info(f"Index reconstruits en {perf_counter() - started_at:.2f} s.")
+
+        # === Étape 8 bis : Indicateurs agrégés ===
+        # Résumés pré-agrégés : reconstruction complète après tout chargement (la collection
+        # a été vidée, ou les lots rejoués par la reprise ont été réécrits)
+        profiler.step("Étape 8 bis : Indicateurs agrégés")
+        logger.info("Reconstruction des indicateurs agrégés.")
+        refresh_summaries(collection, full=True)
 
         # === Étape 9 : Préparation de l'environnement pour les tests ===
+        profiler.step("Étape 9 : Copie de la collection de test")
         logger.info("=== Préparation de l'environnement pour les tests ===")
  
         # Utiliser `connect_to_collection` pour obtenir la collection principale
@@ -109,6 +205,7 @@ if __name__ == "__main__":
         remove_export_file("test_export")  # Supprime le fichier CSV précédent pour éviter les conflits
 
         # === Étape 10 : Exécution des tests unitaires ===
+        profiler.step("Étape 10 : Tests")
         logger.info("=== Début des tests ===")
 
         # Initialisation des compteurs pour suivre les résultats des tests
@@ -121,6 +218,8 @@ if __name__ == "__main__":
             ("Lecture de toutes les données", read_all_data),           # Test pour lire toutes les données
             ("Mise à jour de documents", update_data),                  # Test pour appliquer des mises à jour
             ("Suppression de documents spécifiques", delete_specific_data),  # Test pour supprimer des documents
+            ("Opérations asynchrones", async_operations),               # Test de la couche CRUD asynchrone
+            ("Résumés après chargement", summaries_after_load),         # Test des résumés reconstruits après un chargement
             ("Exportation des données", export_final_data),             # Test pour exporter les données vers un CSV
         ]
 
@@ -151,6 +250,8 @@ if __name__ == "__main__":
         logger.info(f"Tests échoués : {test_results['failure']}")  # Nombre total de tests échoués
 
         # === Étape 11 : Lancer l'interface utilisateur CLI ===
+        # Le profil est clos avant le menu interactif, dont la durée dépend de l'utilisateur
+        profiler.finish()
         if test_results["failure"] == 0:
             logger.info("Tous les tests ont été validés. Lancement de l'interface CLI.")
             interactive_menu(role, collection)
@@ -159,3 +260,5 @@ if __name__ == "__main__":
 
     except Exception as e:
         logger.error(f"Erreur lors de l'exécution du script : {e}")
+    finally:
+        profiler.finish()  # Sans effet si le profil est déjà clos
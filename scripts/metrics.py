@@ -0,0 +1,366 @@
+# === Importation des bibliothèques nécessaires ===
+import atexit  # Écriture des métriques à la fin du processus
+import json  # Instantané des métriques au format JSON
+import os  # Paramètres via les variables d'environnement, écriture atomique des fichiers
+import threading  # Protection du registre partagé entre threads, serveur HTTP en arrière-plan
+from bisect import bisect_left  # Recherche du compartiment d'un histogramme
+from datetime import datetime, timezone  # Horodatage des instantanés
+from functools import wraps  # Conservation du nom et de la docstring des fonctions instrumentées
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Point d'accès /metrics
+from time import perf_counter  # Mesure des durées
+from loguru import logger  # Gestion des logs
+
+# === Paramètres des métriques (surchargés par variables d'environnement) ===
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes", "on")  # Désactivées par défaut
+METRICS_DIR = os.getenv("METRICS_DIR", "outputs/metrics")  # Répertoire des fichiers `metrics.prom` et `metrics.json`
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # Port du point d'accès HTTP (0 : pas de serveur)
+METRICS_PREFIX = "healthcare"  # Préfixe des noms de métriques Prometheus
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)  # Bornes des durées (s)
+BATCH_SIZE_BUCKETS = (1, 10, 100, 1_000, 5_000, 10_000, 50_000, 100_000)  # Bornes des tailles de lots
+
+
+class OperationStats:
+    """
+    Compteurs et histogrammes d'une opération (ex : `crud.insert_batch`).
+
+    Les histogrammes conservent le nombre d'observations par compartiment (non cumulé) ;
+    le cumul attendu par Prometheus est calculé à l'export.
+    """
+
+    __slots__ = (
+        "calls", "errors", "documents", "bytes", "seconds_total", "seconds_max",
+        "latency_counts", "batch_counts", "batch_total", "batches", "last_docs_per_sec",
+    )
+
+    def __init__(self):
+        self.calls = self.errors = self.documents = self.bytes = self.batch_total = self.batches = 0
+        self.seconds_total = self.seconds_max = self.last_docs_per_sec = 0.0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Dernier compartiment : +Inf
+        self.batch_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def snapshot(self):
+        """Retourne les compteurs de l'opération sous forme de dictionnaire (voir `MetricsRegistry.snapshot`)."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "seconds_total": self.seconds_total,
+            "seconds_mean": self.seconds_total / self.calls if self.calls else 0.0,
+            "seconds_max": self.seconds_max,
+            "docs_per_sec": self.documents / self.seconds_total if self.seconds_total else 0.0,
+            "last_docs_per_sec": self.last_docs_per_sec,
+            "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.latency_counts)),
+            "batch_size_total": self.batch_total,
+            "batch_size_mean": self.batch_total / self.batches if self.batches else 0.0,
+            "batch_size_buckets": dict(zip([*map(str, BATCH_SIZE_BUCKETS), "+Inf"], self.batch_counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Registre des métriques du processus, sûr entre threads.
+
+    Une observation coûte deux lectures d'horloge, une recherche dichotomique et un verrou :
+    quelques microsecondes, négligeables devant un aller-retour MongoDB ou le traitement
+    d'un lot. Désactivé, le registre ignore les observations sans rien mesurer.
+
+    Args:
+        enabled (bool): Active l'enregistrement des observations.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._operations = {}  # Opération -> OperationStats
+        self._lock = threading.Lock()
+
+    def observe(self, operation, seconds=None, documents=0, nbytes=0, batch_size=None, errors=0):
+        """
+        Enregistre une observation.
+
+        Args:
+            operation (str): Nom de l'opération (`module.fonction`).
+            seconds (float, optional): Durée de l'appel ; None pour n'incrémenter que les compteurs.
+            documents (int): Documents (ou lignes) traités par l'appel.
+            nbytes (int): Octets lus ou écrits par l'appel.
+            batch_size (int, optional): Taille du lot traité.
+            errors (int): Erreurs rencontrées (exception ou documents refusés).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                stats = self._operations[operation] = OperationStats()
+            stats.errors += errors
+            stats.documents += documents
+            stats.bytes += nbytes
+            if seconds is not None:
+                stats.calls += 1
+                stats.seconds_total += seconds
+                stats.seconds_max = max(stats.seconds_max, seconds)
+                stats.latency_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+                if documents and seconds:
+                    stats.last_docs_per_sec = documents / seconds
+            if batch_size is not None:
+                stats.batches += 1
+                stats.batch_total += batch_size
+                stats.batch_counts[bisect_left(BATCH_SIZE_BUCKETS, batch_size)] += 1
+
+    def snapshot(self):
+        """
+        Retourne un instantané des métriques, sérialisable en JSON.
+
+        Returns:
+            dict: Horodatage et compteurs par opération (appels, erreurs, documents, octets,
+                durées totale, moyenne et maximale, débit, histogrammes des durées et des lots).
+        """
+        with self._lock:
+            operations = {name: stats.snapshot() for name, stats in sorted(self._operations.items())}
+        return {"generated_at": datetime.now(timezone.utc).isoformat(), "enabled": self.enabled, "operations": operations}
+
+    def prometheus_text(self, prefix=METRICS_PREFIX):
+        """
+        Exporte les métriques au format texte de Prometheus (exposition 0.0.4).
+
+        Args:
+            prefix (str): Préfixe des noms de métriques.
+
+        Returns:
+            str: Métriques au format texte, une série par ligne.
+        """
+        snapshot = self.snapshot()["operations"]
+        lines = []
+
+        def family(name, kind, description):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def histogram(name, buckets, counts_key, sum_value, count_value):
+            for operation, stats in snapshot.items():
+                if not count_value(stats):
+                    continue
+                label = _label(operation)
+                cumulative = 0
+                for bound, count in zip([*map(str, buckets), "+Inf"], stats[counts_key].values()):
+                    cumulative += count
+                    lines.append(f'{prefix}_{name}_bucket{{operation="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_{name}_sum{{operation="{label}"}} {sum_value(stats)}')
+                lines.append(f'{prefix}_{name}_count{{operation="{label}"}} {count_value(stats)}')
+
+        family("operation_duration_seconds", "histogram", "Durée des opérations (secondes).")
+        histogram(
+            "operation_duration_seconds", LATENCY_BUCKETS, "latency_buckets",
+            lambda stats: stats["seconds_total"], lambda stats: stats["calls"],
+        )
+        family("batch_size", "histogram", "Taille des lots traités (documents).")
+        histogram(
+            "batch_size", BATCH_SIZE_BUCKETS, "batch_size_buckets",
+            lambda stats: stats["batch_size_total"],
+            lambda stats: sum(stats["batch_size_buckets"].values()),
+        )
+        for name, kind, key, description in (
+            ("operation_errors_total", "counter", "errors", "Erreurs des opérations (exceptions ou documents refusés)."),
+            ("documents_total", "counter", "documents", "Documents traités par les opérations."),
+            ("bytes_total", "counter", "bytes", "Octets lus ou écrits par les opérations."),
+            ("operation_docs_per_second", "gauge", "last_docs_per_sec", "Débit du dernier appel (documents/s)."),
+        ):
+            family(name, kind, description)
+            for operation, stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{operation="{_label(operation)}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Supprime toutes les observations."""
+        with self._lock:
+            self._operations.clear()
+
+
+def _label(value):
+    """Échappe une valeur d'étiquette Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registre partagé par les modules instrumentés du processus
+registry = MetricsRegistry()
+
+
+class Measurement:
+    """
+    Mesure d'un appel, à utiliser comme gestionnaire de contexte (voir `track`).
+
+    Les attributs `documents`, `nbytes`, `batch_size` et `errors` peuvent être renseignés
+    dans le bloc ; une exception levée dans le bloc compte comme une erreur et est propagée.
+    """
+
+    __slots__ = ("operation", "documents", "nbytes", "batch_size", "errors", "_started_at")
+
+    def __init__(self, operation, batch_size=None):
+        self.operation = operation
+        self.documents = self.nbytes = self.errors = 0
+        self.batch_size = batch_size
+        self._started_at = None
+
+    def __enter__(self):
+        if registry.enabled:
+            self._started_at = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self._started_at is not None:
+            registry.observe(
+                self.operation, perf_counter() - self._started_at, self.documents, self.nbytes,
+                self.batch_size, self.errors + (exc_type is not None),
+            )
+        return False
+
+
+def track(operation, batch_size=None):
+    """
+    Mesure un bloc de code : durée, documents, octets, taille de lot et erreurs.
+
+    Exemple :
+        with track("crud.insert_batch", batch_size=len(batch)) as measurement:
+            measurement.documents = ...
+
+    Args:
+        operation (str): Nom de l'opération (`module.fonction`).
+        batch_size (int, optional): Taille du lot traité.
+
+    Returns:
+        Measurement: Gestionnaire de contexte de la mesure.
+    """
+    return Measurement(operation, batch_size)
+
+
+def result_size(result):
+    """Mesure par défaut d'un résultat : un entier est un nombre de documents, une liste ou un DataFrame sa longueur."""
+    if isinstance(result, int) and not isinstance(result, bool):
+        return {"documents": result}
+    if isinstance(result, list) or hasattr(result, "shape"):
+        return {"documents": len(result)}
+    return {}
+
+
+def instrumented(operation, measure=result_size):
+    """
+    Décorateur : mesure chaque appel d'une fonction (durée, erreurs et volume traité).
+
+    Désactivées, les métriques ne coûtent qu'un test par appel.
+
+    Args:
+        operation (str): Nom de l'opération (`module.fonction`).
+        measure (callable): Déduit du résultat les champs de la mesure (`documents`,
+            `nbytes`, `batch_size`, `errors`) ; par défaut, voir `result_size`.
+
+    Returns:
+        callable: Décorateur.
+    """
+
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return function(*args, **kwargs)
+            with Measurement(operation) as measurement:
+                result = function(*args, **kwargs)
+                for field, value in measure(result).items():
+                    setattr(measurement, field, value)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def observe(operation, seconds=None, documents=0, nbytes=0, batch_size=None, errors=0):
+    """Enregistre une observation dans le registre partagé (voir `MetricsRegistry.observe`)."""
+    registry.observe(operation, seconds, documents, nbytes, batch_size, errors)
+
+
+def metrics_enabled():
+    """Indique si les métriques sont enregistrées."""
+    return registry.enabled
+
+
+def enable_metrics(enabled=True):
+    """
+    Active ou désactive l'enregistrement des métriques (par défaut : variable `METRICS_ENABLED`).
+
+    Args:
+        enabled (bool): True pour activer.
+    """
+    registry.enabled = enabled
+
+
+def metrics_snapshot():
+    """Retourne l'instantané JSON du registre partagé (voir `MetricsRegistry.snapshot`)."""
+    return registry.snapshot()
+
+
+def write_metrics(output_dir=METRICS_DIR):
+    """
+    Écrit les métriques dans `metrics.prom` (format Prometheus) et `metrics.json`.
+
+    Les fichiers sont remplacés de manière atomique : le collecteur de fichiers texte de
+    node_exporter ne lit jamais un fichier à moitié écrit.
+
+    Args:
+        output_dir (str): Répertoire des fichiers.
+
+    Returns:
+        tuple: Chemins des fichiers Prometheus et JSON.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = (os.path.join(output_dir, "metrics.prom"), os.path.join(output_dir, "metrics.json"))
+    contents = (registry.prometheus_text(), json.dumps(registry.snapshot(), indent=2))
+    for path, content in zip(paths, contents):
+        with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(f"{path}.tmp", path)
+    logger.info(f"Métriques écrites dans {paths[0]} et {paths[1]}.")
+    return paths
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Sert `/metrics` (format Prometheus) et `/metrics.json` (instantané JSON)."""
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = registry.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(registry.snapshot()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Requête de métriques : {format % args}")
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """
+    Démarre le point d'accès HTTP des métriques dans un thread d'arrière-plan.
+
+    Args:
+        port (int): Port d'écoute.
+        host (str): Adresse d'écoute.
+
+    Returns:
+        ThreadingHTTPServer: Serveur démarré (arrêté par `shutdown()`).
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Métriques exposées sur http://{host}:{server.server_port}/metrics.")
+    return server
+
+
+# Métriques activées par l'environnement : fichiers écrits à la fin du processus
+if METRICS_ENABLED:
+    atexit.register(write_metrics)
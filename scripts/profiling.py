@@ -0,0 +1,255 @@
+# === Importation des bibliothèques nécessaires ===
+import cProfile  # Profil déterministe par étape (facultatif)
+import json  # Résumé des étapes au format JSON
+import os  # Chemins des fichiers de profil
+import sys  # Piles d'appels de tous les threads (échantillonnage)
+import threading  # Thread d'échantillonnage
+import tracemalloc  # Pic de mémoire allouée par étape
+from collections import Counter  # Comptage des piles échantillonnées
+from datetime import datetime, timezone  # Horodatage des fichiers de profil
+from time import perf_counter  # Mesure des durées
+from loguru import logger  # Gestion des logs
+
+# === Paramètres du profilage ===
+PROFILE_DIR = "outputs/profiles"  # Répertoire des profils (piles repliées, résumé JSON, fichiers cProfile)
+SAMPLING_INTERVAL = float(os.getenv("PROFILE_SAMPLING_INTERVAL", 0.005))  # Intervalle d'échantillonnage (s)
+
+# Profileur actif du processus, piloté par `profile_step` depuis les modules profilés
+_active = None
+
+
+def frame_label(code):
+    """Libellé d'une fonction dans une pile repliée : `fonction (fichier:ligne)`."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """
+    Profileur par échantillonnage : relève à intervalle régulier la pile d'appels de chaque thread.
+
+    Les piles sont comptées au format « replié » (une pile par ligne, fonctions séparées par
+    des `;`, suivie du nombre d'échantillons), lu par `flamegraph.pl`, speedscope ou
+    inferno. La racine de chaque pile est l'étape en cours, puis le nom du thread : le
+    graphe se lit étape par étape, threads d'insertion compris. Le coût ne dépend que de
+    l'intervalle, pas du nombre d'appels de fonctions.
+
+    Args:
+        interval (float): Intervalle entre deux échantillons, en secondes.
+    """
+
+    def __init__(self, interval=SAMPLING_INTERVAL):
+        self.interval = interval
+        self.stage = None  # Étape attribuée aux échantillons en cours
+        self.stacks = Counter()  # Pile repliée -> nombre d'échantillons
+        self.samples = Counter()  # Étape -> nombre d'échantillons
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Démarre l'échantillonnage dans un thread d'arrière-plan."""
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stage = self.stage
+            if stage is None:
+                continue
+            self.samples[stage] += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                thread_name = names.get(thread_id, str(thread_id)).replace(";", ",")
+                self.stacks[";".join([stage, thread_name, *reversed(stack)])] += 1
+
+    def write_folded(self, path):
+        """
+        Écrit les piles échantillonnées au format replié (compatible flame graph).
+
+        Args:
+            path (str): Chemin du fichier `.folded`.
+        """
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in sorted(self.stacks.items()):
+                handle.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """
+    Profilage d'un script étape par étape : durée, pic mémoire et, au choix, profils par étape.
+
+    Chaque appel à `step` ferme l'étape en cours et en ouvre une nouvelle, ce qui suit la
+    numérotation « Étape N » des scripts sans réindenter leur code. Le pic de mémoire de
+    chaque étape est mesuré par `tracemalloc` (allocations Python et NumPy ; la mémoire
+    allouée par Arrow n'est pas vue). Avec `sampling`, un profileur par échantillonnage
+    produit un fichier de piles repliées (flame graph) ; avec `cprofile`, un fichier
+    `.prof` est écrit par étape (thread principal seulement). Désactivé, le profileur ne
+    mesure rien et `step` ne coûte qu'un test.
+
+    Args:
+        name (str): Nom du script profilé (préfixe des fichiers).
+        enabled (bool): Active le profilage.
+        sampling (bool): Active le profileur par échantillonnage.
+        cprofile (bool): Active cProfile par étape.
+        interval (float): Intervalle d'échantillonnage, en secondes.
+        output_dir (str): Répertoire des fichiers de profil.
+    """
+
+    def __init__(self, name, enabled=True, sampling=True, cprofile=False, interval=SAMPLING_INTERVAL, output_dir=PROFILE_DIR):
+        self.name = name
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.output_dir = output_dir
+        self.spans = []  # Étapes terminées (libellé, durée, mémoire, échantillons, profil)
+        self._current = None  # Étape en cours : (libellé, début, mémoire au début, cProfile)
+        self._finished = False
+        self._started_tracemalloc = False
+        self._stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self._sampler = SamplingProfiler(interval) if enabled and sampling else None
+        if not enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self._sampler:
+            self._sampler.start()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.finish()
+        return False
+
+    def activate(self):
+        """
+        Fait de ce profileur celui du processus, piloté par `profile_step`.
+
+        Returns:
+            StageProfiler: Le profileur.
+        """
+        global _active
+        if self.enabled:
+            _active = self
+        return self
+
+    def step(self, label):
+        """
+        Termine l'étape en cours et commence l'étape `label`.
+
+        Args:
+            label (str): Libellé de l'étape (ex : "Étape 2 : Connexion à MongoDB").
+        """
+        if not self.enabled or self._finished:
+            return
+        self.close()
+        tracemalloc.reset_peak()
+        profile = None
+        if self.cprofile:
+            profile = cProfile.Profile()
+            profile.enable()
+        if self._sampler:
+            self._sampler.stage = label.replace(";", ",")
+        self._current = (label, perf_counter(), tracemalloc.get_traced_memory()[0], profile)
+
+    def close(self):
+        """Termine l'étape en cours, s'il y en a une."""
+        if self._current is None:
+            return
+        label, started_at, memory_before, profile = self._current
+        seconds = perf_counter() - started_at
+        memory_after, memory_peak = tracemalloc.get_traced_memory()
+        self._current = None
+        if self._sampler:
+            self._sampler.stage = None
+
+        profile_path = None
+        if profile is not None:
+            profile.disable()
+            profile_path = os.path.join(self.output_dir, f"{self.name}_{self._stamp}_{len(self.spans) + 1:02d}.prof")
+            profile.dump_stats(profile_path)
+
+        self.spans.append({
+            "stage": label,
+            "seconds": seconds,
+            "peak_mb": memory_peak / 1024**2,
+            "allocated_mb": (memory_after - memory_before) / 1024**2,
+            "samples": self._sampler.samples[label.replace(";", ",")] if self._sampler else 0,
+            "cprofile": profile_path,
+        })
+
+    def summary_table(self):
+        """
+        Construit le tableau récapitulatif des étapes.
+
+        Returns:
+            str: Tableau (une ligne par étape, puis le total).
+        """
+        total = sum(span["seconds"] for span in self.spans)
+        width = max([len("Étape"), *(len(span["stage"]) for span in self.spans)])
+        lines = [f"{'Étape':<{width}}  {'Durée (s)':>10}  {'%':>6}  {'Pic mém. (Mo)':>13}  {'Alloué (Mo)':>11}  {'Échant.':>7}"]
+        for span in self.spans:
+            lines.append(
+                f"{span['stage']:<{width}}  {span['seconds']:>10.3f}  {100 * span['seconds'] / total if total else 0:>5.1f}%  "
+                f"{span['peak_mb']:>13.1f}  {span['allocated_mb']:>11.1f}  {span['samples']:>7}"
+            )
+        lines.append(f"{'Total':<{width}}  {total:>10.3f}  {100.0 if total else 0:>5.1f}%")
+        return "\n".join(lines)
+
+    def finish(self):
+        """
+        Termine le profilage : écrit les profils et le résumé, puis affiche le tableau des étapes.
+
+        Peut être appelée plusieurs fois (seul le premier appel agit).
+
+        Returns:
+            dict: Étapes mesurées et chemins des fichiers écrits, ou None si le profilage est désactivé.
+        """
+        global _active
+        if not self.enabled or self._finished:
+            return None
+        self.close()
+        self._finished = True
+        if _active is self:
+            _active = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        report = {"script": self.name, "created_at": self._stamp, "stages": self.spans}
+        if self._sampler:
+            self._sampler.stop()
+            report["folded"] = os.path.join(self.output_dir, f"{self.name}_{self._stamp}.folded")
+            self._sampler.write_folded(report["folded"])
+        report["summary"] = os.path.join(self.output_dir, f"{self.name}_{self._stamp}.json")
+        with open(report["summary"], "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+        logger.info(f"=== Profil de {self.name} ===\n{self.summary_table()}")
+        if self._sampler:
+            logger.info(f"Piles échantillonnées (flame graph) : {report['folded']}")
+        logger.info(f"Résumé du profil : {report['summary']}")
+        return report
+
+
+def profile_step(label):
+    """
+    Commence l'étape `label` du profileur actif (voir `StageProfiler.activate`) ; sans effet sinon.
+
+    Args:
+        label (str): Libellé de l'étape.
+    """
+    if _active is not None:
+        _active.step(label)
@@ -0,0 +1,310 @@
+# === Importation des bibliothèques nécessaires ===
+import os  # Paramètres du cache via les variables d'environnement
+import threading  # Protection du cache partagé entre threads
+from collections import OrderedDict  # Ordre d'utilisation des entrées (LRU)
+from time import monotonic  # Horloge des expirations
+import bson  # Encodage compact des résultats mis en cache
+from bson import json_util  # Clés de cache canoniques (types BSON conservés)
+from loguru import logger  # Gestion des logs
+
+# === Paramètres du cache ===
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 60))  # Durée de vie d'un résultat (s)
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 256))  # Résultats conservés au plus
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", 32 * 1024 * 1024))  # Taille BSON totale maximale
+LOGICAL_OPERATORS = ("$and", "$or", "$nor")  # Opérateurs dont les sous-filtres sont analysés
+
+
+def referenced_fields(filter_query):
+    """
+    Retourne les champs de premier niveau dont dépend un filtre.
+
+    Args:
+        filter_query (dict): Filtre MongoDB.
+
+    Returns:
+        set: Champs de premier niveau, ou None si le filtre peut dépendre de n'importe quel
+            champ (`$expr`, `$where`, `$text`, ...).
+    """
+    fields = set()
+    for key, value in (filter_query or {}).items():
+        if key in LOGICAL_OPERATORS:
+            for sub_filter in value:
+                sub_fields = referenced_fields(sub_filter)
+                if sub_fields is None:
+                    return None
+                fields |= sub_fields
+        elif key.startswith("$"):
+            return None
+        else:
+            fields.add(key.split(".")[0])
+    return fields
+
+
+def touched_fields(update_query):
+    """
+    Retourne les champs de premier niveau modifiés par une mise à jour.
+
+    Args:
+        update_query (dict | list): Mise à jour MongoDB (opérateurs, remplacement ou pipeline).
+
+    Returns:
+        set: Champs modifiés, ou None si la mise à jour peut modifier n'importe quel champ
+            (document de remplacement ou pipeline d'agrégation).
+    """
+    if not isinstance(update_query, dict) or not update_query or not all(op.startswith("$") for op in update_query):
+        return None
+    fields = set()
+    for operator, spec in update_query.items():
+        fields |= {path.split(".")[0] for path in spec}
+        if operator == "$rename":
+            fields |= {path.split(".")[0] for path in spec.values()}
+    return fields
+
+
+class QueryCache:
+    """
+    Cache des résultats de lecture, à durée de vie (TTL), taille bornée (LRU) et mémoire bornée.
+
+    Les résultats sont conservés encodés en BSON : la mémoire occupée est mesurée exactement
+    et chaque lecture reçoit ses propres documents, qu'elle peut modifier sans altérer le
+    cache. Chaque entrée mémorise sa collection et les champs dont elle dépend (filtre,
+    tri, projection) pour être invalidée précisément après une écriture.
+
+    Args:
+        ttl (float): Durée de vie d'un résultat, en secondes.
+        max_entries (int): Nombre maximal de résultats conservés.
+        max_bytes (int): Taille BSON totale maximale des résultats conservés.
+    """
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # Clé -> (expiration, collection, champs, documents BSON, taille)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[4]
+
+    def get(self, key):
+        """
+        Retourne une copie des documents d'un résultat encore valable, ou None.
+
+        Args:
+            key (str): Clé de la requête (voir `cache_key`).
+
+        Returns:
+            list: Documents, ou None si le résultat est absent ou expiré.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            encoded = entry[3]
+        return [bson.decode(document) for document in encoded]
+
+    def put(self, key, namespace, fields, documents):
+        """
+        Conserve le résultat d'une requête, en évinçant les moins récemment utilisés au besoin.
+
+        Un résultat plus grand que la mémoire allouée au cache n'est pas conservé.
+
+        Args:
+            key (str): Clé de la requête.
+            namespace (str): Collection interrogée (`base.collection`).
+            fields (set): Champs dont dépend le résultat, ou None pour tous.
+            documents (list): Documents du résultat.
+        """
+        encoded = [bson.encode(document) for document in documents]
+        size = sum(len(document) for document in encoded)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (monotonic() + self.ttl, namespace, fields, encoded, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, namespace, fields=None):
+        """
+        Supprime les résultats d'une collection, ou seulement ceux qui dépendent de champs modifiés.
+
+        Args:
+            namespace (str): Collection modifiée (`base.collection`).
+            fields (set, optional): Champs modifiés ; None invalide toute la collection.
+
+        Returns:
+            int: Nombre de résultats supprimés.
+        """
+        with self._lock:
+            stale = [
+                key
+                for key, (_, entry_namespace, entry_fields, _, _) in self._entries.items()
+                if entry_namespace == namespace and (fields is None or entry_fields is None or entry_fields & fields)
+            ]
+            for key in stale:
+                self._remove(key)
+            self._stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def stats(self):
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            dict: Succès, échecs, taux de succès, évictions, expirations, invalidations,
+                nombre de résultats et taille occupée (octets).
+        """
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Vide le cache (les statistiques sont conservées)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# Cache partagé par les lectures du processus
+query_cache = QueryCache()
+
+
+def cache_key(namespace, query, projection, sort, limit):
+    """
+    Construit la clé canonique d'une requête.
+
+    Les clés de premier niveau du filtre et de la projection sont triées : deux filtres
+    équivalents écrits dans un ordre différent partagent la même entrée. Les sous-documents
+    et le tri gardent leur ordre, qui est significatif pour MongoDB.
+
+    Args:
+        namespace (str): Collection interrogée (`base.collection`).
+        query (dict): Filtre.
+        projection (dict): Projection.
+        sort (list): Tri (liste de couples champ, sens).
+        limit (int): Nombre maximal de documents.
+
+    Returns:
+        str: Clé de cache.
+    """
+    normalized = {
+        "ns": namespace,
+        "filter": sorted((query or {}).items()),
+        "projection": sorted((projection or {}).items()),
+        "sort": [list(item) for item in sort or []],
+        "limit": limit or 0,
+    }
+    return json_util.dumps(normalized, json_options=json_util.CANONICAL_JSON_OPTIONS)
+
+
+def result_fields(query, projection, sort):
+    """
+    Retourne les champs dont dépend un résultat : filtre, tri et champs projetés.
+
+    Args:
+        query (dict): Filtre.
+        projection (dict): Projection.
+        sort (list): Tri.
+
+    Returns:
+        set: Champs de premier niveau, ou None si le résultat dépend de tous les champs
+            (projection absente ou par exclusion, filtre non analysable).
+    """
+    fields = referenced_fields(query)
+    included = [field for field, value in (projection or {}).items() if value and field != "_id"]
+    if fields is None or not included:
+        return None
+    return fields | {field.split(".")[0] for field in included} | {field.split(".")[0] for field, _ in sort or []} | {"_id"}
+
+
+def cached_find(collection, query=None, projection=None, sort=None, limit=0, use_cache=True):
+    """
+    Exécute une lecture `find`, en servant le résultat depuis le cache s'il y est encore valable.
+
+    Args:
+        collection (Collection): Collection interrogée.
+        query (dict, optional): Filtre.
+        projection (dict, optional): Projection.
+        sort (list, optional): Tri (liste de couples champ, sens).
+        limit (int): Nombre maximal de documents (0 : aucune limite).
+        use_cache (bool): False pour interroger directement MongoDB.
+
+    Returns:
+        list: Documents lus.
+    """
+    if use_cache:
+        key = cache_key(collection.full_name, query, projection, sort, limit)
+        documents = query_cache.get(key)
+        if documents is not None:
+            return documents
+
+    cursor = collection.find(query or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    documents = list(cursor)
+
+    if use_cache:
+        query_cache.put(key, collection.full_name, result_fields(query, projection, sort), documents)
+    return documents
+
+
+def invalidate_collection(collection):
+    """
+    Invalide tous les résultats en cache d'une collection (insertion, suppression, remplacement).
+
+    Args:
+        collection (Collection | str): Collection modifiée, ou son espace de noms (`base.collection`).
+
+    Returns:
+        int: Nombre de résultats supprimés.
+    """
+    namespace = collection if isinstance(collection, str) else collection.full_name
+    invalidated = query_cache.invalidate(namespace)
+    if invalidated:
+        logger.debug(f"{invalidated} résultat(s) en cache invalidé(s) pour {namespace}.")
+    return invalidated
+
+
+def invalidate_update(collection, update_query, upsert=False):
+    """
+    Invalide les résultats en cache qui dépendent des champs modifiés par une mise à jour.
+
+    Un upsert peut créer un document visible par n'importe quelle requête : il invalide
+    toute la collection, comme une mise à jour dont les champs ne sont pas connus.
+
+    Args:
+        collection (Collection): Collection modifiée.
+        update_query (dict | list): Mise à jour appliquée.
+        upsert (bool): True si la mise à jour peut insérer un document.
+
+    Returns:
+        int: Nombre de résultats supprimés.
+    """
+    fields = None if upsert else touched_fields(update_query)
+    invalidated = query_cache.invalidate(collection.full_name, fields)
+    if invalidated:
+        logger.debug(f"{invalidated} résultat(s) en cache invalidé(s) pour {collection.full_name} (champs : {fields or 'tous'}).")
+    return invalidated
+
+
+def cache_stats():
+    """Retourne les statistiques du cache de requêtes (voir `QueryCache.stats`)."""
+    return query_cache.stats()
@@ -0,0 +1,281 @@
+# === Importation des bibliothèques nécessaires ===
+import numpy as np  # Calculs vectorisés sur les masques de validation
+import pandas as pd  # Manipulation des DataFrames
+
+# === Schéma déclaratif des données médicales ===
+# Chaque colonne (noms standardisés en snake_case) déclare son type et ses règles :
+#   - "type"       : "int", "float", "datetime" ou "str"
+#   - "range"      : (min, max) inclusifs, None pour une borne absente
+#   - "values"     : ensemble des valeurs autorisées (énumération)
+#   - "not_before" : colonne de date qui doit précéder ou égaler celle-ci
+#   - "normalize"  : "title" pour supprimer les espaces et capitaliser chaque mot
+#   - "on_invalid" : "reject" (ligne écartée) ou "warn" (ligne conservée, anomalie comptée)
+#   - "strict"     : pour un entier, rejette les valeurs non entières (ex : 45.5) au lieu de
+#                    les tronquer ; facultatif, désactivé par défaut
+#   - "compact"    : représentation compacte en mémoire, "category" (chaînes encodées par
+#                    dictionnaire) ou "integer" (entier réduit au plus petit type suffisant) ;
+#                    'billing_amount' reste en float64 pour ne pas perdre de précision
+HEALTHCARE_SCHEMA = {
+    "name": {"type": "str", "normalize": "title"},
+    "age": {"type": "int", "range": (0, 120), "on_invalid": "reject", "compact": "integer"},
+    "gender": {"type": "str", "values": {"Male", "Female"}, "on_invalid": "warn", "compact": "category"},
+    "blood_type": {
+        "type": "str",
+        "values": {"A+", "A-", "B+", "B-", "O+", "O-", "AB+", "AB-"},
+        "on_invalid": "warn",
+        "compact": "category",
+    },
+    "medical_condition": {"type": "str", "normalize": "title", "compact": "category"},
+    "date_of_admission": {"type": "datetime", "on_invalid": "warn"},
+    "doctor": {"type": "str", "normalize": "title", "compact": "category"},
+    "hospital": {"type": "str", "normalize": "title", "compact": "category"},
+    "insurance_provider": {"type": "str", "normalize": "title", "compact": "category"},
+    "billing_amount": {"type": "float", "range": (0, None), "on_invalid": "reject"},
+    "room_number": {"type": "int", "on_invalid": "warn", "compact": "integer"},
+    "admission_type": {"type": "str", "compact": "category"},
+    "discharge_date": {"type": "datetime", "not_before": "date_of_admission", "on_invalid": "warn"},
+    "medication": {"type": "str", "normalize": "title", "compact": "category"},
+    "test_results": {"type": "str", "normalize": "title", "compact": "category"},
+}
+
+# Version des règles : à incrémenter à chaque modification du schéma ou du nettoyage
+RULES_VERSION = "2"
+
+REJECT_REASON_COLUMN = "reject_reason"  # Colonne ajoutée aux lignes rejetées
+
+# === Fonctions utilitaires ===
+def standardize_column_name(column):
+    """
+    Convertit un nom de colonne du dataset brut en snake_case (ex : 'Blood Type' -> 'blood_type').
+
+    Args:
+        column (str): Nom de colonne d'origine.
+
+    Returns:
+        str: Nom de colonne standardisé.
+    """
+    return column.lower().replace(" ", "_")
+
+
+def compile_rules(schema=HEALTHCARE_SCHEMA):
+    """
+    Traduit le schéma en une liste de règles élémentaires, chacune avec un code de rejet.
+
+    Args:
+        schema (dict): Schéma déclaratif des colonnes.
+
+    Returns:
+        list: Règles sous forme de dictionnaires (code, colonne, contrôle, action).
+    """
+    rules = []
+    for column, spec in schema.items():
+        action = spec.get("on_invalid", "reject")
+        if spec["type"] in ("int", "float", "datetime"):
+            rules.append({"code": f"{column}:type", "column": column, "check": "type", "action": action})
+        if "range" in spec:
+            rules.append({"code": f"{column}:range", "column": column, "check": "range", "action": action})
+        if "values" in spec:
+            rules.append({"code": f"{column}:value", "column": column, "check": "values", "action": action})
+        if "not_before" in spec:
+            rules.append({"code": f"{column}:order", "column": column, "check": "not_before", "action": action})
+    return rules
+
+# === Moteur de validation vectorisé ===
+def validate_dataframe(df, schema=HEALTHCARE_SCHEMA):
+    """
+    Évalue toutes les règles du schéma en une seule passe vectorisée.
+
+    Chaque règle produit un masque booléen ; les masques des règles bloquantes sont
+    combinés en un seul masque de rejet appliqué une seule fois au DataFrame. Les
+    colonnes typées sont converties sur place, les lignes rejetées conservent leurs
+    valeurs brutes et reçoivent le code de la première règle non respectée. Les entiers
+    non entiers sont tronqués, sauf pour les colonnes déclarées `strict`.
+
+    Args:
+        df (DataFrame): Données aux colonnes standardisées (modifiées sur place).
+        schema (dict): Schéma déclaratif des colonnes.
+
+    Returns:
+        tuple: (lignes valides, lignes rejetées avec leur code, compteurs par code de règle,
+            valeurs inattendues par colonne énumérée).
+    """
+    converted = {}  # Colonne -> valeurs converties au type attendu
+    failures = {}  # Code de règle -> masque des lignes en défaut
+    unexpected_values = {}  # Colonne -> valeurs hors énumération
+
+    for rule in compile_rules(schema):
+        column = rule["column"]
+        if column not in df.columns:
+            continue
+        spec = schema[column]
+        raw = df[column]
+
+        if rule["check"] == "type":
+            if spec["type"] == "datetime":
+                values = pd.to_datetime(raw, errors="coerce")
+                mask = values.isna()
+            else:
+                values = pd.to_numeric(raw, errors="coerce")
+                mask = values.isna()
+                if spec["type"] == "int" and spec.get("strict"):
+                    mask |= values.notna() & (values % 1 != 0)
+                elif spec["type"] == "int":
+                    values = np.trunc(values)  # Troncature, comme la conversion `astype(int)`
+            converted[column] = values
+        elif rule["check"] == "range":
+            values = converted.get(column, raw)
+            min_val, max_val = spec["range"]
+            mask = pd.Series(False, index=df.index)
+            if min_val is not None:
+                mask |= ~(values >= min_val)
+            if max_val is not None:
+                mask |= ~(values <= max_val)
+        elif rule["check"] == "values":
+            mask = ~raw.isin(spec["values"])
+            unexpected_values[column] = set(raw[mask].unique())
+        else:  # "not_before"
+            other = spec["not_before"]
+            if other not in converted:
+                continue
+            mask = converted[column] < converted[other]
+
+        failures[rule["code"]] = (mask.to_numpy(), rule["action"])
+
+    # Combinaison des règles bloquantes en un seul masque de rejet
+    reject_codes = [code for code, (_, action) in failures.items() if action == "reject"]
+    if reject_codes:
+        reject_matrix = np.column_stack([failures[code][0] for code in reject_codes])
+        rejected_mask = reject_matrix.any(axis=1)
+    else:
+        reject_matrix = None
+        rejected_mask = np.zeros(len(df), dtype=bool)
+
+    rejected = df.take(np.flatnonzero(rejected_mask))
+    if reject_matrix is not None:
+        # Code de la première règle non respectée pour chaque ligne rejetée
+        first_failure = reject_matrix[rejected_mask].argmax(axis=1)
+        rejected = rejected.assign(**{REJECT_REASON_COLUMN: np.asarray(reject_codes, dtype=object)[first_failure]})
+    else:
+        rejected = rejected.assign(**{REJECT_REASON_COLUMN: pd.Series(dtype=object)})
+
+    # Application des conversions puis du masque, en une seule sélection
+    for column, values in converted.items():
+        df[column] = values
+    valid = df.take(np.flatnonzero(~rejected_mask))
+    int_columns = {
+        column: "int64"
+        for column in converted
+        if schema[column]["type"] == "int" and valid[column].notna().all()
+    }
+    if int_columns:
+        valid = valid.astype(int_columns)
+
+    counts = {code: int(mask.sum()) for code, (mask, _) in failures.items()}
+    return valid, rejected, counts, unexpected_values
+
+
+def normalize_text(df, schema=HEALTHCARE_SCHEMA):
+    """
+    Normalise les colonnes textuelles déclarées dans le schéma (espaces, majuscules).
+
+    Args:
+        df (DataFrame): Données aux colonnes standardisées (modifiées sur place).
+        schema (dict): Schéma déclaratif des colonnes.
+
+    Returns:
+        list: Colonnes normalisées.
+    """
+    normalized = []
+    for column, spec in schema.items():
+        if spec.get("normalize") == "title" and column in df.columns:
+            df[column] = df[column].str.strip().str.title()
+            normalized.append(column)
+    return normalized
+
+# === Représentation compacte en mémoire ===
+def compact_dataframe(df, schema=HEALTHCARE_SCHEMA):
+    """
+    Convertit les colonnes vers leur représentation compacte déclarée dans le schéma.
+
+    Les colonnes à faible cardinalité (et 'doctor'/'hospital', très répétées) deviennent
+    catégorielles : chaque valeur distincte n'est stockée qu'une fois. Les entiers sont
+    réduits au plus petit type suffisant (ex : uint8 pour 'age').
+
+    Args:
+        df (DataFrame): Données aux colonnes standardisées.
+        schema (dict): Schéma déclaratif des colonnes.
+
+    Returns:
+        DataFrame: Données compactées.
+    """
+    conversions = {}
+    for column, spec in schema.items():
+        if column not in df.columns:
+            continue
+        if spec.get("compact") == "category":
+            conversions[column] = df[column].astype("category")
+        elif spec.get("compact") == "integer" and pd.api.types.is_integer_dtype(df[column]):
+            downcast = "unsigned" if len(df) and df[column].min() >= 0 else "integer"
+            conversions[column] = pd.to_numeric(df[column], downcast=downcast)
+    return df.assign(**conversions)
+
+
+def compact_read_dtypes(columns, schema=HEALTHCARE_SCHEMA):
+    """
+    Types à appliquer dès la lecture du CSV brut pour les colonnes catégorielles non normalisées.
+
+    Args:
+        columns (list): Noms des colonnes d'origine du fichier brut.
+        schema (dict): Schéma déclaratif des colonnes.
+
+    Returns:
+        dict: Nom de colonne d'origine -> "category".
+    """
+    dtypes = {}
+    for column in columns:
+        spec = schema.get(standardize_column_name(column), {})
+        if spec.get("compact") == "category" and not spec.get("normalize"):
+            dtypes[column] = "category"
+    return dtypes
+
+
+def arrow_schema(columns, schema=HEALTHCARE_SCHEMA, compact=False):
+    """
+    Schéma Arrow explicite des données nettoyées, déduit du schéma déclaratif.
+
+    Les types ne dépendent pas du contenu d'un bloc : une colonne entièrement vide, un
+    entier devenu flottant à cause de valeurs manquantes ou des catégories différentes
+    d'un bloc à l'autre sont convertis vers le même type pour tout le fichier.
+
+    Args:
+        columns (list): Colonnes des données, dans l'ordre du fichier.
+        schema (dict): Schéma déclaratif des colonnes.
+        compact (bool): Colonnes catégorielles encodées par dictionnaire (voir `compact_dataframe`).
+
+    Returns:
+        pyarrow.Schema: Schéma du fichier Parquet.
+    """
+    import pyarrow as pa  # Importé uniquement pour la sortie Parquet
+
+    types = {"int": pa.int64(), "float": pa.float64(), "datetime": pa.timestamp("us"), "str": pa.large_string()}
+    fields = []
+    for column in columns:
+        spec = schema.get(column, {"type": "str"})  # Colonnes hors schéma : texte
+        arrow_type = types[spec["type"]]
+        if compact and spec.get("compact") == "category":
+            arrow_type = pa.dictionary(pa.int32(), arrow_type)
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def memory_usage_bytes(df):
+    """
+    Mesure l'occupation mémoire réelle d'un DataFrame, chaînes comprises.
+
+    Args:
+        df (DataFrame): Données à mesurer.
+
+    Returns:
+        int: Occupation en octets.
+    """
+    return int(df.memory_usage(deep=True).sum())
@@ -1,6 +1,10 @@
-from pymongo import MongoClient  # Permet d'interagir avec MongoDB
-from crud import insert_records, read_records, update_records, delete_records, export_to_csv  # Fonctions CRUD pour MongoDB
+from utils import MONGO_URI, get_mongo_client  # Client MongoDB partagé du processus
+from crud import insert_records, read_records, bulk_mutate, delete_records, export_to_csv, clone_collection  # Fonctions CRUD pour MongoDB
+from analytics import CONTROL_COLLECTION, SUMMARIES, read_summary, refresh_summaries, summary_collection_name  # Résumés pré-agrégés
+import async_crud  # Opérations CRUD asynchrones
+from async_crud import close_async_mongo_clients, get_async_mongo_client  # Client MongoDB asynchrone partagé
 from loguru import logger  # Bibliothèque pour gérer et enregistrer les logs
+import asyncio  # Exécution des tests asynchrones
 import os  # Module pour gérer les interactions avec le système de fichiers
 
 # === Configuration des logs ===
@@ -10,12 +14,13 @@ LOG_FILE = "logs/test.log"
 logger.add(LOG_FILE, level="INFO", rotation="1 MB", compression="zip")
 
 # === Paramètres globaux ===
-# URI pour se connecter au service MongoDB (via un conteneur Docker)
-MONGO_URI = "mongodb://mongodb_service_container:27017/"
 # Nom de la base de données MongoDB
 DATABASE_NAME = "healthcare_database"
 # Nom de la collection MongoDB contenant les données des patients
 DEFAULT_COLLECTION_NAME = "patients_data"# Nom par défaut de la collection principale
+# Vérification supplémentaire des opérations asynchrones sur un substitut en mémoire
+# (mongomock, dépendance de développement facultative) : désactivée par défaut
+ASYNC_IN_MEMORY_CHECK = os.getenv("ASYNC_IN_MEMORY_CHECK", "0") == "1"
  
 def connect_to_collection(collection_name=DEFAULT_COLLECTION_NAME):
     """
@@ -37,9 +42,9 @@ def connect_to_collection(collection_name=DEFAULT_COLLECTION_NAME):
         Exception: Si une erreur survient lors de la connexion au serveur MongoDB ou à la collection.
     """
     try:
-        # Étape 1 : Création d'un client MongoDB pour interagir avec le serveur
-        # `MONGO_URI` est défini globalement pour contenir l'adresse du serveur MongoDB.
-        client = MongoClient(MONGO_URI)
+        # Étape 1 : Récupération du client MongoDB partagé (pool de connexions commun au processus)
+        # `MONGO_URI` est défini dans `utils` (variable d'environnement MONGO_URI).
+        client = get_mongo_client(MONGO_URI)
         logger.info("Connexion au serveur MongoDB réussie.")
 
         # Étape 2 : Accès à la base de données définie par `DATABASE_NAME`
@@ -63,18 +68,22 @@ def connect_to_collection(collection_name=DEFAULT_COLLECTION_NAME):
 
 
 
-def create_test_collection(db, source_collection_name, test_collection_name):
+def create_test_collection(db, source_collection_name, test_collection_name, query=None, sample_size=None):
     """
     Crée une collection de test en copiant les documents de la collection principale.
 
     Cette fonction crée une nouvelle collection MongoDB pour les tests en copiant les données 
-    existantes d'une collection principale (source). Si la collection source est vide, 
+    existantes d'une collection principale (source), éventuellement filtrées ou échantillonnées.
+    La copie est faite côté serveur (voir `crud.clone_collection`) : les documents ne
+    transitent pas par le processus Python. Si la collection source est vide, 
     elle génère un avertissement dans les logs.
 
     Args:
         db (pymongo.database.Database): Instance de la base de données MongoDB connectée.
         source_collection_name (str): Nom de la collection MongoDB source (principale).
         test_collection_name (str): Nom de la collection MongoDB temporaire pour les tests.
+        query (dict, optional): Filtre des documents à copier (tous par défaut).
+        sample_size (int, optional): Nombre de documents tirés au hasard parmi ceux du filtre.
 
     Returns:
         pymongo.collection.Collection: Objet représentant la collection MongoDB de test.
@@ -87,28 +96,16 @@ def create_test_collection(db, source_collection_name, test_collection_name):
         # La collection source contient les données initiales que nous voulons copier.
         source_collection = db[source_collection_name]
 
-        # La collection de test sera créée (ou réinitialisée) à chaque exécution.
-        test_collection = db[test_collection_name]
-
-        # Étape 2 : Nettoyer la collection de test
-        # Supprime tous les documents existants dans la collection de test pour garantir un état initial propre.
-        logger.info(f"Nettoyage de la collection de test : {test_collection_name}")
-        test_collection.delete_many({})
-        logger.info(f"Collection {test_collection_name} vidée avec succès.")
-
-        # Étape 3 : Copier les documents de la collection source vers la collection de test
-        # Récupérer tous les documents de la collection source
-        documents = list(source_collection.find())
-        if not documents:
+        # Étape 2 : Copier les documents de la collection source vers la collection de test
+        # La collection de test est remplacée (ou créée) à chaque exécution par l'étape `$out`.
+        logger.info(f"Copie côté serveur de {source_collection_name} vers {test_collection_name}...")
+        copied_count = clone_collection(source_collection, test_collection_name, query, sample_size)
+        if not copied_count:
             # Si la collection source est vide, loguer un avertissement
             logger.warning(f"La collection source {source_collection_name} est vide. Aucun document copié.")
-        else:
-            # Insérer les documents dans la collection de test
-            test_collection.insert_many(documents)
-            logger.info(f"{len(documents)} document(s) copié(s) de {source_collection_name} vers {test_collection_name}.")
 
-        # Étape 4 : Retourner la collection de test pour permettre des opérations ultérieures
-        return test_collection
+        # Étape 3 : Retourner la collection de test pour permettre des opérations ultérieures
+        return db[test_collection_name]
 
     except Exception as e:
         # Gestion des erreurs : loguer et remonter l'exception pour un traitement ultérieur
@@ -343,9 +340,9 @@ def update_data(test_collection):
 
     Étapes principales :
     1. Définit une liste de mises à jour, comprenant les filtres et les modifications à appliquer.
-    2. Parcourt la liste et applique chaque mise à jour à la collection.
-    3. Vérifie que chaque mise à jour a bien été appliquée avec une assertion.
-    4. Logue le succès ou l'échec de chaque mise à jour.
+    2. Applique toutes les mises à jour en un seul envoi (`bulk_mutate`).
+    3. Vérifie avec des assertions que chaque mise à jour a trouvé et modifié son document.
+    4. Logue le succès ou l'échec des mises à jour.
 
     Args:
         test_collection : Collection MongoDB cible.
@@ -368,16 +365,20 @@ def update_data(test_collection):
     ]
 
     try:
-        # Parcourir chaque mise à jour dans la liste
-        for i, update in enumerate(updates, start=1):
-            # Appliquer la mise à jour à la collection
-            update_count = update_records(test_collection, update["filter"], update["update"])
-            
-            # Vérifier qu'au moins un document a été modifié
-            assert update_count > 0, f"Erreur : Aucune mise à jour appliquée pour l'update {i}."
-            
-            # Loguer le succès de la mise à jour
-            logger.info(f"Mise à jour {i} appliquée avec succès.")
+        # Appliquer toutes les mises à jour en un seul aller-retour
+        report = bulk_mutate(test_collection, updates)
+
+        # Chaque mise à jour cible un seul document et change sa valeur
+        assert report["errors"] == 0, f"Erreur : {report['errors']} mise(s) à jour refusée(s)."
+        assert report["matched"] == len(updates), (
+            f"Erreur : {report['matched']} document(s) trouvé(s) pour {len(updates)} mises à jour."
+        )
+        assert report["modified"] == len(updates), (
+            f"Erreur : {report['modified']} document(s) modifié(s) pour {len(updates)} mises à jour."
+        )
+
+        # Loguer le succès des mises à jour
+        logger.info(f"{len(updates)} mises à jour appliquées avec succès.")
     except Exception as e:
         # Loguer les erreurs si une exception survient
         logger.error(f"Erreur lors des mises à jour des données : {e}")
@@ -424,6 +425,198 @@ def delete_specific_data(test_collection):
 
  
 
+def summaries_after_load(test_collection):
+    """
+    Vérifie que les résumés pré-agrégés reconstruits juste après un chargement ne sont pas vides.
+
+    Étapes principales :
+    1. Charge 5 documents d'une pathologie dédiée (date d'écriture `ingested_at` posée à l'insertion).
+    2. Reconstruit les résumés, comme `main.py` après un chargement.
+    3. Vérifie avec des assertions que le résumé par pathologie compte les 5 admissions.
+    4. Supprime les documents temporaires et les résumés de la collection de test.
+
+    Args:
+        test_collection : Collection MongoDB cible.
+
+    Raises:
+        AssertionError: Si le résumé est vide ou incomplet.
+        Exception: Pour toute autre erreur lors de l'agrégation.
+    """
+    logger.info("=== Résumés pré-agrégés après un chargement ===")
+    condition = "Summary Check"
+    records = [
+        {"_id": f"summary_id_{i}", "name": f"Summary Patient {i}", "medical_condition": condition, "billing_amount": 100.0}
+        for i in range(5)
+    ]
+    try:
+        insert_records(test_collection, records)
+        refresh_summaries(test_collection, full=True)
+        rows = read_summary(test_collection, "admissions_by_condition")
+        assert rows, "Erreur : résumé vide après le chargement."
+        row = next((row for row in rows if row["_id"] == condition), None)
+        assert row is not None and row["admissions"] == 5, f"Erreur : admissions inattendues pour '{condition}' : {row}."
+        logger.info(f"Résumés reconstruits après le chargement : {len(rows)} pathologies.")
+    except Exception as e:
+        # Loguer les erreurs puis les propager pour que l'échec soit compté
+        logger.error(f"Erreur lors de la vérification des résumés : {e}")
+        raise
+    finally:
+        db = test_collection.database
+        test_collection.delete_many({"_id": {"$regex": "^summary_id_"}})
+        for name in SUMMARIES:
+            db[summary_collection_name(test_collection.name, name)].drop()
+            db[CONTROL_COLLECTION].delete_one({"_id": f"{test_collection.name}.{name}"})
+
+
+class ThreadedAsyncCursor:
+    """
+    Curseur asynchrone au-dessus d'un curseur synchrone, chaque lecture étant faite dans un thread.
+
+    Args:
+        cursor: Curseur synchrone (pymongo ou mongomock).
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def limit(self, limit):
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    async def to_list(self, length=None):
+        return await asyncio.to_thread(list, self.cursor)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        document = await asyncio.to_thread(next, self.cursor, None)
+        if document is None:
+            raise StopAsyncIteration
+        return document
+
+    async def close(self):
+        await asyncio.to_thread(self.cursor.close)
+
+
+class ThreadedAsyncCollection:
+    """
+    Substitut en mémoire d'une `AsyncCollection` : les méthodes utilisées par `async_crud`
+    délèguent à une collection synchrone via `asyncio.to_thread`.
+
+    Args:
+        collection: Collection synchrone (par exemple une collection mongomock).
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.full_name = collection.full_name
+
+    async def insert_many(self, documents, ordered=True):
+        return await asyncio.to_thread(self.collection.insert_many, documents, ordered=ordered)
+
+    async def update_many(self, filter_query, update_query):
+        return await asyncio.to_thread(self.collection.update_many, filter_query, update_query)
+
+    async def delete_many(self, filter_query):
+        return await asyncio.to_thread(self.collection.delete_many, filter_query)
+
+    def find(self, query=None, projection=None, batch_size=0):
+        return ThreadedAsyncCursor(self.collection.find(query, projection, batch_size=batch_size))
+
+
+def in_memory_async_collection(name):
+    """
+    Crée une collection asynchrone en mémoire (mongomock), sans serveur MongoDB.
+
+    Args:
+        name (str): Nom de la collection.
+
+    Returns:
+        ThreadedAsyncCollection: Collection asynchrone de substitution.
+
+    Raises:
+        ImportError: Si mongomock n'est pas installé.
+    """
+    import mongomock  # Dépendance de développement facultative : MongoDB simulé en mémoire
+
+    return ThreadedAsyncCollection(mongomock.MongoClient()[DATABASE_NAME][name])
+
+
+async def check_async_crud(collection):
+    """
+    Enchaîne les opérations de `async_crud` sur 20 documents temporaires et vérifie chaque compteur.
+
+    Args:
+        collection: Collection asynchrone cible.
+
+    Raises:
+        AssertionError: Si un compteur ou un document ne correspond pas au résultat attendu.
+    """
+    temporary_filter = {"_id": {"$regex": "^async_id_"}}
+    records = [{"_id": f"async_id_{i}", "name": f"Async Patient {i}", "age": 20 + i} for i in range(20)]
+    inserted_count = await async_crud.insert_records(collection, records, batch_size=5)
+    assert inserted_count == 20, f"Erreur : {inserted_count} document(s) inséré(s) au lieu de 20."
+
+    results = await asyncio.gather(
+        *(async_crud.read_records(collection, {"_id": record["_id"]}, limit=1) for record in records)
+    )
+    assert all(len(result) == 1 for result in results), "Erreur : un document inséré est introuvable."
+
+    update_count = await async_crud.update_records(collection, temporary_filter, {"$inc": {"age": 1}})
+    assert update_count == 20, f"Erreur : {update_count} document(s) mis à jour au lieu de 20."
+    ages = [document["age"] async for document in async_crud.iter_records(collection, temporary_filter, {"age": 1})]
+    assert sorted(ages) == list(range(21, 41)), "Erreur : âges inattendus après la mise à jour."
+
+    delete_count = await async_crud.delete_records(collection, temporary_filter)
+    assert delete_count == 20, f"Erreur : {delete_count} document(s) supprimé(s) au lieu de 20."
+
+
+def async_operations(test_collection, async_collection=None, in_memory=ASYNC_IN_MEMORY_CHECK):
+    """
+    Vérifie les opérations CRUD asynchrones (`async_crud`) sur 20 documents temporaires.
+
+    Étapes principales :
+    1. Sur demande (`in_memory`), exécute les vérifications sur un substitut en mémoire
+       (mongomock via `asyncio.to_thread`, à installer séparément).
+    2. Les exécute sur la collection de test, via le client asynchrone partagé.
+    3. Chaque exécution insère 20 documents par lots simultanés, les relit, les met à jour,
+       les parcourt puis les supprime, en vérifiant chaque compteur (voir `check_async_crud`).
+
+    Args:
+        test_collection : Collection MongoDB cible.
+        async_collection (optional): Collection asynchrone à utiliser à la place du client
+            asynchrone partagé.
+        in_memory (bool): Exécute d'abord les vérifications sur le substitut en mémoire
+            (variable `ASYNC_IN_MEMORY_CHECK=1`).
+
+    Raises:
+        AssertionError: Si une vérification échoue.
+        Exception: Pour toute autre erreur lors des opérations asynchrones.
+    """
+    logger.info("=== Opérations asynchrones ===")
+
+    async def run():
+        collection = async_collection
+        if collection is None:
+            collection = get_async_mongo_client(MONGO_URI)[test_collection.database.name][test_collection.name]
+        try:
+            if in_memory:
+                await check_async_crud(in_memory_async_collection(test_collection.name))
+                logger.info("Opérations asynchrones validées sur le substitut en mémoire.")
+            await check_async_crud(collection)
+        finally:
+            if async_collection is None:
+                await close_async_mongo_clients()
+
+    try:
+        asyncio.run(run())
+        logger.info("Opérations asynchrones validées (insertion, lecture, mise à jour, parcours, suppression).")
+    except Exception as e:
+        # Loguer les erreurs puis les propager pour que l'échec soit compté
+        logger.error(f"Erreur lors des opérations asynchrones : {e}")
+        raise
+
 def export_final_data(test_collection):
     """
     Exporte les données restantes de la collection MongoDB dans un fichier CSV.